@@ -0,0 +1,3 @@
+"""
+Benchmark suites for CPU, memory and parallel processing performance
+"""
@@ -0,0 +1,135 @@
+"""
+Allocator stress patterns for the memory suite
+
+Each pattern builds a structure and returns it, so the same callable can be
+timed (build and free, the allocator churn a long-running service sees) and
+profiled once under tracemalloc and psutil for the bytes it keeps alive and
+the RSS it leaves behind after release.
+"""
+
+import gc
+import mmap
+import array
+import random
+import tracemalloc
+
+import numpy as np
+import psutil
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+PAGE_SIZE = 4096
+
+
+class Point:
+    """Small object with an instance __dict__"""
+
+    def __init__(self, x, y, z):
+        self.x = x
+        self.y = y
+        self.z = z
+
+
+class SlottedPoint:
+    """Small object with __slots__ and no instance __dict__"""
+
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y, z):
+        self.x = x
+        self.y = y
+        self.z = z
+
+
+def small_objects(count, slots=False):
+    cls = SlottedPoint if slots else Point
+    return [cls(i, i, i) for i in range(count)]
+
+
+def bytearray_buffers(count, size):
+    return [bytearray(size) for _ in range(count)]
+
+
+def array_buffers(count, size):
+    template = array.array("B", [0])
+    return [template * size for _ in range(count)]
+
+
+def numpy_buffers(count, size):
+    return [np.zeros(size, dtype=np.uint8) for _ in range(count)]
+
+
+def fragmented_heap(count, seed=0):
+    """Interleave small and medium blocks, free every other one, then refill with larger blocks
+
+    The survivors pin the pages they sit on, so the freed holes can only be
+    reused by blocks that fit in them; the larger refill has to grow the heap.
+    """
+    rng = random.Random(seed)
+    blocks = [bytes(rng.choice((32, 64, 256, 1024, 4096))) for _ in range(count)]
+    del blocks[::2]
+    blocks.extend(bytes(8192) for _ in range(count // 8))
+    return blocks
+
+
+def base_page_buffer(size):
+    """Zero-filled uint8 array over a fresh anonymous mapping of base pages only
+
+    With transparent huge pages one fault can map 2 MB, so a per-page cost
+    would describe huge-page faults; MADV_NOHUGEPAGE keeps every 4 KB page
+    its own first-touch fault. The mapping is released with the array.
+    """
+    mapping = mmap.mmap(-1, size)
+    if hasattr(mmap, "MADV_NOHUGEPAGE"):
+        mapping.madvise(mmap.MADV_NOHUGEPAGE)
+    return np.frombuffer(mapping, dtype=np.uint8)
+
+
+def touch_pages(buffer):
+    """Write one byte per page, faulting pages in on first touch"""
+    buffer[::PAGE_SIZE] = 1
+    return buffer
+
+
+def minor_faults():
+    """Minor page faults of this process so far, or None if unknown"""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_minflt
+
+
+def profile_pattern(build):
+    """Run build() and report what it keeps alive and what it leaves behind
+
+    - rss_growth_bytes: RSS increase while the structure is alive
+    - retained_bytes: RSS increase still present after it is freed
+    - traced_bytes: bytes live in the structure according to tracemalloc
+
+    RSS is taken from a run without tracemalloc, whose own bookkeeping
+    would otherwise show up as growth.
+    """
+    process = psutil.Process()
+    gc.collect()
+    rss_before = process.memory_info().rss
+    structure = build()
+    rss_alive = process.memory_info().rss
+    del structure
+    gc.collect()
+    rss_after = process.memory_info().rss
+
+    tracemalloc.start()
+    try:
+        structure = build()
+        traced, peak = tracemalloc.get_traced_memory()
+        del structure
+    finally:
+        tracemalloc.stop()
+    return {
+        "traced_bytes": traced,
+        "traced_peak_bytes": peak,
+        "rss_growth_bytes": rss_alive - rss_before,
+        "retained_bytes": max(0, rss_after - rss_before),
+    }
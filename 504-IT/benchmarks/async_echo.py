@@ -0,0 +1,161 @@
+"""
+Loopback echo workload for event-loop vs thread-pool concurrency
+
+A server runs in-process on TCP loopback or a Unix socket. Every client
+opens one connection and sends fixed-size payloads one at a time, waiting
+for each echo, so the run measures how many concurrent request/response
+exchanges the concurrency model sustains and how long each one waits.
+One timed run includes server startup and connection setup.
+"""
+
+import os
+import time
+import socket
+import asyncio
+import tempfile
+import threading
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+FDS_RESERVED = 64  # descriptors left for everything else in the process
+
+
+def max_clients(requested):
+    """Clients that fit the open-file limit (each needs a client and a server socket)"""
+    if resource is None:
+        return requested
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    return max(1, min(requested, (soft - FDS_RESERVED) // 2))
+
+
+def unix_socket_path():
+    return os.path.join(tempfile.mkdtemp(prefix="echo-"), "echo.sock")
+
+
+def _cleanup_unix(path):
+    if path and os.path.exists(path):
+        os.remove(path)
+        os.rmdir(os.path.dirname(path))
+
+
+async def _serve_echo(reader, writer, size):
+    try:
+        while True:
+            writer.write(await reader.readexactly(size))
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _client(connect, payload, requests, latencies):
+    reader, writer = await connect()
+    size = len(payload)
+    for _ in range(requests):
+        start = time.perf_counter()
+        writer.write(payload)
+        await reader.readexactly(size)
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+    await writer.wait_closed()
+
+
+async def _asyncio_echo(clients, requests, payload, transport):
+    size = len(payload)
+    handler = lambda reader, writer: _serve_echo(reader, writer, size)
+    path = None
+    if transport == "unix":
+        path = unix_socket_path()
+        server = await asyncio.start_unix_server(handler, path=path, backlog=clients)
+        connect = lambda: asyncio.open_unix_connection(path)
+    else:
+        server = await asyncio.start_server(handler, "127.0.0.1", 0, backlog=clients)
+        port = server.sockets[0].getsockname()[1]
+        connect = lambda: asyncio.open_connection("127.0.0.1", port)
+
+    latencies = []
+    try:
+        async with server:
+            await asyncio.gather(*(_client(connect, payload, requests, latencies) for _ in range(clients)))
+    finally:
+        _cleanup_unix(path)
+    return latencies
+
+
+def run_asyncio_echo(clients, requests, payload, transport="tcp", use_uvloop=False):
+    """Drive the echo server with client coroutines; returns per-request latencies"""
+    loop = uvloop.new_event_loop() if use_uvloop else asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(_asyncio_echo(clients, requests, payload, transport))
+    finally:
+        loop.close()
+
+
+def _echo_handler(size):
+    class EchoHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            while True:
+                data = self.rfile.read(size)
+                if len(data) < size:
+                    return
+                self.wfile.write(data)
+
+    return EchoHandler
+
+
+def _threaded_server(size, transport, backlog):
+    if transport == "unix":
+        server_class, address = socketserver.ThreadingUnixStreamServer, unix_socket_path()
+    else:
+        server_class, address = socketserver.ThreadingTCPServer, ("127.0.0.1", 0)
+    server_class = type("EchoServer", (server_class,), {"request_queue_size": backlog, "daemon_threads": True})
+    return server_class(address, _echo_handler(size))
+
+
+def _blocking_client(address, family, payload, requests):
+    size = len(payload)
+    latencies = []
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.connect(address)
+        if family != socket.AF_UNIX:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        for _ in range(requests):
+            start = time.perf_counter()
+            sock.sendall(payload)
+            received = 0
+            while received < size:
+                chunk = sock.recv(size - received)
+                if not chunk:
+                    raise ConnectionError("echo server closed the connection")
+                received += len(chunk)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run_threaded_echo(clients, requests, payload, workers, transport="tcp"):
+    """Same workload with blocking clients on a ThreadPoolExecutor and a thread-per-connection server"""
+    server = _threaded_server(len(payload), transport, clients)
+    family = socket.AF_UNIX if transport == "unix" else socket.AF_INET
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            sessions = pool.map(lambda _: _blocking_client(server.server_address, family, payload, requests),
+                                range(clients))
+            return [latency for session in sessions for latency in session]
+    finally:
+        server.shutdown()
+        server.server_close()
+        if transport == "unix":
+            _cleanup_unix(server.server_address)
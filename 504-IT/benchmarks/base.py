@@ -0,0 +1,105 @@
+"""
+Common functionality shared by the benchmark suites
+"""
+
+from fnmatch import fnmatch
+
+from benchmarks.timing import BenchmarkTimer
+
+
+class CaseResults(dict):
+    """Results dict of a suite run that reports every case as it is stored"""
+
+    def __init__(self, on_store):
+        super().__init__()
+        self.on_store = on_store
+
+    def __setitem__(self, key, case):
+        super().__setitem__(key, case)
+        self.on_store(key, case)
+
+    def update(self, other=(), **kwargs):
+        for key, case in dict(other, **kwargs).items():
+            self[key] = case
+
+
+class BaseBenchmark:
+    """Base class providing access to the shared timing engine"""
+
+    name = "base"
+    requires_test_data = False
+
+    def __init__(self, timer=None, case_filter=None):
+        self.timer = timer or BenchmarkTimer()
+        self.case_filter = list(case_filter or [])
+        self.sampler = None
+        self.on_case = None  # called with (suite, case name, entry) as each case finishes
+        self.profiler = None
+        self.profiles = []  # (timing, profiled) pairs waiting for their case to be stored
+
+    def wants(self, case):
+        """Whether a case name is selected by the case filter
+
+        Patterns with wildcards use shell-style matching, anything else
+        matches as a substring. An empty filter selects every case.
+        """
+        if not self.case_filter:
+            return True
+        for pattern in self.case_filter:
+            if any(c in pattern for c in "*?["):
+                if fnmatch(case, pattern):
+                    return True
+            elif pattern in case:
+                return True
+        return False
+
+    def measure(self, func, repetitions=None, setup=None):
+        """Time func with the shared engine, returning (value, median seconds, timing)
+
+        setup runs untimed before every call. The resource summary rides on
+        timing["resources"] until finish_case moves it onto the case.
+        """
+        start = self.sampler.mark() if self.sampler else None
+        value, timing = self.timer.measure(func, repetitions=repetitions, setup=setup)
+        if self.sampler:
+            timing["resources"] = self.sampler.summarize(start, self.sampler.mark())
+        if self.profiler:
+            # Profile a separate pass so the timing above stays unprofiled
+            profiled = self.profiler.profile(func, timing["median_seconds"], setup)
+            if profiled:
+                self.profiles.append((timing, profiled))
+        return value, timing["median_seconds"], timing
+
+    @staticmethod
+    def measured_calls(samples, timing):
+        """The per-call samples func recorded during the measured repetitions of timing
+
+        Leaves out what warmup, calibration and the profiler pass appended.
+        """
+        end = timing["calls"]
+        return samples[end - timing["repetitions"] * timing["iterations"]:end]
+
+    def new_results(self):
+        """Empty results dict for run_all that finishes each case as it is stored"""
+        return CaseResults(self.finish_case)
+
+    def finish_case(self, key, case):
+        """Attach the case's resource summary and profile, then report it to on_case"""
+        timing = case.get("timing")
+        stats = timing.pop("resources", None) if timing else None
+        if stats:
+            case["resources"] = stats
+        for index, (measured, profiled) in enumerate(self.profiles):
+            if measured is timing:
+                del self.profiles[index]
+                case["profile"] = self.profiler.save(self.name, key, profiled)
+                break
+        if self.on_case:
+            self.on_case(self.name, key, case)
+
+    def run(self):
+        """Run all cases, attaching resource summaries when a sampler is set"""
+        self.profiles = []
+        results = dict(self.run_all())
+        self.profiles = []
+        return results
@@ -0,0 +1,149 @@
+"""
+CPU benchmarks: integer arithmetic, matrix multiplication (fixed sizes and a
+BLAS GFLOPS sweep), prime calculation and a segmented prime sieve
+"""
+
+import subprocess
+
+import numpy as np
+
+from config import SIEVE_LIMIT, SIEVE_SEGMENT_KB, SIEVE_PROCESS_COUNTS, MATMUL_SIZES, MATMUL_DTYPES
+from benchmarks.base import BaseBenchmark
+from benchmarks.kernels import integer_arithmetic, count_primes_in_range
+from benchmarks.pools import WorkerPools
+from benchmarks.scaling import available_cpus
+from benchmarks import matmul
+from benchmarks.sieve import segmented_sieve, memory_footprint
+
+INTEGER_ITERATIONS = 500000
+MATRIX_SIZES = {"small": 50, "medium": 150}
+PRIME_LIMIT = 5000
+
+
+class CPUBenchmark(BaseBenchmark):
+    """Benchmark single-core CPU performance"""
+
+    name = "cpu"
+
+    def __init__(self, timer=None, case_filter=None, sieve_limit=None, sieve_segment_kb=None,
+                 sieve_process_counts=None, pools=None, matmul_sizes=None, matmul_dtypes=None):
+        super().__init__(timer, case_filter)
+        self.sieve_limit = sieve_limit or SIEVE_LIMIT
+        self.sieve_segment_kb = sieve_segment_kb or SIEVE_SEGMENT_KB
+        self.sieve_process_counts = SIEVE_PROCESS_COUNTS if sieve_process_counts is None else sieve_process_counts
+        self.pools = pools or WorkerPools()
+        self.matmul_sizes = matmul_sizes or MATMUL_SIZES
+        self.matmul_dtypes = matmul_dtypes or MATMUL_DTYPES
+
+    def integer_operations(self, iterations=INTEGER_ITERATIONS):
+        """Benchmark integer arithmetic"""
+        _, elapsed, timing = self.measure(lambda: integer_arithmetic(iterations))
+        return {
+            "operation": "integer_arithmetic",
+            "iterations": iterations,
+            "time_seconds": elapsed,
+            "operations_per_second": iterations / elapsed,
+            "timing": timing,
+        }
+
+    def floating_point_operations(self, matrix_size):
+        """Benchmark floating point performance with matrix multiplication"""
+        a = np.random.rand(matrix_size, matrix_size)
+        b = np.random.rand(matrix_size, matrix_size)
+        _, elapsed, timing = self.measure(lambda: np.dot(a, b))
+        return {
+            "operation": "matrix_multiplication",
+            "matrix_size": matrix_size,
+            "time_seconds": elapsed,
+            "flops": 2 * matrix_size ** 3 / elapsed,
+            "timing": timing,
+        }
+
+    def matmul_sweep(self, threads):
+        """GFLOPS of square matmul over all sizes and dtypes with BLAS limited to threads"""
+        blas = matmul.blas_info()
+        control = "threadpoolctl" if matmul.threadpool_limits is not None else "env"
+        sizes = [size for size in self.matmul_sizes
+                 if any(self.wants(f"matmul_{dtype}_{size}_threads_{threads}") for dtype in self.matmul_dtypes)]
+        results = {}
+        for point in matmul.run_sweep(sizes, self.matmul_dtypes, threads, self):
+            key = f"matmul_{point['dtype']}_{point['matrix_size']}_threads_{threads}"
+            if self.wants(key):
+                results[key] = {"operation": "matmul_sweep", "threads": threads, "blas": blas["name"],
+                                "blas_version": blas["version"], "thread_control": control, **point}
+        return results
+
+    def prime_calculation(self, limit=PRIME_LIMIT):
+        """Benchmark prime number calculation up to limit"""
+        primes_found, elapsed, timing = self.measure(lambda: count_primes_in_range(0, limit))
+        return {
+            "operation": "prime_calculation",
+            "limit": limit,
+            "primes_found": primes_found,
+            "time_seconds": elapsed,
+            "numbers_per_second": limit / elapsed,
+            "timing": timing,
+        }
+
+    def prime_sieve(self, limit=None, processes=1):
+        """Benchmark the segmented sieve up to limit, optionally over a process pool"""
+        limit = limit or self.sieve_limit
+        segment_bytes = self.sieve_segment_kb * 1024
+        pool = self.pools.process_pool(processes) if processes > 1 else None
+        (primes_found, segments, _), elapsed, timing = self.measure(
+            lambda: segmented_sieve(limit, segment_bytes, pool, processes))
+        rss_growth_kb = memory_footprint(limit, segment_bytes, processes)
+        return {
+            "operation": "prime_sieve",
+            "limit": limit,
+            "processes": processes,
+            "primes_found": primes_found,
+            "segment_kb": self.sieve_segment_kb,
+            "segments": segments,
+            "time_seconds": elapsed,
+            "numbers_per_second": limit / elapsed,
+            "segments_per_second": segments / elapsed,
+            "segment_mb_per_second": segments * segment_bytes / (1024 * 1024) / elapsed,
+            "rss_growth_mb": rss_growth_kb / 1024,
+            "timing": timing,
+        }
+
+    def run_all(self):
+        """Run all CPU benchmarks"""
+        results = self.new_results()
+
+        if self.wants("integer_ops"):
+            print("  - Integer operations...")
+            results["integer_ops"] = self.integer_operations()
+
+        for label, size in MATRIX_SIZES.items():
+            if self.wants(f"floating_point_ops_{label}"):
+                print(f"  - Matrix multiplication ({size}x{size})...")
+                results[f"floating_point_ops_{label}"] = self.floating_point_operations(size)
+
+        # BLAS GFLOPS curve at one thread and at all available threads
+        for threads in sorted({1, len(available_cpus())}):
+            if any(self.wants(f"matmul_{dtype}_{size}_threads_{threads}")
+                   for dtype in self.matmul_dtypes for size in self.matmul_sizes):
+                print(f"  - Matrix multiplication sweep ({threads} BLAS thread{'s' if threads > 1 else ''})...")
+                try:
+                    results.update(self.matmul_sweep(threads))
+                except (subprocess.CalledProcessError, ValueError) as e:
+                    print(f"[ERROR] Matrix multiplication sweep failed: {e}")
+
+        if self.wants("prime_calculation"):
+            print("  - Prime calculation...")
+            results["prime_calculation"] = self.prime_calculation()
+
+        try:
+            if self.wants("prime_sieve"):
+                print(f"  - Segmented prime sieve (limit {self.sieve_limit:,})...")
+                results["prime_sieve"] = self.prime_sieve()
+            for processes in self.sieve_process_counts:
+                if self.wants(f"prime_sieve_processes_{processes}"):
+                    print(f"  - Segmented prime sieve (limit {self.sieve_limit:,}, {processes} processes)...")
+                    results[f"prime_sieve_processes_{processes}"] = self.prime_sieve(processes=processes)
+        finally:
+            self.pools.close()
+
+        return results
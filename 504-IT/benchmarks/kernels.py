@@ -0,0 +1,92 @@
+"""
+Compute kernels shared by the benchmark suites
+
+Kept at module level so they can be pickled for multiprocessing workers.
+The pure-Python kernels hold the GIL for their whole run; the GIL-free
+kernels spend nearly all their time in C code that releases it (hashlib,
+zlib and NumPy ufuncs on large buffers).
+"""
+
+import sys
+import zlib
+import random
+import hashlib
+import sysconfig
+
+# Per-process input caches so workers build their data once, not per call
+_byte_chunks = {}
+_float_chunks = {}
+
+
+def is_prime(n):
+    """Trial-division primality test"""
+    if n < 2:
+        return False
+    if n < 4:
+        return True
+    if n % 2 == 0:
+        return False
+    i = 3
+    while i * i <= n:
+        if n % i == 0:
+            return False
+        i += 2
+    return True
+
+
+def count_primes_in_range(start, end, step=1):
+    """Count primes in range(start, end, step)"""
+    return sum(1 for n in range(start, end, step) if is_prime(n))
+
+
+def integer_arithmetic(iterations):
+    """Mixed integer add/multiply/modulo loop"""
+    total = 0
+    for i in range(iterations):
+        total = (total + i * 7) % 1000003
+    return total
+
+
+def _byte_chunk(size):
+    """Deterministic, moderately compressible bytes of the given size"""
+    if size not in _byte_chunks:
+        block = random.Random(size).randbytes(max(1, size // 4))
+        _byte_chunks[size] = (block * 4)[:size].ljust(size, b"\0")
+    return _byte_chunks[size]
+
+
+def _float_chunk(size):
+    """float64 input/output arrays covering size bytes each"""
+    if size not in _float_chunks:
+        import numpy as np
+        elements = max(1, size // 8)
+        _float_chunks[size] = (np.linspace(0.0, 100.0, elements), np.empty(elements))
+    return _float_chunks[size]
+
+
+def run_gil_free(kernel, units, chunk_bytes):
+    """Process `units` chunks of chunk_bytes with a GIL-releasing kernel"""
+    if kernel == "sha256":
+        data = _byte_chunk(chunk_bytes)
+        for _ in range(units):
+            hashlib.sha256(data).digest()
+    elif kernel == "zlib":
+        data = _byte_chunk(chunk_bytes)
+        for _ in range(units):
+            zlib.compress(data, 6)
+    elif kernel == "numpy_ufunc":
+        import numpy as np
+        source, out = _float_chunk(chunk_bytes)
+        for _ in range(units):
+            np.sin(source, out=out)
+    else:
+        raise ValueError(f"Unknown GIL-free kernel '{kernel}'")
+    return units
+
+
+def gil_status():
+    """Describe whether this interpreter is a free-threaded build and if the GIL is on"""
+    free_threaded = bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    gil_enabled = is_gil_enabled() if is_gil_enabled else True
+    return {"free_threaded_build": free_threaded, "gil_enabled": gil_enabled}
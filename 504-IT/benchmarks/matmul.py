@@ -0,0 +1,116 @@
+"""
+BLAS-backed matrix multiplication sweep with BLAS thread control
+
+BLAS reads its thread count when it is loaded, so without threadpoolctl a
+thread setting can only be applied to a fresh interpreter: the sweep is
+then run as `python -m benchmarks.matmul` with the usual *_NUM_THREADS
+variables set and its results are read back as JSON. The subprocess runs
+its own resource sampler, so its points carry resource summaries too.
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import subprocess
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from config import BASE_DIR
+from benchmarks.base import BaseBenchmark
+from benchmarks.timing import BenchmarkTimer
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:
+    threadpool_limits = None
+
+THREAD_ENV_VARS = ("OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "OMP_NUM_THREADS",
+                   "BLIS_NUM_THREADS", "VECLIB_MAXIMUM_THREADS")
+
+
+def blas_info():
+    """Name and version of the BLAS library NumPy was built against"""
+    try:
+        config = np.show_config(mode="dicts")
+        blas = config["Build Dependencies"]["blas"]
+        return {"name": blas.get("name", "unknown"), "version": blas.get("version", "unknown")}
+    except (TypeError, KeyError):
+        # NumPy < 1.25 only prints its configuration
+        buffer = io.StringIO()
+        with redirect_stdout(buffer):
+            np.show_config()
+        text = buffer.getvalue()
+        for name in ("mkl", "openblas", "blis", "accelerate", "atlas"):
+            if re.search(name, text, re.IGNORECASE):
+                return {"name": name, "version": "unknown"}
+        return {"name": "unknown", "version": "unknown"}
+
+
+def matmul_flops(size):
+    """Floating point operations of one size x size matrix product"""
+    return 2 * size ** 3
+
+
+def sweep(sizes, dtypes, benchmark):
+    """Time square matmul for every size and dtype in this process with benchmark.measure"""
+    rng = np.random.default_rng(0)
+    points = []
+    for dtype in dtypes:
+        for size in sizes:
+            a = rng.random((size, size)).astype(dtype)
+            b = rng.random((size, size)).astype(dtype)
+            out = np.empty((size, size), dtype=dtype)
+            _, elapsed, timing = benchmark.measure(lambda: np.matmul(a, b, out=out))
+            points.append({
+                "dtype": dtype,
+                "matrix_size": size,
+                "time_seconds": elapsed,
+                "gflops": matmul_flops(size) / elapsed / 1e9,
+                "timing": timing,
+            })
+    return points
+
+
+def run_sweep(sizes, dtypes, threads, benchmark):
+    """Run the sweep with BLAS limited to the given thread count
+
+    In-process points get their resource summary when the benchmark
+    finishes them; subprocess points come back with it attached.
+    """
+    if threadpool_limits is not None:
+        with threadpool_limits(limits=threads, user_api="blas"):
+            return sweep(sizes, dtypes, benchmark)
+
+    env = dict(os.environ)
+    env.update({name: str(threads) for name in THREAD_ENV_VARS})
+    request = json.dumps({"sizes": list(sizes), "dtypes": list(dtypes), "timer": benchmark.timer.settings(),
+                          "sample_resources": benchmark.sampler is not None})
+    completed = subprocess.run([sys.executable, "-m", "benchmarks.matmul", request], cwd=BASE_DIR, env=env,
+                               capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout)
+
+
+def _sweep_subprocess(args):
+    """Body of `python -m benchmarks.matmul`: the sweep with resource summaries attached"""
+    benchmark = BaseBenchmark(BenchmarkTimer(**args["timer"]))
+    if args.get("sample_resources"):
+        from benchmarks.sampler import ResourceSampler
+        benchmark.sampler = ResourceSampler()
+        benchmark.sampler.start()
+    try:
+        points = sweep(args["sizes"], args["dtypes"], benchmark)
+    finally:
+        if benchmark.sampler:
+            benchmark.sampler.stop()
+    for point in points:
+        stats = point["timing"].pop("resources", None)
+        if stats:
+            point["resources"] = stats
+    return points
+
+
+if __name__ == "__main__":
+    print(json.dumps(_sweep_subprocess(json.loads(sys.argv[1]))))
@@ -0,0 +1,285 @@
+"""
+Memory benchmarks: sequential access, random access, allocation,
+allocator stress patterns, STREAM-style bandwidth kernels and
+pointer-chasing latency
+"""
+
+import random
+
+import numpy as np
+
+from config import (MEMORY_SIZES, STREAM_SIZES_KB, STREAM_KERNELS, LATENCY_SIZES_KB, LATENCY_HOPS,
+                    ALLOC_SMALL_OBJECTS, ALLOC_BUFFER_COUNT, ALLOC_BUFFER_KB, ALLOC_TOUCH_MB)
+from benchmarks.base import BaseBenchmark
+from benchmarks import allocation
+
+KB = 1024
+MB = 1024 * 1024
+CACHE_LINE = 64
+NODE_STRIDE = CACHE_LINE // 8  # int64 slots per node, one node per cache line
+LATENCY_BASELINE_KB = 4  # cycle small enough to stay in L1, used to subtract loop overhead
+STREAM_SCALAR = 3.0
+
+# Bytes moved per array element by each STREAM kernel (reads + writes)
+STREAM_BYTES_PER_ELEMENT = {
+    "copy": 2 * 8,
+    "scale": 2 * 8,
+    "add": 3 * 8,
+    "triad": 5 * 8,  # two passes: read c, write a; read a and b, write a
+}
+
+
+def touch_lines(buffer, offsets):
+    """Read one byte from each offset in order"""
+    total = 0
+    for offset in offsets:
+        total += buffer[offset]
+    return total
+
+
+def build_pointer_chain(size_kb, seed=0):
+    """Build a random single-cycle pointer chain over size_kb of memory
+
+    Nodes sit one cache line apart in an int64 array; each node holds the
+    index of the next node. Linking the nodes in the order of a random
+    permutation yields a single cycle, so a walk visits every node before
+    repeating and hardware prefetchers cannot predict the next address.
+    """
+    nodes = max(2, size_kb * KB // CACHE_LINE)
+    order = np.random.default_rng(seed).permutation(nodes).astype(np.int64)
+    chain = np.zeros(nodes * NODE_STRIDE, dtype=np.int64)
+    chain[order * NODE_STRIDE] = np.roll(order, -1) * NODE_STRIDE
+    return chain
+
+
+def chase(chain, hops):
+    """Follow the pointer chain for the given number of dependent loads"""
+    index = 0
+    for _ in range(hops):
+        index = chain[index]
+    return index
+
+
+def stream_kernel(name, a, b, c):
+    """Return a zero-argument callable running one vectorized STREAM kernel
+
+    Triad is computed in two in-place passes to avoid a temporary, so it
+    moves 5 arrays' worth of bytes rather than STREAM's 3; bandwidth is
+    reported from the bytes actually moved, like the other kernels.
+    """
+    if name == "copy":
+        return lambda: np.copyto(c, a)
+    if name == "scale":
+        return lambda: np.multiply(c, STREAM_SCALAR, out=b)
+    if name == "add":
+        return lambda: np.add(a, b, out=c)
+    if name == "triad":
+        def triad():
+            np.multiply(c, STREAM_SCALAR, out=a)
+            np.add(a, b, out=a)
+        return triad
+    raise ValueError(f"Unknown STREAM kernel '{name}'")
+
+
+class MemoryBenchmark(BaseBenchmark):
+    """Benchmark memory access and allocation"""
+
+    name = "memory"
+
+    def __init__(self, sizes=None, stream_sizes_kb=None, latency_sizes_kb=None, timer=None, case_filter=None):
+        super().__init__(timer, case_filter)
+        self.sizes = sizes or MEMORY_SIZES
+        self.stream_sizes_kb = stream_sizes_kb or STREAM_SIZES_KB
+        self.latency_sizes_kb = latency_sizes_kb or LATENCY_SIZES_KB
+        self._baseline_ns = None
+
+    def sequential_access(self, size_mb):
+        """Read one byte per cache line in address order"""
+        buffer = bytearray(b"\x01") * (size_mb * MB)
+        offsets = range(0, len(buffer), CACHE_LINE)
+        _, elapsed, timing = self.measure(lambda: touch_lines(buffer, offsets))
+        return {
+            "operation": "sequential_access",
+            "size_mb": size_mb,
+            "time_seconds": elapsed,
+            "bandwidth_mb_per_sec": size_mb / elapsed,
+            "timing": timing,
+        }
+
+    def random_access(self, size_mb):
+        """Read one byte per cache line in shuffled order"""
+        buffer = bytearray(b"\x01") * (size_mb * MB)
+        offsets = list(range(0, len(buffer), CACHE_LINE))
+        random.shuffle(offsets)
+        _, elapsed, timing = self.measure(lambda: touch_lines(buffer, offsets))
+        return {
+            "operation": "random_access",
+            "size_mb": size_mb,
+            "time_seconds": elapsed,
+            "bandwidth_mb_per_sec": size_mb / elapsed,
+            "timing": timing,
+        }
+
+    def allocation(self, size_mb):
+        """Allocate and release a buffer of the given size"""
+        size = size_mb * MB
+        _, elapsed, timing = self.measure(lambda: bytearray(size))
+        return {
+            "operation": "memory_allocation",
+            "size_mb": size_mb,
+            "time_seconds": elapsed,
+            "allocation_mb_per_sec": size_mb / elapsed,
+            "timing": timing,
+        }
+
+    def allocator_pattern(self, pattern, build, allocations):
+        """Profile what a structure retains on first build, then time building and freeing it"""
+        profile = allocation.profile_pattern(build)
+        _, elapsed, timing = self.measure(lambda: len(build()))
+        return {
+            "operation": "allocator_stress",
+            "pattern": pattern,
+            "allocations": allocations,
+            "time_seconds": elapsed,
+            "allocations_per_second": allocations / elapsed,
+            "bytes_per_allocation": profile["traced_bytes"] / allocations,
+            **profile,
+            "timing": timing,
+        }
+
+    def page_touch(self, prefaulted, size_mb=ALLOC_TOUCH_MB):
+        """Cost of writing one byte per page into fresh vs already-faulted memory
+
+        Both buffers are mapped without transparent huge pages, so each of
+        the size / PAGE_SIZE pages faults on its own on first touch.
+        """
+        size = size_mb * MB
+        pages = size // allocation.PAGE_SIZE
+        if prefaulted:
+            buffer = allocation.base_page_buffer(size)
+            buffer[:] = 1
+            func = lambda: allocation.touch_pages(buffer)
+        else:
+            func = lambda: allocation.touch_pages(allocation.base_page_buffer(size))
+        faults_before = allocation.minor_faults()
+        func()
+        faults_after = allocation.minor_faults()
+        _, elapsed, timing = self.measure(func)
+        return {
+            "operation": "allocator_stress",
+            "pattern": "prefaulted" if prefaulted else "first_touch",
+            "size_mb": size_mb,
+            "allocations": pages,
+            "time_seconds": elapsed,
+            "allocations_per_second": pages / elapsed,
+            "ns_per_page": elapsed / pages * 1e9,
+            "minor_faults": faults_after - faults_before if faults_before is not None else None,
+            "timing": timing,
+        }
+
+    def allocator_stress(self):
+        """Allocator churn: small objects, buffer types, page faults and fragmentation"""
+        buffer_size = ALLOC_BUFFER_KB * KB
+        patterns = {
+            "small_objects": (lambda: allocation.small_objects(ALLOC_SMALL_OBJECTS), ALLOC_SMALL_OBJECTS),
+            "small_objects_slots": (lambda: allocation.small_objects(ALLOC_SMALL_OBJECTS, slots=True), ALLOC_SMALL_OBJECTS),
+            "bytearray": (lambda: allocation.bytearray_buffers(ALLOC_BUFFER_COUNT, buffer_size), ALLOC_BUFFER_COUNT),
+            "array": (lambda: allocation.array_buffers(ALLOC_BUFFER_COUNT, buffer_size), ALLOC_BUFFER_COUNT),
+            "numpy": (lambda: allocation.numpy_buffers(ALLOC_BUFFER_COUNT, buffer_size), ALLOC_BUFFER_COUNT),
+            # count small/medium blocks plus count // 8 large refill blocks
+            "fragmentation": (lambda: allocation.fragmented_heap(ALLOC_SMALL_OBJECTS),
+                              ALLOC_SMALL_OBJECTS + ALLOC_SMALL_OBJECTS // 8),
+        }
+        results = {}
+        for pattern, (build, allocations) in patterns.items():
+            if self.wants(f"alloc_{pattern}"):
+                print(f"  - Allocator stress ({pattern.replace('_', ' ')})...")
+                results[f"alloc_{pattern}"] = self.allocator_pattern(pattern, build, allocations)
+        for prefaulted in (False, True):
+            key = "alloc_prefaulted" if prefaulted else "alloc_first_touch"
+            if self.wants(key):
+                print(f"  - Allocator stress ({'pre-faulted' if prefaulted else 'first-touch'} pages)...")
+                results[key] = self.page_touch(prefaulted)
+        return results
+
+    def stream(self, size_kb, kernels=STREAM_KERNELS):
+        """Run the STREAM kernels over a working set of size_kb split across three arrays"""
+        elements = max(1, size_kb * KB // (3 * 8))
+        a = np.empty(elements, dtype=np.float64)
+        b = np.empty(elements, dtype=np.float64)
+        c = np.empty(elements, dtype=np.float64)
+        # Touch every page before timing so first-touch faults are excluded
+        a.fill(1.0)
+        b.fill(2.0)
+        c.fill(0.0)
+
+        results = {}
+        for name in kernels:
+            _, elapsed, timing = self.measure(stream_kernel(name, a, b, c))
+            bytes_moved = STREAM_BYTES_PER_ELEMENT[name] * elements
+            results[name] = {
+                "operation": f"stream_{name}",
+                "size_kb": size_kb,
+                "size_mb": size_kb / KB,
+                "elements": elements,
+                "bytes_moved": bytes_moved,
+                "time_seconds": elapsed,
+                "bandwidth_mb_per_sec": bytes_moved / MB / elapsed,
+                "timing": timing,
+            }
+        return results
+
+    def _chase_ns(self, size_kb, hops):
+        """Median nanoseconds per hop over a chain of size_kb, with its timing"""
+        chain = memoryview(build_pointer_chain(size_kb))
+        _, elapsed, timing = self.measure(lambda: chase(chain, hops))
+        return elapsed / hops * 1e9, elapsed, timing
+
+    def latency(self, size_kb, hops=LATENCY_HOPS):
+        """Measure dependent-load latency by pointer chasing a random cycle"""
+        if self._baseline_ns is None:
+            self._baseline_ns, _, _ = self._chase_ns(LATENCY_BASELINE_KB, hops)
+        ns_per_access, elapsed, timing = self._chase_ns(size_kb, hops)
+        return {
+            "operation": "pointer_chase",
+            "size_kb": size_kb,
+            "size_mb": size_kb / KB,
+            "hops": hops,
+            "time_seconds": elapsed,
+            "ns_per_access": ns_per_access,
+            "baseline_ns_per_access": self._baseline_ns,
+            "ns_per_access_adjusted": max(0.0, ns_per_access - self._baseline_ns),
+            "timing": timing,
+        }
+
+    def run_all(self):
+        """Run all memory benchmarks"""
+        results = self.new_results()
+        cases = {
+            "sequential_access": self.sequential_access,
+            "random_access": self.random_access,
+            "allocation": self.allocation,
+        }
+        for size_mb in self.sizes:
+            selected = {name: case for name, case in cases.items() if self.wants(f"{name}_{size_mb}mb")}
+            if selected:
+                print(f"  - Memory tests ({size_mb}MB)...")
+            for name, case in selected.items():
+                results[f"{name}_{size_mb}mb"] = case(size_mb)
+
+        results.update(self.allocator_stress())
+
+        for size_kb in self.stream_sizes_kb:
+            kernels = [k for k in STREAM_KERNELS if self.wants(f"stream_{k}_{size_kb}kb")]
+            if not kernels:
+                continue
+            print(f"  - STREAM kernels ({size_kb}KB working set)...")
+            for name, result in self.stream(size_kb, kernels).items():
+                results[f"stream_{name}_{size_kb}kb"] = result
+
+        for size_kb in self.latency_sizes_kb:
+            if self.wants(f"latency_{size_kb}kb"):
+                print(f"  - Pointer-chasing latency ({size_kb}KB working set)...")
+                results[f"latency_{size_kb}kb"] = self.latency(size_kb)
+
+        return results
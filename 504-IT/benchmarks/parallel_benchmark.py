@@ -0,0 +1,444 @@
+"""
+Parallel processing benchmarks: sequential vs threading vs multiprocessing
+"""
+
+import statistics
+
+from config import (PARALLEL_TASK_SIZES, PARALLEL_THREAD_COUNTS, SCALING_TASK_SIZE, SCALING_WORK_PER_WORKER,
+                    GIL_FREE_KERNELS, GIL_FREE_UNITS, GIL_FREE_CHUNK_KB, PARALLEL_DATA_PATHS,
+                    ASYNC_CLIENTS, ASYNC_REQUESTS_PER_CLIENT, ASYNC_PAYLOAD_BYTES, ASYNC_TRANSPORT, ASYNC_THREAD_WORKERS)
+from benchmarks import async_echo
+from benchmarks.base import BaseBenchmark
+from benchmarks.timing import percentile
+from benchmarks.kernels import count_primes_in_range, run_gil_free, gil_status
+from benchmarks.scheduler import split_range
+from benchmarks.pools import WorkerPools, pinning_supported
+from benchmarks.scaling import scaling_worker_counts, fit_amdahl, fit_gustafson, available_cpus
+from benchmarks.shared_data import (SharedArray, count_primes_in_values, count_primes_in_shared,
+                                    serialization_cost)
+from benchmarks.scheduler import PrimePartitioner, PartitionMismatchError
+
+
+class ParallelBenchmark(BaseBenchmark):
+    """Compare sequential, threaded and multi-process prime counting"""
+
+    name = "parallel"
+
+    def __init__(self, task_sizes=None, thread_counts=None, timer=None, pools=None, partitioner=None,
+                 case_filter=None, scaling=False, scaling_task_size=None, scaling_work_per_worker=None,
+                 gil_free_kernels=None, data_paths=None, async_clients=None):
+        super().__init__(timer, case_filter)
+        self.task_sizes = task_sizes or PARALLEL_TASK_SIZES
+        self.thread_counts = thread_counts or PARALLEL_THREAD_COUNTS
+        self.scaling = scaling
+        self.scaling_task_size = scaling_task_size or SCALING_TASK_SIZE
+        self.scaling_work_per_worker = scaling_work_per_worker or SCALING_WORK_PER_WORKER
+        self.gil_free_kernels = GIL_FREE_KERNELS if gil_free_kernels is None else gil_free_kernels
+        self.data_paths = PARALLEL_DATA_PATHS if data_paths is None else data_paths
+        self.async_clients = async_clients or ASYNC_CLIENTS
+        self.gil = gil_status()
+        self.shared_arrays = {}
+        self.pools = pools or WorkerPools()
+        self.partitioner = partitioner or PrimePartitioner()
+        self.reference_primes = {}
+
+    def expected_primes(self, task_size):
+        """Sequential reference answer for task_size, computed once"""
+        if task_size not in self.reference_primes:
+            self.reference_primes[task_size] = count_primes_in_range(0, task_size)
+        return self.reference_primes[task_size]
+
+    def sequential(self, task_size):
+        """Count primes below task_size in the main thread"""
+        total, elapsed, timing = self.measure(lambda: count_primes_in_range(0, task_size))
+        self.reference_primes[task_size] = total
+        return {
+            "method": "sequential",
+            "workload": "prime_count",
+            "gil_bound": True,
+            "task_size": task_size,
+            "time_seconds": elapsed,
+            "tasks_per_second": task_size / elapsed,
+            "total_primes": total,
+            "timing": timing,
+        }
+
+    def threading(self, task_size, thread_count):
+        """Count primes below task_size on the persistent thread pool"""
+        chunks = self.partitioner.partition(task_size, thread_count)
+        starts, ends, steps = zip(*chunks)
+        executor = self.pools.thread_pool(thread_count)
+
+        def run():
+            return sum(executor.map(count_primes_in_range, starts, ends, steps))
+
+        total, elapsed, timing = self.measure(run)
+        self.partitioner.verify("threading", total, self.expected_primes(task_size))
+        return {
+            "method": "threading",
+            "workload": "prime_count",
+            "gil_bound": True,
+            "task_size": task_size,
+            "thread_count": thread_count,
+            "time_seconds": elapsed,
+            "tasks_per_second": task_size / elapsed,
+            "total_primes": total,
+            "partition": self.partitioner.strategy,
+            "work_items": len(chunks),
+            "pool_startup_seconds": self.pools.startup_seconds("threading", thread_count),
+            "timing": timing,
+        }
+
+    def multiprocessing(self, task_size, process_count):
+        """Count primes below task_size on the persistent process pool"""
+        chunks = self.partitioner.partition(task_size, process_count)
+        pool = self.pools.process_pool(process_count)
+
+        def run():
+            return sum(pool.starmap(count_primes_in_range, chunks, chunksize=1))
+
+        total, elapsed, timing = self.measure(run)
+        self.partitioner.verify("multiprocessing", total, self.expected_primes(task_size))
+        return {
+            "method": "multiprocessing",
+            "workload": "prime_count",
+            "gil_bound": True,
+            "task_size": task_size,
+            "process_count": process_count,
+            "time_seconds": elapsed,
+            "tasks_per_second": task_size / elapsed,
+            "total_primes": total,
+            "partition": self.partitioner.strategy,
+            "work_items": len(chunks),
+            "pool_startup_seconds": self.pools.startup_seconds("multiprocessing", process_count),
+            "timing": timing,
+        }
+
+    def input_array(self, task_size):
+        """The candidate numbers [0, task_size) as an int64 array"""
+        import numpy as np
+        return np.arange(task_size, dtype=np.int64)
+
+    def shared_array(self, task_size):
+        """Shared memory copy of the input array, created once per task size"""
+        if task_size not in self.shared_arrays:
+            self.shared_arrays[task_size] = SharedArray(self.input_array(task_size))
+        return self.shared_arrays[task_size]
+
+    def data_path(self, path, task_size, process_count):
+        """Count primes in the input array on the process pool via pickle or shared memory
+
+        Workers report their kernel time, so the wall time splits into
+        compute (the busiest worker, or total work spread over the usable
+        CPUs, whichever is larger) and IPC overhead (the rest: serialization,
+        pipe transfer and scheduling).
+        """
+        chunks = self.partitioner.partition(task_size, process_count)
+        pool = self.pools.process_pool(process_count)
+        setup_seconds = None
+        if path == "shared_memory":
+            shared = self.shared_array(task_size)
+            setup_seconds = shared.setup_seconds
+            func, payloads = count_primes_in_shared, [(shared.name, shared.length) + chunk for chunk in chunks]
+        else:
+            values = self.input_array(task_size)
+            func, payloads = count_primes_in_values, [(values[start:end:step],) for start, end, step in chunks]
+        compute = []
+        effective = min(process_count, len(available_cpus()))
+
+        def run():
+            replies = pool.starmap(func, payloads, chunksize=1)
+            per_worker = {}
+            for _, seconds, pid in replies:
+                per_worker[pid] = per_worker.get(pid, 0.0) + seconds
+            compute.append(max(max(per_worker.values()), sum(per_worker.values()) / effective))
+            return replies
+
+        replies, elapsed, timing = self.measure(run)
+        total = sum(count for count, _, _ in replies)
+        self.partitioner.verify(path, total, self.expected_primes(task_size))
+
+        task_bytes, task_seconds = serialization_cost(payloads)
+        result_bytes, result_seconds = serialization_cost(replies)
+        # Warmup, calibration and profiler calls also appended; keep the measured
+        # repetitions and take their median per-call compute like the timing
+        iterations = timing["iterations"]
+        measured = self.measured_calls(compute, timing)
+        compute_seconds = statistics.median(sum(measured[i:i + iterations]) / iterations
+                                            for i in range(0, len(measured), iterations))
+        return {
+            "method": path,
+            "workload": "prime_count",
+            "gil_bound": True,
+            "task_size": task_size,
+            "process_count": process_count,
+            "time_seconds": elapsed,
+            "tasks_per_second": task_size / elapsed,
+            "total_primes": total,
+            "partition": self.partitioner.strategy,
+            "work_items": len(chunks),
+            "compute_seconds": compute_seconds,
+            "ipc_seconds": max(0.0, elapsed - compute_seconds),
+            "pickled_bytes": task_bytes + result_bytes,
+            "serialization_seconds": task_seconds + result_seconds,
+            "shared_setup_seconds": setup_seconds,
+            "timing": timing,
+        }
+
+    def gil_free(self, kernel, method, workers=1):
+        """Run a GIL-releasing kernel sequentially, on threads or on processes
+
+        The total work is fixed (GIL_FREE_UNITS chunks of GIL_FREE_CHUNK_KB)
+        and split evenly across the workers.
+        """
+        chunk_bytes = GIL_FREE_CHUNK_KB * 1024
+        units = max(GIL_FREE_UNITS, workers)
+        counts = [end - start for start, end in split_range(units, workers)]
+
+        if method == "sequential":
+            func = lambda: run_gil_free(kernel, units, chunk_bytes)
+        elif method == "threading":
+            executor = self.pools.thread_pool(workers)
+            func = lambda: sum(executor.map(run_gil_free, [kernel] * workers, counts, [chunk_bytes] * workers))
+        else:
+            pool = self.pools.process_pool(workers)
+            func = lambda: sum(pool.starmap(run_gil_free, [(kernel, c, chunk_bytes) for c in counts], chunksize=1))
+
+        _, elapsed, timing = self.measure(func)
+        return {
+            "method": method,
+            "workload": kernel,
+            "gil_bound": False,
+            "workers": workers,
+            "units": units,
+            "chunk_kb": GIL_FREE_CHUNK_KB,
+            "time_seconds": elapsed,
+            "mb_per_second": units * chunk_bytes / (1024 * 1024) / elapsed,
+            "free_threaded_build": self.gil["free_threaded_build"],
+            "gil_enabled": self.gil["gil_enabled"],
+            "timing": timing,
+        }
+
+    def gil_free_results(self):
+        """GIL-free kernels next to the pure-Python prime workload"""
+        results = {}
+        labels = {"threading": "threads", "multiprocessing": "processes"}
+        for kernel in self.gil_free_kernels:
+            key = f"gil_free_{kernel}_sequential"
+            if self.wants(key):
+                print(f"  - GIL-free {kernel} (sequential)...")
+                results[key] = self.gil_free(kernel, "sequential")
+            for method, label in labels.items():
+                for count in self.thread_counts:
+                    key = f"gil_free_{kernel}_{label}_{count}"
+                    if self.wants(key):
+                        print(f"  - GIL-free {kernel} ({count} {label})...")
+                        results[key] = self.gil_free(kernel, method, count)
+            sequential = results.get(f"gil_free_{kernel}_sequential")
+            if sequential:
+                for result in results.values():
+                    if result["workload"] == kernel:
+                        result["speedup"] = sequential["time_seconds"] / result["time_seconds"]
+        return results
+
+    def echo(self, method):
+        """Loopback echo throughput and latency for asyncio, asyncio on uvloop or a thread pool"""
+        clients = async_echo.max_clients(self.async_clients)
+        payload = b"x" * ASYNC_PAYLOAD_BYTES
+        # asyncio keeps every client in flight, so the thread pool gets a thread per client unless capped
+        concurrency = min(ASYNC_THREAD_WORKERS or clients, clients) if method == "thread_pool" else clients
+        if method == "thread_pool":
+            func = lambda: async_echo.run_threaded_echo(clients, ASYNC_REQUESTS_PER_CLIENT, payload,
+                                                        concurrency, ASYNC_TRANSPORT)
+        else:
+            func = lambda: async_echo.run_asyncio_echo(clients, ASYNC_REQUESTS_PER_CLIENT, payload,
+                                                       ASYNC_TRANSPORT, use_uvloop=method == "asyncio_uvloop")
+        latencies, elapsed, timing = self.measure(func)
+        requests = clients * ASYNC_REQUESTS_PER_CLIENT
+        return {
+            "method": method,
+            "workload": "echo",
+            "transport": ASYNC_TRANSPORT,
+            "clients": clients,
+            "requests": requests,
+            "payload_bytes": ASYNC_PAYLOAD_BYTES,
+            "workers": concurrency if method == "thread_pool" else 1,
+            "concurrency": concurrency,
+            "time_seconds": elapsed,
+            "requests_per_second": requests / elapsed,
+            "latency_p50_seconds": percentile(latencies, 0.50),
+            "latency_p95_seconds": percentile(latencies, 0.95),
+            "latency_p99_seconds": percentile(latencies, 0.99),
+            "latency_max_seconds": max(latencies),
+            "timing": timing,
+        }
+
+    def echo_results(self):
+        """asyncio echo server vs the same workload on a thread pool, plus uvloop when installed"""
+        results = {}
+        methods = [("asyncio_echo", "asyncio"), ("threadpool_echo", "thread_pool")]
+        if async_echo.uvloop is not None:
+            methods.insert(1, ("asyncio_uvloop_echo", "asyncio_uvloop"))
+        for key, method in methods:
+            if self.wants(key):
+                print(f"  - Echo server ({method.replace('_', ' ')}, {async_echo.max_clients(self.async_clients)} clients)...")
+                results[key] = self.echo(method)
+        asyncio_result = results.get("asyncio_echo")
+        if asyncio_result:
+            asyncio_result["uvloop_installed"] = async_echo.uvloop is not None
+            for result in results.values():
+                result["relative_to_asyncio"] = result["requests_per_second"] / asyncio_result["requests_per_second"]
+        return results
+
+    def pool_startup_results(self):
+        """Report pool creation and prewarm cost as separate entries"""
+        results = {}
+        for method, label in (("threading", "threads"), ("multiprocessing", "processes"), ("pinned", "pinned_processes")):
+            for count, seconds in sorted(self.pools.startup[method].items()):
+                results[f"pool_startup_{label}_{count}"] = {
+                    "method": "pool_startup",
+                    "pool_type": method,
+                    "worker_count": count,
+                    "startup_seconds": seconds,
+                }
+        return results
+
+    def strong_scaling(self, workers):
+        """Fixed total work split across pinned worker processes"""
+        task_size = self.scaling_task_size
+        chunks = self.partitioner.partition(task_size, workers)
+        pool = self.pools.pinned_process_pool(workers)
+
+        total, elapsed, timing = self.measure(lambda: sum(pool.starmap(count_primes_in_range, chunks, chunksize=1)))
+        self.partitioner.verify("strong scaling", total, self.expected_primes(task_size))
+        return {
+            "method": "strong_scaling",
+            "workers": workers,
+            "total_work": task_size,
+            "pinned": pinning_supported(),
+            "time_seconds": elapsed,
+            "total_primes": total,
+            "timing": timing,
+        }
+
+    def weak_scaling(self, workers):
+        """Fixed work per pinned worker process: every worker scans the same range"""
+        work = self.scaling_work_per_worker
+        chunks = [(0, work, 1)] * workers
+        pool = self.pools.pinned_process_pool(workers)
+
+        total, elapsed, timing = self.measure(lambda: sum(pool.starmap(count_primes_in_range, chunks, chunksize=1)))
+        self.partitioner.verify("weak scaling", total, self.expected_primes(work) * workers)
+        return {
+            "method": "weak_scaling",
+            "workers": workers,
+            "work_per_worker": work,
+            "total_work": work * workers,
+            "pinned": pinning_supported(),
+            "time_seconds": elapsed,
+            "total_primes": total,
+            "timing": timing,
+        }
+
+    def scaling_sweep(self, worker_counts=None):
+        """Strong and weak scaling over 1..cpu_count workers with Amdahl/Gustafson fits"""
+        worker_counts = worker_counts or scaling_worker_counts()
+        results = {}
+        for mode, method in (("strong", self.strong_scaling), ("weak", self.weak_scaling)):
+            if not any(self.wants(f"scaling_{mode}_{n}") for n in worker_counts):
+                continue
+            runs = {}
+            for workers in worker_counts:
+                key = f"scaling_{mode}_{workers}"
+                if not self.wants(key) and workers != 1:
+                    continue
+                print(f"  - {mode.capitalize()} scaling ({workers} workers)...")
+                self._run_verified(runs, key, method, workers)
+
+            baseline = runs.get(f"scaling_{mode}_1")
+            points = []
+            for result in runs.values():
+                n = result["workers"]
+                if baseline:
+                    ratio = baseline["time_seconds"] / result["time_seconds"]
+                    # Weak scaling does n times the work, so its speedup is scaled by n
+                    speedup = ratio * n if mode == "weak" else ratio
+                    result["speedup"] = speedup
+                    result["efficiency"] = speedup / n
+                    points.append((n, speedup))
+            results.update(runs)
+
+            fit = fit_amdahl(points) if mode == "strong" else fit_gustafson(points)
+            if fit is not None:
+                law = "amdahl" if mode == "strong" else "gustafson"
+                results[f"scaling_fit_{law}"] = {
+                    "method": "scaling_fit",
+                    "law": law,
+                    "worker_counts": [n for n, _ in sorted(points)],
+                    "parallel_fraction": fit,
+                    "serial_fraction": 1.0 - fit,
+                    "max_speedup": 1.0 / (1.0 - fit) if law == "amdahl" and fit < 1.0 else None,
+                }
+        return results
+
+    @staticmethod
+    def _run_verified(results, key, method, *args):
+        """Store a result only if its prime count matched the sequential reference"""
+        try:
+            results[key] = method(*args)
+        except PartitionMismatchError as e:
+            print(f"[ERROR] {key} rejected: {e}")
+
+    def run_all(self):
+        """Run all parallel benchmarks"""
+        results = self.new_results()
+
+        try:
+            # Create and prewarm every needed pool up front so no configuration pays for it
+            for count in self.thread_counts:
+                if any(self.wants(f"threading_{size}_{count}") for size in self.task_sizes):
+                    self.pools.thread_pool(count)
+                if any(self.wants(f"{prefix}_{size}_{count}") for size in self.task_sizes
+                       for prefix in ["multiprocessing"] + list(self.data_paths)):
+                    self.pools.process_pool(count)
+
+            for task_size in self.task_sizes:
+                if self.wants(f"sequential_{task_size}"):
+                    print(f"  - Sequential ({task_size} tasks)...")
+                    results[f"sequential_{task_size}"] = self.sequential(task_size)
+
+            for task_size in self.task_sizes:
+                for count in self.thread_counts:
+                    if self.wants(f"threading_{task_size}_{count}"):
+                        print(f"  - Threading ({task_size} tasks, {count} threads)...")
+                        self._run_verified(results, f"threading_{task_size}_{count}", self.threading, task_size, count)
+
+            for task_size in self.task_sizes:
+                for count in self.thread_counts:
+                    if self.wants(f"multiprocessing_{task_size}_{count}"):
+                        print(f"  - Multiprocessing ({task_size} tasks, {count} processes)...")
+                        self._run_verified(results, f"multiprocessing_{task_size}_{count}", self.multiprocessing, task_size, count)
+
+            # Same array workload through pickled slices and through shared memory
+            for path in self.data_paths:
+                for task_size in self.task_sizes:
+                    for count in self.thread_counts:
+                        key = f"{path}_{task_size}_{count}"
+                        if self.wants(key):
+                            print(f"  - {path.replace('_', ' ').capitalize()} data path ({task_size} tasks, {count} processes)...")
+                            self._run_verified(results, key, self.data_path, path, task_size, count)
+
+            results.update(self.gil_free_results())
+            results.update(self.echo_results())
+
+            if self.scaling:
+                results.update(self.scaling_sweep())
+
+            results.update(self.pool_startup_results())
+        finally:
+            self.pools.close()
+            for shared in self.shared_arrays.values():
+                shared.close()
+            self.shared_arrays.clear()
+
+        return results
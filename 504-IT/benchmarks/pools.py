@@ -0,0 +1,120 @@
+"""
+Persistent, prewarmed worker pools for the parallel benchmarks
+"""
+
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.kernels import is_prime
+from benchmarks.scaling import available_cpus
+
+
+def _warm_worker(_):
+    """Run a tiny kernel so the worker is started and its imports are done"""
+    is_prime(97)
+    return os.getpid()
+
+
+def _pin_worker(counter, cpus):
+    """Pool initializer: pin each new worker to the next CPU in cpus"""
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    os.sched_setaffinity(0, {cpus[index % len(cpus)]})
+
+
+def pinning_supported():
+    return hasattr(os, "sched_setaffinity")
+
+
+class WorkerPools:
+    """Create thread and process pools once and reuse them across configurations
+
+    Pools are keyed by worker count. Startup (construction plus prewarm) is
+    timed separately so steady-state throughput excludes it.
+    """
+
+    PREWARM_ROUNDS = 10
+
+    def __init__(self):
+        self.thread_pools = {}
+        self.process_pools = {}
+        self.pinned_pools = {}
+        self.startup = {"threading": {}, "multiprocessing": {}, "pinned": {}}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _prewarm_threads(self, executor, count):
+        """Make sure all threads of the executor exist"""
+        barrier = threading.Barrier(count)
+        futures = [executor.submit(barrier.wait) for _ in range(count)]
+        for future in futures:
+            future.result()
+
+    def _prewarm_processes(self, pool, count):
+        """Make sure every worker process has executed at least one task"""
+        seen = set()
+        for _ in range(self.PREWARM_ROUNDS):
+            seen.update(pool.map(_warm_worker, range(count * 4), chunksize=1))
+            if len(seen) >= count:
+                break
+
+    def thread_pool(self, count):
+        """Return a prewarmed thread pool with count workers"""
+        if count not in self.thread_pools:
+            start = time.perf_counter_ns()
+            executor = ThreadPoolExecutor(max_workers=count)
+            self._prewarm_threads(executor, count)
+            self.startup["threading"][count] = (time.perf_counter_ns() - start) / 1e9
+            self.thread_pools[count] = executor
+        return self.thread_pools[count]
+
+    def process_pool(self, count):
+        """Return a prewarmed process pool with count workers"""
+        if count not in self.process_pools:
+            start = time.perf_counter_ns()
+            pool = multiprocessing.Pool(processes=count)
+            self._prewarm_processes(pool, count)
+            self.startup["multiprocessing"][count] = (time.perf_counter_ns() - start) / 1e9
+            self.process_pools[count] = pool
+        return self.process_pools[count]
+
+    def pinned_process_pool(self, count):
+        """Return a prewarmed process pool whose workers are pinned to distinct CPUs
+
+        Falls back to an unpinned pool where CPU affinity is not supported.
+        """
+        if count not in self.pinned_pools:
+            start = time.perf_counter_ns()
+            if pinning_supported():
+                counter = multiprocessing.Value("i", 0)
+                pool = multiprocessing.Pool(processes=count, initializer=_pin_worker,
+                                            initargs=(counter, available_cpus()))
+            else:
+                pool = multiprocessing.Pool(processes=count)
+            self._prewarm_processes(pool, count)
+            self.startup["pinned"][count] = (time.perf_counter_ns() - start) / 1e9
+            self.pinned_pools[count] = pool
+        return self.pinned_pools[count]
+
+    def startup_seconds(self, method, count):
+        """Startup cost of a pool, or None if it was never created"""
+        return self.startup[method].get(count)
+
+    def close(self):
+        """Shut down all pools"""
+        for executor in self.thread_pools.values():
+            executor.shutdown(wait=True)
+        for pool in list(self.process_pools.values()) + list(self.pinned_pools.values()):
+            pool.close()
+            pool.join()
+        self.thread_pools.clear()
+        self.process_pools.clear()
+        self.pinned_pools.clear()
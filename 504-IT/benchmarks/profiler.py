@@ -0,0 +1,202 @@
+"""
+Per-case profiling of benchmark kernels with flamegraph-ready output
+
+A profiled case is measured as usual first, so its reported timing never
+includes profiler cost. The kernel then runs for at least
+PROFILER_MIN_SECONDS twice, unprofiled and profiled with the same number of
+calls, and the slowdown of the second pass is recorded as the profiler's
+overhead.
+
+Two profilers are available:
+
+- "sampling": SIGPROF fires every interval seconds of process CPU time and
+  the handler records the main thread's stack; overhead stays low and the
+  stacks are exact, but worker threads and processes are not seen.
+- "cprofile": deterministic cProfile. It only keeps caller/callee pairs,
+  so full stacks are reconstructed by splitting each function's time
+  across its callers in proportion to the time each caller spent in it.
+
+Stacks are written in the collapsed format ("outer;inner;leaf value" per
+line) read by flamegraph.pl, speedscope and inferno; cProfile runs also
+keep a .pstats dump for pstats and snakeviz.
+"""
+
+import os
+import re
+import math
+import time
+import signal
+import cProfile
+import pstats
+import threading
+from collections import Counter
+
+from config import PROFILE_DIR, PROFILER_SAMPLE_INTERVAL, PROFILER_MAX_DEPTH, PROFILER_MIN_SECONDS
+
+PROFILERS = ("sampling", "cprofile")
+
+
+def sampling_supported():
+    return hasattr(signal, "setitimer") and hasattr(signal, "SIGPROF")
+
+
+def frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def function_label(function):
+    """Label of a pstats (file, line, name) key, matching frame_label"""
+    filename, line, name = function
+    if filename == "~":  # built-in function
+        return name.strip("<>")
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def timed_calls(func, calls, setup=None):
+    """Wall seconds of calls calls to func, excluding setup() before each call"""
+    elapsed = 0.0
+    for _ in range(calls):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+def write_collapsed(stacks, path):
+    """Write stacks (tuple of labels, outermost first -> value) heaviest first"""
+    with open(path, "w") as f:
+        for stack, value in sorted(stacks.items(), key=lambda item: item[1], reverse=True):
+            if value > 0:
+                f.write(f"{';'.join(stack)} {int(round(value))}\n")
+    return path
+
+
+class SamplingProfiler:
+    """Collect main-thread stacks on SIGPROF; stack values are sample counts"""
+
+    def __init__(self, interval=PROFILER_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+
+    def _handler(self, signum, frame):
+        stack = []
+        while frame is not None and frame.f_code is not timed_calls.__code__:
+            stack.append(frame_label(frame.f_code))
+            frame = frame.f_back
+        if stack:
+            self.stacks[tuple(reversed(stack))[:PROFILER_MAX_DEPTH]] += 1
+
+    def run(self, func, calls, setup=None):
+        """Call func calls times under the profiler and return the wall seconds it took"""
+        previous = signal.signal(signal.SIGPROF, self._handler)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        try:
+            return timed_calls(func, calls, setup)
+        finally:
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, previous)
+
+    def save(self, base_path):
+        return {"stacks_file": write_collapsed(self.stacks, base_path + ".collapsed"),
+                "samples": sum(self.stacks.values()), "sample_interval_seconds": self.interval}
+
+
+class DeterministicProfiler:
+    """cProfile run converted to collapsed stacks weighted in microseconds"""
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def run(self, func, calls, setup=None):
+        elapsed = 0.0
+        for _ in range(calls):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            self.profile.enable()
+            try:
+                func()
+            finally:
+                self.profile.disable()
+            elapsed += time.perf_counter() - start
+        return elapsed
+
+    def collapsed(self):
+        """Rebuild stacks from caller/callee edges, splitting time by each caller's share"""
+        stats = pstats.Stats(self.profile).stats
+        callees = {}
+        for function, (_, _, _, _, callers) in stats.items():
+            for caller, edge in callers.items():
+                callees.setdefault(caller, []).append((function, edge[3]))
+        stacks = Counter()
+
+        def visit(function, stack, share):
+            _, _, own, cumulative, _ = stats[function]
+            if cumulative * share * 1e6 < 1:  # below the output resolution
+                return
+            stack = stack + (function_label(function),)
+            stacks[stack] += own * share * 1e6
+            if len(stack) >= PROFILER_MAX_DEPTH:
+                return
+            for callee, edge_cumulative in callees.get(function, []):
+                callee_cumulative = stats[callee][3]
+                if callee_cumulative > 0 and function_label(callee) not in stack:
+                    visit(callee, stack, share * edge_cumulative / callee_cumulative)
+
+        # Functions without profiled callers: the kernel itself (and the
+        # profiler's own disable() call, which is left out)
+        roots = [function for function, entry in stats.items()
+                 if not entry[4] and not (function[0] == "~" and "disable" in function[2])]
+        for root in roots:
+            visit(root, (), 1.0)
+        return stacks
+
+    def save(self, base_path):
+        self.profile.dump_stats(base_path + ".pstats")
+        return {"stacks_file": write_collapsed(self.collapsed(), base_path + ".collapsed"),
+                "pstats_file": base_path + ".pstats"}
+
+
+class CaseProfiler:
+    """Profile one pass of each measured kernel and write its stacks under a run directory"""
+
+    def __init__(self, mode="sampling", directory=None, interval=PROFILER_SAMPLE_INTERVAL):
+        if mode not in PROFILERS:
+            raise ValueError(f"unknown profiler {mode!r} (choose from {', '.join(PROFILERS)})")
+        if mode == "sampling" and not sampling_supported():
+            print("[ERROR] Signal-based sampling is not available on this platform, using cProfile")
+            mode = "cprofile"
+        self.mode = mode
+        self.interval = interval
+        self.directory = directory or os.path.join(PROFILE_DIR, time.strftime("%Y%m%d_%H%M%S"))
+
+    def profile(self, func, median_seconds, setup=None):
+        """Time an unprofiled and a profiled pass of func with the same call count
+
+        median_seconds, the measured time of one call, sizes the passes.
+        Returns the profiler (for save) and the entry describing the run,
+        or None where the profiler cannot run.
+        """
+        if self.mode == "sampling" and threading.current_thread() is not threading.main_thread():
+            return None
+        calls = max(1, math.ceil(PROFILER_MIN_SECONDS / median_seconds)) if median_seconds > 0 else 1
+        clean = timed_calls(func, calls, setup)
+        profiler = SamplingProfiler(self.interval) if self.mode == "sampling" else DeterministicProfiler()
+        profiled = profiler.run(func, calls, setup)
+        return profiler, {
+            "profiler": self.mode,
+            "calls": calls,
+            "clean_seconds": clean / calls,
+            "profiled_seconds": profiled / calls,
+            "overhead_percent": 100.0 * (profiled / clean - 1.0) if clean > 0 else None,
+        }
+
+    def save(self, suite, case, profiled):
+        """Write the stacks of a profiled case and return its profile entry"""
+        profiler, entry = profiled
+        os.makedirs(self.directory, exist_ok=True)
+        base_path = os.path.join(self.directory, re.sub(r"[^A-Za-z0-9_.-]", "_", f"{suite}_{case}"))
+        entry.update(profiler.save(base_path))
+        return entry
@@ -0,0 +1,180 @@
+"""
+Background resource sampler for benchmark runs
+
+A daemon thread records CPU frequency, per-core utilization, process RSS,
+context switches and steal time into preallocated NumPy ring buffers, so
+sampling writes in place instead of growing lists while a case runs.
+Each measured case is a window between two sample counts; its summary is
+attached to the result entry and flags throttled runs (frequency below the
+base frequency, or below the peak seen during the run where the base is
+unknown) and noisy-neighbor runs (hypervisor steal time, or busy CPU time
+that this process tree does not account for).
+"""
+
+import os
+import time
+import threading
+
+import numpy as np
+import psutil
+
+from config import (SAMPLER_INTERVAL_SECONDS, SAMPLER_CAPACITY, SAMPLER_THROTTLE_RATIO, SAMPLER_STEAL_PERCENT,
+                    SAMPLER_OTHER_CPU_PERCENT)
+
+# Columns of the sample ring buffer; OWN_CPU is only filled by mark()
+TIME, FREQ_MHZ, CPU_PERCENT, RSS, CTX_VOLUNTARY, CTX_INVOLUNTARY, CPU_TOTAL, CPU_IDLE, CPU_STEAL, OWN_CPU = range(10)
+COLUMNS = 10
+
+# CPU times are counted in clock ticks; two ticks of slack absorb the rounding
+# of the system-wide and per-process counters
+CPU_TIME_SLACK = 2.0 / os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 0.02
+
+BASE_FREQUENCY_PATH = "/sys/devices/system/cpu/cpu0/cpufreq/base_frequency"
+
+
+def base_freq_mhz():
+    """Non-turbo base frequency where the cpufreq driver exposes it (intel_pstate), else None
+
+    psutil's maximum is usually the turbo ceiling, which sustained runs
+    rarely hold, so it would mark normal runs as throttled.
+    """
+    try:
+        with open(BASE_FREQUENCY_PATH) as f:
+            return int(f.read()) / 1000.0
+    except (OSError, ValueError):
+        return None
+
+
+class ResourceSampler:
+    """Sample machine and process state every interval seconds on a daemon thread"""
+
+    def __init__(self, interval=SAMPLER_INTERVAL_SECONDS, capacity=SAMPLER_CAPACITY):
+        self.interval = interval
+        self.capacity = capacity
+        self.process = psutil.Process()
+        self.cores = psutil.cpu_count() or 1
+        self.samples = np.full((capacity, COLUMNS), np.nan)
+        self.core_percent = np.full((capacity, self.cores), np.nan)
+        self.count = 0
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.base_mhz = base_freq_mhz()
+        psutil.cpu_percent(percpu=True)  # prime the utilization counters
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def own_cpu_seconds(self):
+        """CPU time of this process and its children (live workers and reaped ones)"""
+        total = sum(self.process.cpu_times()[:4])
+        for child in self.process.children(recursive=True):
+            try:
+                total += sum(child.cpu_times()[:2])
+            except psutil.Error:
+                pass
+        return total
+
+    def sample(self, own_cpu=np.nan):
+        """Take one sample into the next ring slot and return the new sample count"""
+        freq = psutil.cpu_freq()
+        per_core = psutil.cpu_percent(percpu=True)
+        memory = self.process.memory_info()
+        switches = self.process.num_ctx_switches()
+        cpu = psutil.cpu_times()
+        with self.lock:
+            row = self.samples[self.count % self.capacity]
+            row[TIME] = time.perf_counter()
+            row[FREQ_MHZ] = freq.current if freq else np.nan
+            row[CPU_PERCENT] = sum(per_core) / len(per_core)
+            row[RSS] = memory.rss
+            row[CTX_VOLUNTARY] = switches.voluntary
+            row[CTX_INVOLUNTARY] = switches.involuntary
+            row[CPU_TOTAL] = sum(cpu)
+            row[CPU_IDLE] = cpu.idle + getattr(cpu, "iowait", 0.0)
+            row[CPU_STEAL] = getattr(cpu, "steal", 0.0)
+            row[OWN_CPU] = own_cpu
+            self.core_percent[self.count % self.capacity, :len(per_core)] = per_core
+            self.count += 1
+            return self.count
+
+    def _loop(self):
+        while not self.stop_event.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        if self.thread is None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._loop, name="resource-sampler", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+
+    def mark(self):
+        """Sample now and return the count that opens or closes a window"""
+        return self.sample(self.own_cpu_seconds())
+
+    def summarize(self, start, end):
+        """Summary statistics for the samples taken from count start to count end
+
+        The window always includes its two mark() samples; samples already
+        overwritten by the ring are dropped from the front.
+        """
+        with self.lock:
+            first = max(start - 1, end - self.capacity, 0)
+            indices = np.arange(first, end) % self.capacity
+            window = self.samples[indices].copy()
+            cores = self.core_percent[indices[1:]].copy() if len(indices) > 1 else self.core_percent[indices].copy()
+
+        duration = window[-1, TIME] - window[0, TIME]
+        cpu_delta = window[-1, CPU_TOTAL] - window[0, CPU_TOTAL]
+        steal = window[-1, CPU_STEAL] - window[0, CPU_STEAL]
+        busy = cpu_delta - (window[-1, CPU_IDLE] - window[0, CPU_IDLE]) - steal
+        own = window[-1, OWN_CPU] - window[0, OWN_CPU]
+        involuntary = int(window[-1, CTX_INVOLUNTARY] - window[0, CTX_INVOLUNTARY])
+        frequencies = window[:, FREQ_MHZ]
+        has_freq = not np.all(np.isnan(frequencies))
+        utilization = window[1:, CPU_PERCENT] if len(window) > 1 else window[:, CPU_PERCENT]
+
+        stats = {
+            "samples": len(window),
+            "duration_seconds": float(duration),
+            "mean_freq_mhz": float(np.nanmean(frequencies)) if has_freq else None,
+            "min_freq_mhz": float(np.nanmin(frequencies)) if has_freq else None,
+            "max_rss_mb": float(np.max(window[:, RSS]) / (1024 * 1024)),
+            "mean_cpu_percent": float(np.mean(utilization)),
+            "max_core_percent": float(np.nanmax(cores)) if not np.all(np.isnan(cores)) else None,
+            "voluntary_ctx_switches": int(window[-1, CTX_VOLUNTARY] - window[0, CTX_VOLUNTARY]),
+            "involuntary_ctx_switches": involuntary,
+            "steal_percent": float(100.0 * steal / cpu_delta) if cpu_delta > 0 else 0.0,
+            # Busy CPU time of everything except this process tree, as a share of all CPUs
+            "other_cpu_percent": (float(max(0.0, 100.0 * (busy - own - CPU_TIME_SLACK) / cpu_delta))
+                                  if cpu_delta > 0 and not np.isnan(own) else None),
+        }
+        stats["flags"] = self.flags(stats)
+        return stats
+
+    def flags(self, stats):
+        """Name the conditions that make a case's timing suspect"""
+        flags = []
+        reference = self.base_mhz or self.peak_freq_mhz()
+        if stats["mean_freq_mhz"] and reference and stats["mean_freq_mhz"] < SAMPLER_THROTTLE_RATIO * reference:
+            flags.append("throttled")
+        other = stats["other_cpu_percent"] or 0.0
+        if stats["steal_percent"] > SAMPLER_STEAL_PERCENT or other > SAMPLER_OTHER_CPU_PERCENT:
+            flags.append("noisy_neighbor")
+        return flags
+
+    def peak_freq_mhz(self):
+        """Highest frequency seen in the ring, the throttling reference when no base frequency is known"""
+        with self.lock:
+            filled = self.samples[:min(self.count, self.capacity), FREQ_MHZ]
+            return float(np.nanmax(filled)) if len(filled) and not np.all(np.isnan(filled)) else None
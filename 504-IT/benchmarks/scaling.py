@@ -0,0 +1,53 @@
+"""
+Core-scaling helpers: worker-count sweep and Amdahl/Gustafson fits
+"""
+
+import os
+
+
+def available_cpus():
+    """CPUs this process may run on (affinity-aware where supported)"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def scaling_worker_counts(max_workers=None):
+    """Powers of two from 1 up to max_workers, plus max_workers itself"""
+    max_workers = max_workers or len(available_cpus())
+    counts = []
+    n = 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    counts.append(max_workers)
+    return counts
+
+
+def fit_amdahl(points):
+    """Least-squares parallel fraction p from strong-scaling (workers, speedup) points
+
+    Amdahl: S(n) = 1 / ((1 - p) + p / n), i.e. 1 - 1/S = p * (1 - 1/n).
+    """
+    pairs = [(1.0 - 1.0 / n, 1.0 - 1.0 / s) for n, s in points if n > 1 and s > 0]
+    denominator = sum(x * x for x, _ in pairs)
+    if not denominator:
+        return None
+    return min(1.0, max(0.0, sum(x * y for x, y in pairs) / denominator))
+
+
+def fit_gustafson(points):
+    """Least-squares parallel fraction p from weak-scaling (workers, scaled speedup) points
+
+    Gustafson: S(n) = (1 - p) + p * n, i.e. S - 1 = p * (n - 1).
+    """
+    pairs = [(n - 1.0, s - 1.0) for n, s in points if n > 1]
+    denominator = sum(x * x for x, _ in pairs)
+    if not denominator:
+        return None
+    return min(1.0, max(0.0, sum(x * y for x, y in pairs) / denominator))
+
+
+def amdahl_speedup(p, n):
+    """Predicted strong-scaling speedup for parallel fraction p on n workers"""
+    return 1.0 / ((1.0 - p) + p / n)
@@ -0,0 +1,61 @@
+"""
+Work partitioning for the parallel prime workload
+"""
+
+from config import PARALLEL_PARTITION_STRATEGY, PARALLEL_CHUNKS_PER_WORKER
+
+STRATEGIES = ("contiguous", "strided", "dynamic")
+
+
+class PartitionMismatchError(ValueError):
+    """A parallel run produced a different answer than the sequential reference"""
+
+
+def split_range(task_size, workers):
+    """Split [0, task_size) into contiguous, non-overlapping (start, end) chunks"""
+    step, remainder = divmod(task_size, workers)
+    chunks = []
+    start = 0
+    for i in range(workers):
+        end = start + step + (1 if i < remainder else 0)
+        chunks.append((start, end))
+        start = end
+    return chunks
+
+
+class PrimePartitioner:
+    """Split the numbers [0, task_size) into (start, end, step) work items
+
+    - contiguous: one equal-sized block per worker
+    - strided: worker i takes the odd numbers 2i + 1, 2i + 1 + 2 * workers,
+      ... so every worker gets a similar mix of small and large candidates;
+      2 is a separate one-number item. Striding over all numbers would hand
+      the even offsets only even numbers, which is_prime rejects at once.
+    - dynamic: many small blocks handed out one at a time, so idle workers
+      keep pulling work until the queue is empty
+    """
+
+    def __init__(self, strategy=PARALLEL_PARTITION_STRATEGY, chunks_per_worker=PARALLEL_CHUNKS_PER_WORKER):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown partition strategy '{strategy}', expected one of {STRATEGIES}")
+        self.strategy = strategy
+        self.chunks_per_worker = max(1, chunks_per_worker)
+
+    def partition(self, task_size, workers):
+        """Return the list of (start, end, step) work items"""
+        workers = max(1, min(workers, task_size))
+        if self.strategy == "strided":
+            chunks = [(2 * i + 1, task_size, 2 * workers) for i in range(workers)]
+            return chunks + [(2, 3, 1)] if task_size > 2 else chunks
+        if self.strategy == "dynamic":
+            pieces = min(task_size, workers * self.chunks_per_worker)
+            return [(start, end, 1) for start, end in split_range(task_size, pieces)]
+        return [(start, end, 1) for start, end in split_range(task_size, workers)]
+
+    @staticmethod
+    def verify(method, total, expected):
+        """Raise PartitionMismatchError unless total matches the sequential reference"""
+        if total != expected:
+            raise PartitionMismatchError(
+                f"{method} counted {total} primes, sequential reference is {expected}"
+            )
@@ -0,0 +1,111 @@
+"""
+Data paths for handing the parallel workload's input array to worker processes
+
+- pickle: every work item carries its slice of the array, so the data is
+  serialized in the parent and deserialized in the worker on every run
+- shared_memory: the array lives in one multiprocessing.shared_memory segment
+  and work items carry only (name, length, start, end, step); workers count
+  over a zero-copy NumPy view of the segment
+"""
+
+import os
+import time
+import pickle
+from multiprocessing import shared_memory, resource_tracker
+
+from benchmarks.kernels import is_prime
+
+DATA_PATHS = ("pickle", "shared_memory")
+
+# Per-process attachment to the current segment: (name, SharedMemory, ndarray)
+_attached = []
+
+
+def count_primes_in_values(values):
+    """Count primes in a NumPy array; returns (count, compute_seconds, worker pid)"""
+    start = time.perf_counter_ns()
+    count = sum(1 for n in values.tolist() if is_prime(n))
+    return count, (time.perf_counter_ns() - start) / 1e9, os.getpid()
+
+
+def _open_segment(name):
+    """Attach to an existing segment without letting this process's tracker own it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 registers every attachment. Forked workers share the
+        # creator's tracker, where a later unregister would drop the
+        # creator's own entry, so skip registering instead
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def attach_shared(name, length):
+    """int64 view of the named segment, attached once per worker process"""
+    import numpy as np
+    if not _attached or _attached[0] != name:
+        if _attached:
+            _, shm, _ = _attached
+            _attached.clear()
+            shm.close()
+        shm = _open_segment(name)
+        _attached.extend((name, shm, np.ndarray(length, dtype=np.int64, buffer=shm.buf)))
+    return _attached[2]
+
+
+def count_primes_in_shared(name, length, start, end, step=1):
+    """Count primes in array[start:end:step] of a shared int64 array"""
+    return count_primes_in_values(attach_shared(name, length)[start:end:step])
+
+
+class SharedArray:
+    """Owner of an int64 array copied into a shared memory segment
+
+    Creation (allocation plus copy) is timed separately, like pool startup,
+    and the segment is unlinked on close.
+    """
+
+    def __init__(self, values):
+        import numpy as np
+        start = time.perf_counter_ns()
+        self.length = len(values)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, values.nbytes))
+        self.array = np.ndarray(self.length, dtype=np.int64, buffer=self.shm.buf)
+        self.array[:] = values
+        self.setup_seconds = (time.perf_counter_ns() - start) / 1e9
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.array = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+def serialization_cost(payloads, repeats=5):
+    """Pickled size in bytes and best-of-repeats dumps+loads time for payloads
+
+    This is the serialization half of the IPC cost; pipe transfer and
+    scheduling show up in the difference between wall and compute time.
+    """
+    size = sum(len(pickle.dumps(p, protocol=pickle.HIGHEST_PROTOCOL)) for p in payloads)
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        for payload in payloads:
+            pickle.loads(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+        elapsed = (time.perf_counter_ns() - start) / 1e9
+        best = elapsed if best is None else min(best, elapsed)
+    return size, best
@@ -0,0 +1,119 @@
+"""
+Segmented Sieve of Eratosthenes on NumPy boolean arrays
+
+Only odd numbers are stored (one byte each), and the range is processed in
+fixed-size segments so memory stays bounded by the segment size plus the
+base primes up to sqrt(limit), however large the limit is. Ranges of
+segments can be handed to worker processes; the functions are kept at
+module level so they can be pickled.
+"""
+
+import multiprocessing
+from math import isqrt
+
+import numpy as np
+import psutil
+
+# Per-process base primes, keyed by the square-root bound they cover
+_base_primes = {}
+
+
+def rss_bytes():
+    return psutil.Process().memory_info().rss
+
+
+def simple_sieve(limit):
+    """All primes <= limit as an int64 array (plain, unsegmented sieve)"""
+    if limit < 2:
+        return np.empty(0, dtype=np.int64)
+    is_prime = np.ones(limit + 1, dtype=bool)
+    is_prime[:2] = False
+    for p in range(2, isqrt(limit) + 1):
+        if is_prime[p]:
+            is_prime[p * p::p] = False
+    return np.flatnonzero(is_prime)
+
+
+def base_primes(limit):
+    """Odd primes up to sqrt(limit), computed once per process"""
+    bound = isqrt(max(limit - 1, 0))
+    if bound not in _base_primes:
+        primes = simple_sieve(bound)
+        _base_primes[bound] = primes[primes > 2].tolist()
+    return _base_primes[bound]
+
+
+def count_primes_segmented(low, high, segment_bytes):
+    """Count primes in [low, high) one segment at a time
+
+    Each segment covers segment_bytes odd numbers. Returns
+    (prime count, segments processed, RSS growth in KB). The growth is the
+    highest RSS seen after any segment minus the RSS before the call, so
+    it covers this call only, not the process's earlier peak (which
+    ru_maxrss would report, including whatever a forked worker inherited).
+    """
+    rss_before = rss_bytes()
+    rss_peak = rss_before
+    primes = base_primes(high)
+    segment = np.empty(max(1, segment_bytes), dtype=bool)
+    count = 1 if low <= 2 < high else 0
+    segments = 0
+    start = max(low, 3) | 1  # first odd number >= max(low, 3)
+    span = 2 * len(segment)
+    while start < high:
+        end = min(start + span, high)
+        length = (end - start + 1) // 2
+        view = segment[:length]
+        view[:] = True
+        for p in primes:
+            square = p * p
+            if square >= end:
+                break
+            first = max(square, -(-start // p) * p)
+            if first % 2 == 0:
+                first += p
+            view[(first - start) // 2::p] = False
+        count += int(np.count_nonzero(view))
+        segments += 1
+        rss_peak = max(rss_peak, rss_bytes())
+        start = end if end % 2 else end + 1
+    return count, segments, (rss_peak - rss_before) // 1024
+
+
+def segmented_sieve(limit, segment_bytes, pool=None, workers=1):
+    """Count primes below limit, optionally spreading blocks of segments over a pool
+
+    The range is cut on segment boundaries into a few blocks per worker so
+    uneven blocks balance out. Returns (prime count, segments, largest RSS
+    growth in KB of any one block).
+    """
+    if pool is None or workers <= 1:
+        return count_primes_segmented(0, limit, segment_bytes)
+
+    span = 2 * segment_bytes
+    total_segments = max(1, -(-limit // span))
+    blocks = min(total_segments, workers * 4)
+    per_block, remainder = divmod(total_segments, blocks)
+    ranges = []
+    start = 0
+    for i in range(blocks):
+        end = min(limit, start + (per_block + (1 if i < remainder else 0)) * span)
+        ranges.append((start, end, segment_bytes))
+        start = end
+    replies = pool.starmap(count_primes_segmented, ranges, chunksize=1)
+    return (sum(count for count, _, _ in replies), sum(segments for _, segments, _ in replies),
+            max(growth for _, _, growth in replies))
+
+
+def memory_footprint(limit, segment_bytes, workers=1):
+    """RSS growth in KB of one untimed sieve run in freshly spawned processes
+
+    Timed runs reuse memory freed by their warmups and pooled or forked
+    workers start from the parent's memory, so neither shows what the sieve
+    itself needs. Spawned processes start cold and report the growth of
+    their own call: the segment buffer plus the base primes.
+    """
+    with multiprocessing.get_context("spawn").Pool(max(1, workers)) as pool:
+        if workers <= 1:
+            return pool.apply(count_primes_segmented, (0, limit, segment_bytes))[2]
+        return segmented_sieve(limit, segment_bytes, pool, workers)[2]
@@ -0,0 +1,298 @@
+"""
+Storage I/O benchmarks: sequential and random reads/writes, O_DIRECT,
+fsync latency and mmap vs buffered reads
+"""
+
+import os
+import mmap
+import time
+import random
+import shutil
+import statistics
+
+from config import STORAGE_DIR, STORAGE_FILE_MB, STORAGE_BLOCK_SIZES_KB, STORAGE_RANDOM_OPS
+from benchmarks.base import BaseBenchmark
+from benchmarks.timing import percentile
+
+MB = 1024 * 1024
+
+
+def direct_io_supported():
+    return hasattr(os, "O_DIRECT") and hasattr(os, "preadv")
+
+
+def drop_cache(fd):
+    """Ask the kernel to evict a file's clean pages; returns False if it cannot"""
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    return True
+
+
+class StorageBenchmark(BaseBenchmark):
+    """Benchmark the disk behind a configurable scratch directory
+
+    Buffered reads are taken with a cold page cache where posix_fadvise can
+    evict the file. The mmap and buffered-read comparison runs with a hot
+    cache, so it shows the cost of the read path rather than of the device.
+    O_DIRECT cases use page-aligned mmap buffers (os.pread allocates an
+    unaligned result, so reads go through os.preadv) and are skipped where
+    the platform or filesystem refuses O_DIRECT.
+    """
+
+    name = "storage"
+
+    def __init__(self, directory=None, file_mb=None, block_sizes_kb=None, random_ops=None, timer=None,
+                 case_filter=None):
+        super().__init__(timer, case_filter)
+        self.directory = directory or STORAGE_DIR
+        self.file_mb = file_mb or STORAGE_FILE_MB
+        self.block_sizes_kb = block_sizes_kb or STORAGE_BLOCK_SIZES_KB
+        self.random_ops = random_ops or STORAGE_RANDOM_OPS
+        self.path = os.path.join(self.directory, "storage_benchmark.dat")
+        self.rng = random.Random(0)
+
+    @property
+    def file_bytes(self):
+        return self.file_mb * MB
+
+    def _offsets(self, block):
+        """Random block-aligned offsets inside the test file"""
+        blocks = self.file_bytes // block
+        return [self.rng.randrange(blocks) * block for _ in range(min(self.random_ops, blocks))]
+
+    def _result(self, operation, block_kb, total_bytes, elapsed, timing, **extra):
+        return {
+            "operation": operation,
+            "block_kb": block_kb,
+            "file_mb": self.file_mb,
+            "bytes": total_bytes,
+            "time_seconds": elapsed,
+            "mb_per_second": total_bytes / MB / elapsed,
+            **extra,
+            "timing": timing,
+        }
+
+    def prepare_file(self):
+        """Write the test file once so every read case has data to read"""
+        os.makedirs(self.directory, exist_ok=True)
+        chunk = os.urandom(MB)
+        with open(self.path, "wb") as f:
+            for _ in range(self.file_mb):
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def sequential_write(self, block_kb):
+        """Rewrite the whole file in block_kb writes, then fsync"""
+        block = os.urandom(block_kb * 1024)
+        count = self.file_bytes // len(block)
+        fd = os.open(self.path, os.O_WRONLY)
+
+        def run():
+            os.lseek(fd, 0, os.SEEK_SET)
+            for _ in range(count):
+                os.write(fd, block)
+            os.fsync(fd)
+
+        try:
+            _, elapsed, timing = self.measure(run)
+        finally:
+            os.close(fd)
+        return self._result("sequential_write", block_kb, count * len(block), elapsed, timing)
+
+    def sequential_read(self, block_kb):
+        """Read the whole file in block_kb reads from a cold page cache"""
+        size = block_kb * 1024
+        fd = os.open(self.path, os.O_RDONLY)
+        cold = drop_cache(fd)
+
+        def run():
+            os.lseek(fd, 0, os.SEEK_SET)
+            total = 0
+            while True:
+                data = os.read(fd, size)
+                if not data:
+                    return total
+                total += len(data)
+
+        try:
+            total, elapsed, timing = self.measure(run, setup=lambda: drop_cache(fd))
+        finally:
+            os.close(fd)
+        return self._result("sequential_read", block_kb, total, elapsed, timing, cache="cold" if cold else "unknown")
+
+    def random_read(self, block_kb):
+        """os.pread at random aligned offsets from a cold page cache"""
+        size = block_kb * 1024
+        offsets = self._offsets(size)
+        fd = os.open(self.path, os.O_RDONLY)
+        cold = drop_cache(fd)
+
+        def run():
+            for offset in offsets:
+                os.pread(fd, size, offset)
+
+        try:
+            _, elapsed, timing = self.measure(run, setup=lambda: drop_cache(fd))
+        finally:
+            os.close(fd)
+        return self._result("random_read", block_kb, len(offsets) * size, elapsed, timing,
+                            iops=len(offsets) / elapsed, cache="cold" if cold else "unknown")
+
+    def random_write(self, block_kb):
+        """os.pwrite at random aligned offsets, then fsync"""
+        block = os.urandom(block_kb * 1024)
+        offsets = self._offsets(len(block))
+        fd = os.open(self.path, os.O_WRONLY)
+
+        def run():
+            for offset in offsets:
+                os.pwrite(fd, block, offset)
+            os.fsync(fd)
+
+        try:
+            _, elapsed, timing = self.measure(run)
+        finally:
+            os.close(fd)
+        return self._result("random_write", block_kb, len(offsets) * len(block), elapsed, timing,
+                            iops=len(offsets) / elapsed)
+
+    def direct_io(self, mode, block_kb):
+        """Random O_DIRECT reads or writes through a page-aligned buffer
+
+        Returns None when O_DIRECT is not available for the directory.
+        """
+        size = block_kb * 1024
+        offsets = self._offsets(size)
+        try:
+            fd = os.open(self.path, (os.O_RDONLY if mode == "read" else os.O_WRONLY) | os.O_DIRECT)
+        except OSError:
+            return None
+        buffer = mmap.mmap(-1, size)
+        buffer.write(os.urandom(size))
+
+        if mode == "read":
+            def run():
+                for offset in offsets:
+                    os.preadv(fd, [buffer], offset)
+        else:
+            def run():
+                for offset in offsets:
+                    os.pwrite(fd, buffer, offset)
+                os.fsync(fd)
+
+        try:
+            _, elapsed, timing = self.measure(run)
+        except OSError:
+            return None
+        finally:
+            os.close(fd)
+            buffer.close()
+        return self._result(f"direct_{mode}", block_kb, len(offsets) * size, elapsed, timing,
+                            iops=len(offsets) / elapsed, direct=True)
+
+    def fsync_latency(self):
+        """Latency percentiles of a 4 KB pwrite followed by fsync
+
+        Each timed call is one pwrite and fsync; every call records its own
+        latency, and the percentiles use the calls of the measured
+        repetitions only.
+        """
+        block = os.urandom(4096)
+        blocks = self.file_bytes // 4096
+        latencies = []
+        fd = os.open(self.path, os.O_WRONLY)
+
+        def run():
+            start = time.perf_counter_ns()
+            os.pwrite(fd, block, (len(latencies) % blocks) * 4096)
+            os.fsync(fd)
+            latencies.append((time.perf_counter_ns() - start) / 1e9)
+
+        try:
+            _, _, timing = self.measure(run)
+        finally:
+            os.close(fd)
+        latencies = self.measured_calls(latencies, timing)
+        return {
+            "operation": "fsync",
+            "samples": len(latencies),
+            "time_seconds": statistics.median(latencies),
+            "p50_seconds": percentile(latencies, 0.50),
+            "p95_seconds": percentile(latencies, 0.95),
+            "p99_seconds": percentile(latencies, 0.99),
+            "max_seconds": max(latencies),
+            "timing": timing,
+        }
+
+    def mmap_read(self, block_kb):
+        """Copy the file through an mmap view in block_kb pieces (hot cache)"""
+        size = block_kb * 1024
+        target = bytearray(size)
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+
+            def run():
+                for offset in range(0, len(mapped) - size + 1, size):
+                    target[:] = view[offset:offset + size]
+
+            try:
+                _, elapsed, timing = self.measure(run)
+            finally:
+                view.release()
+        return self._result("mmap_read", block_kb, self.file_bytes // size * size, elapsed, timing, cache="hot")
+
+    def buffered_read(self, block_kb):
+        """Copy the file with readinto in block_kb pieces (hot cache)"""
+        size = block_kb * 1024
+        target = bytearray(size)
+        with open(self.path, "rb") as f:
+            def run():
+                f.seek(0)
+                while f.readinto(target) == size:
+                    pass
+
+            _, elapsed, timing = self.measure(run)
+        return self._result("buffered_read", block_kb, self.file_bytes // size * size, elapsed, timing, cache="hot")
+
+    def run_all(self):
+        """Run all storage benchmarks"""
+        results = self.new_results()
+        created = not os.path.isdir(self.directory)
+
+        try:
+            print(f"  - Preparing {self.file_mb}MB test file in {self.directory}...")
+            self.prepare_file()
+
+            cases = [("seq_write", "Sequential write", self.sequential_write),
+                     ("seq_read", "Sequential read", self.sequential_read),
+                     ("rand_write", "Random write", self.random_write),
+                     ("rand_read", "Random read", self.random_read)]
+            if direct_io_supported():
+                cases += [("direct_write", "O_DIRECT write", lambda kb: self.direct_io("write", kb)),
+                          ("direct_read", "O_DIRECT read", lambda kb: self.direct_io("read", kb))]
+            cases += [("mmap_read", "mmap read", self.mmap_read),
+                      ("buffered_read", "Buffered read", self.buffered_read)]
+
+            for prefix, title, method in cases:
+                for block_kb in self.block_sizes_kb:
+                    key = f"{prefix}_{block_kb}kb"
+                    if self.wants(key):
+                        print(f"  - {title} ({block_kb}KB blocks)...")
+                        result = method(block_kb)
+                        if result is None:
+                            print(f"[ERROR] {key} skipped: O_DIRECT not supported in {self.directory}")
+                        else:
+                            results[key] = result
+
+            if self.wants("fsync_latency"):
+                print("  - fsync latency...")
+                results["fsync_latency"] = self.fsync_latency()
+        finally:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            if created:
+                shutil.rmtree(self.directory, ignore_errors=True)
+
+        return results
@@ -0,0 +1,147 @@
+"""
+Shared measurement engine for benchmark kernels
+"""
+
+import math
+import random
+import statistics
+import time
+
+from config import (
+    TIMING_WARMUP_RUNS,
+    TIMING_TARGET_SECONDS,
+    TIMING_REPETITIONS,
+    TIMING_MAX_ITERATIONS,
+    TIMING_BOOTSTRAP_RESAMPLES,
+    TIMING_CONFIDENCE,
+)
+
+
+def percentile(values, fraction):
+    """Linearly interpolated percentile of a list of numbers (fraction in [0, 1])"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    position = (len(ordered) - 1) * fraction
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def bootstrap_ci(samples, resamples=TIMING_BOOTSTRAP_RESAMPLES, confidence=TIMING_CONFIDENCE, seed=0):
+    """Bootstrap confidence interval for the median of the samples"""
+    if len(samples) < 2:
+        return samples[0], samples[0]
+    rng = random.Random(seed)
+    medians = [
+        statistics.median(rng.choices(samples, k=len(samples)))
+        for _ in range(resamples)
+    ]
+    alpha = (1.0 - confidence) / 2.0
+    return percentile(medians, alpha), percentile(medians, 1.0 - alpha)
+
+
+class BenchmarkTimer:
+    """Time a kernel with warmup, iteration calibration and repeated runs"""
+
+    def __init__(self, warmup_runs=TIMING_WARMUP_RUNS, target_seconds=TIMING_TARGET_SECONDS,
+                 repetitions=TIMING_REPETITIONS, max_iterations=TIMING_MAX_ITERATIONS,
+                 bootstrap_resamples=TIMING_BOOTSTRAP_RESAMPLES, confidence=TIMING_CONFIDENCE):
+        self.warmup_runs = warmup_runs
+        self.target_ns = int(target_seconds * 1e9)
+        self.repetitions = max(1, repetitions)
+        self.max_iterations = max_iterations
+        self.bootstrap_resamples = bootstrap_resamples
+        self.confidence = confidence
+
+    def settings(self):
+        """Constructor arguments that recreate this timer, e.g. in a subprocess"""
+        return {
+            "warmup_runs": self.warmup_runs,
+            "target_seconds": self.target_ns / 1e9,
+            "repetitions": self.repetitions,
+            "max_iterations": self.max_iterations,
+            "bootstrap_resamples": self.bootstrap_resamples,
+            "confidence": self.confidence,
+        }
+
+    @staticmethod
+    def _run(func, iterations, setup=None):
+        """Call func the given number of times, returning (elapsed_ns, last result)
+
+        With a setup function each call is timed on its own so setup stays
+        outside the measured time.
+        """
+        value = None
+        if setup:
+            elapsed_ns = 0
+            for _ in range(iterations):
+                setup()
+                start = time.perf_counter_ns()
+                value = func()
+                elapsed_ns += time.perf_counter_ns() - start
+            return elapsed_ns, value
+        start = time.perf_counter_ns()
+        for _ in range(iterations):
+            value = func()
+        return time.perf_counter_ns() - start, value
+
+    def calibrate(self, func, setup=None):
+        """Find how many iterations make one repetition last at least the target duration
+
+        Returns (iterations, calls made while calibrating).
+        """
+        iterations = 1
+        calls = 0
+        while True:
+            elapsed_ns, _ = self._run(func, iterations, setup)
+            calls += iterations
+            if elapsed_ns >= self.target_ns or iterations >= self.max_iterations:
+                return iterations, calls
+            if elapsed_ns <= 0:
+                predicted = iterations * 10
+            else:
+                predicted = math.ceil(iterations * self.target_ns / elapsed_ns)
+            iterations = min(self.max_iterations, max(iterations + 1, min(predicted, iterations * 10)))
+
+    def measure(self, func, repetitions=None, setup=None):
+        """Measure func and return (last return value, timing statistics)
+
+        The statistics describe the time of a single call in seconds;
+        "time_seconds" callers should use the median. setup, if given, is
+        called untimed before every call (e.g. to evict a page cache).
+        "calls" counts every call made, so the measured calls are the last
+        repetitions x iterations of them.
+        """
+        repetitions = repetitions or self.repetitions
+
+        for _ in range(self.warmup_runs):
+            if setup:
+                setup()
+            func()
+
+        iterations, calibration_calls = self.calibrate(func, setup)
+
+        samples = []
+        value = None
+        for _ in range(repetitions):
+            elapsed_ns, value = self._run(func, iterations, setup)
+            samples.append(elapsed_ns / iterations / 1e9)
+
+        ci_low, ci_high = bootstrap_ci(samples, self.bootstrap_resamples, self.confidence)
+        timing = {
+            "warmup_runs": self.warmup_runs,
+            "iterations": iterations,
+            "repetitions": repetitions,
+            "calls": self.warmup_runs + calibration_calls + repetitions * iterations,
+            "min_seconds": min(samples),
+            "median_seconds": statistics.median(samples),
+            "p95_seconds": percentile(samples, 0.95),
+            "stddev_seconds": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+            "ci_low_seconds": ci_low,
+            "ci_high_seconds": ci_high,
+            "confidence": self.confidence,
+        }
+        return value, timing
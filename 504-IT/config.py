@@ -8,16 +8,146 @@ import os
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 RESULTS_DIR = os.path.join(BASE_DIR, "results")
 REPORTS_DIR = os.path.join(BASE_DIR, "reports")
+RESULTS_DB = os.path.join(RESULTS_DIR, "results.db")
 
 # Benchmark settings
 CPU_INTENSITY_LEVELS = ["light", "medium", "heavy"]
-MEMORY_SIZES = [5, 20]  # MB - reduced from [10, 100, 500]
-PARALLEL_TASK_SIZES = [500, 2000]  # Reduced from [1000, 10000, 100000]
-PARALLEL_THREAD_COUNTS = [2, 4]  # Reduced from [1, 2, 4, 8]
+MEMORY_SIZES = [5, 20]  # MB
+# STREAM working-set sweep (KB, all three arrays together): L1 through past LLC
+STREAM_SIZES_KB = [16, 64, 256, 1024, 4096, 16384, 65536, 262144, 524288]
+STREAM_KERNELS = ["copy", "scale", "add", "triad"]
+LATENCY_SIZES_KB = [16, 256, 4096, 65536, 524288]  # pointer-chasing working sets
+LATENCY_HOPS = 200000  # dependent loads per timed call
+MATMUL_SIZES = [64, 128, 256, 512, 1024, 2048]  # square matrix sizes for the GFLOPS sweep
+MATMUL_DTYPES = ["float32", "float64"]
+SIEVE_LIMIT = 100_000_000  # segmented sieve: count primes below this
+SIEVE_SEGMENT_KB = 256  # odd numbers per segment, one byte each; size it to L2
+SIEVE_PROCESS_COUNTS = [2]  # also run the sieve over segments on this many processes
+ALLOC_SMALL_OBJECTS = 100000  # objects per small-object allocator pattern
+ALLOC_BUFFER_COUNT = 1000  # buffers per bytearray/array/NumPy pattern
+ALLOC_BUFFER_KB = 16
+ALLOC_TOUCH_MB = 64  # first-touch vs pre-faulted page pattern
+PARALLEL_TASK_SIZES = [500, 2000]
+PARALLEL_THREAD_COUNTS = [2, 4]
+PARALLEL_PARTITION_STRATEGY = "dynamic"  # "contiguous", "strided" or "dynamic"
+PARALLEL_CHUNKS_PER_WORKER = 8  # work items per worker for the dynamic strategy
+SCALING_TASK_SIZE = 50000  # strong scaling: total numbers to test, split across workers
+SCALING_WORK_PER_WORKER = 20000  # weak scaling: numbers each worker tests
+PARALLEL_DATA_PATHS = ["pickle", "shared_memory"]  # how the input array reaches worker processes
+ASYNC_CLIENTS = 1000  # concurrent echo clients (capped by the open-file limit)
+ASYNC_REQUESTS_PER_CLIENT = 10
+ASYNC_PAYLOAD_BYTES = 64
+ASYNC_TRANSPORT = "tcp"  # "tcp" (loopback) or "unix"
+ASYNC_THREAD_WORKERS = None  # ThreadPoolExecutor cap for the thread-based comparison; None runs one thread per client
+GIL_FREE_KERNELS = ["sha256", "zlib", "numpy_ufunc"]  # thread-mode kernels that release the GIL
+GIL_FREE_UNITS = 16  # chunks of work per GIL-free case, split across workers
+GIL_FREE_CHUNK_KB = 256
+STORAGE_DIR = os.environ.get("BENCHMARK_STORAGE_DIR", os.path.join(RESULTS_DIR, "storage_scratch"))  # disk under test
+STORAGE_FILE_MB = 64  # test file size; larger than the page cache only matters for buffered cold reads
+STORAGE_BLOCK_SIZES_KB = [4, 64, 1024]
+STORAGE_RANDOM_OPS = 2000  # random reads/writes per timed call
+
+# Timing engine settings
+TIMING_WARMUP_RUNS = 2  # untimed calls before calibration
+TIMING_TARGET_SECONDS = 0.05  # minimum duration of one timed repetition
+TIMING_REPETITIONS = 7  # timed repetitions per benchmark case
+TIMING_MAX_ITERATIONS = 1000000  # calibration upper bound for very fast kernels
+TIMING_BOOTSTRAP_RESAMPLES = 1000
+TIMING_CONFIDENCE = 0.95
+
+# Resource sampler: background thread recording machine state during each case
+SAMPLER_INTERVAL_SECONDS = 0.05
+SAMPLER_CAPACITY = 8192  # ring buffer slots; older samples are overwritten
+SAMPLER_THROTTLE_RATIO = 0.9  # flag "throttled" below this fraction of the nominal/peak frequency
+SAMPLER_STEAL_PERCENT = 5.0  # flag "noisy_neighbor" above this hypervisor steal time
+SAMPLER_OTHER_CPU_PERCENT = 10.0  # ...or when other processes use more than this share of all CPUs
+
+# Benchmark profiles (--quick / --full); the settings above are the default profile
+BENCHMARK_SUITES = ["cpu", "memory", "parallel", "storage"]
+PROFILES = {
+    "quick": {
+        "memory_sizes": [5],
+        "stream_sizes_kb": [16, 1024, 65536],
+        "latency_sizes_kb": [16, 65536],
+        "sieve_limit": 10_000_000,
+        "matmul_sizes": [64, 256, 1024],
+        "storage_file_mb": 16,
+        "storage_block_sizes_kb": [4, 1024],
+        "task_sizes": [500],
+        "thread_counts": [2],
+        "scaling_task_size": 10000,
+        "scaling_work_per_worker": 5000,
+        "async_clients": 200,
+        "warmup_runs": 1,
+        "target_seconds": 0.01,
+        "repetitions": 3,
+    },
+    "default": {
+        "memory_sizes": MEMORY_SIZES,
+        "stream_sizes_kb": STREAM_SIZES_KB,
+        "latency_sizes_kb": LATENCY_SIZES_KB,
+        "sieve_limit": SIEVE_LIMIT,
+        "matmul_sizes": MATMUL_SIZES,
+        "storage_file_mb": STORAGE_FILE_MB,
+        "storage_block_sizes_kb": STORAGE_BLOCK_SIZES_KB,
+        "task_sizes": PARALLEL_TASK_SIZES,
+        "thread_counts": PARALLEL_THREAD_COUNTS,
+        "scaling_task_size": SCALING_TASK_SIZE,
+        "scaling_work_per_worker": SCALING_WORK_PER_WORKER,
+        "async_clients": ASYNC_CLIENTS,
+        "warmup_runs": TIMING_WARMUP_RUNS,
+        "target_seconds": TIMING_TARGET_SECONDS,
+        "repetitions": TIMING_REPETITIONS,
+    },
+    "full": {
+        "memory_sizes": [10, 100, 500],
+        "stream_sizes_kb": STREAM_SIZES_KB + [1048576],
+        "latency_sizes_kb": [16, 64, 256, 1024, 4096, 16384, 65536, 262144, 1048576],
+        "sieve_limit": 2_000_000_000,
+        "matmul_sizes": [64, 128, 256, 512, 1024, 2048, 3072, 4096, 6144],
+        "storage_file_mb": 1024,
+        "storage_block_sizes_kb": [4, 16, 64, 256, 1024, 4096],
+        "task_sizes": [1000, 10000, 100000],
+        "thread_counts": [1, 2, 4, 8],
+        "scaling_task_size": 500000,
+        "scaling_work_per_worker": 100000,
+        "async_clients": 5000,
+        "warmup_runs": 3,
+        "target_seconds": 0.2,
+        "repetitions": 15,
+    },
+}
+
+# Regression detection settings
+REGRESSION_THRESHOLD = 0.10  # flag cases more than 10% slower than the baseline
+REGRESSION_ROLLING_RUNS = 5  # runs in a "rolling" baseline
+
+# Fleet (coordinator/agent) settings
+FLEET_HOST = "127.0.0.1"
+FLEET_PORT = 8765
+FLEET_TIMEOUT_SECONDS = 3600  # coordinator gives up waiting for agents after this long
+FLEET_MESSAGE_LIMIT = 64 * 1024 * 1024  # largest JSON line accepted from an agent
+FLEET_PERCENTILES = [0.50, 0.90, 0.99]
+FLEET_OUTLIER_RATIO = 1.25  # hosts whose median case is this much slower than the fleet are outliers
+
+# Profiler settings (--profile)
+PROFILE_DIR = os.path.join(RESULTS_DIR, "profiles")  # one subdirectory of collapsed stacks per run
+PROFILER_SAMPLE_INTERVAL = 0.001  # seconds of CPU time between SIGPROF samples
+PROFILER_MAX_DEPTH = 64  # frames kept per stack
+PROFILER_MIN_SECONDS = 0.5  # shortest profiled pass, long enough for a few hundred samples
+
+# Machine-readable export settings
+METRICS_FILE = os.path.join(RESULTS_DIR, "benchmark_metrics.prom")  # OpenMetrics text of the latest runs
+METRICS_HOST = "127.0.0.1"  # --serve-metrics binds here
+METRICS_PORT = 9464
+METRICS_PREFIX = "benchmark_"
 
 # Chart settings
 CHART_DPI = 300
+CHART_PREVIEW_DPI = 72  # --chart-preview
+CHART_FORMAT = "png"  # "png" or "svg"
 CHART_STYLE = "default"
+CHART_CACHE_DIR = "chart_cache"  # content-addressed renders, relative to RESULTS_DIR
 
 # Report settings
 REPORT_TEMPLATE = """
@@ -41,6 +171,9 @@ Memory Benchmark Results:
 Parallel Processing Results:
 {parallel_results}
 
+Storage I/O Results:
+{storage_results}
+
 Summary:
 {summary}
 """
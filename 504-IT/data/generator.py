@@ -1,116 +1,96 @@
 """
-Report generation for benchmark results
+Test data generation and system information for the benchmarks
 """
 
 import os
-from datetime import datetime
-from config import REPORTS_DIR, REPORT_TEMPLATE
+import platform
 
-class ReportGenerator:
-    """Generate performance reports"""
-    
-    def __init__(self):
-        self.reports_dir = REPORTS_DIR
-        os.makedirs(self.reports_dir, exist_ok=True)
-    
-    def format_cpu_results(self, cpu_results):
-        """Format CPU benchmark results for report"""
-        text = f"Integer Operations: {cpu_results['integer_ops']['operations_per_second']:.2f} ops/sec\n"
-        text += f"Matrix Multiplication (Small): {cpu_results['floating_point_ops_small']['flops']:.2f} FLOPS\n"
-        text += f"Matrix Multiplication (Medium): {cpu_results['floating_point_ops_medium']['flops']:.2f} FLOPS\n"
-        text += f"Prime Calculation: {cpu_results['prime_calculation']['primes_found']} primes in {cpu_results['prime_calculation']['time_seconds']:.2f} seconds"
-        return text
-    
-    def format_memory_results(self, mem_results):
-        """Format memory benchmark results for report"""
-        text = ""
-        for key, result in mem_results.items():
-            if "sequential_access" in key:
-                text += f"Sequential Access ({result['size_mb']}MB): {result['bandwidth_mb_per_sec']:.2f} MB/sec\n"
-            elif "random_access" in key:
-                text += f"Random Access ({result['size_mb']}MB): {result['bandwidth_mb_per_sec']:.2f} MB/sec\n"
-            elif "allocation" in key:
-                text += f"Memory Allocation ({result['size_mb']}MB): {result['allocation_mb_per_sec']:.2f} MB/sec\n"
-        return text
-    
-    def format_parallel_results(self, parallel_results):
-        """Format parallel benchmark results for report"""
-        text = ""
-        
-        # Find sequential results
-        sequential_results = {k: v for k, v in parallel_results.items() if "sequential_" in k}
-        for key, result in sequential_results.items():
-            text += f"Sequential ({result['task_size']} tasks): {result['time_seconds']:.2f} seconds\n"
-        
-        # Find best threading result
-        threading_results = {k: v for k, v in parallel_results.items() if "threading_" in k}
-        if threading_results:
-            best_threading = min(threading_results.values(), key=lambda x: x['time_seconds'])
-            text += f"Best Threading ({best_threading['thread_count']} threads, {best_threading['task_size']} tasks): {best_threading['time_seconds']:.2f} seconds\n"
-        
-        # Find best multiprocessing result
-        multiprocessing_results = {k: v for k, v in parallel_results.items() if "multiprocessing_" in k}
-        if multiprocessing_results:
-            best_multiprocessing = min(multiprocessing_results.values(), key=lambda x: x['time_seconds'])
-            text += f"Best Multiprocessing ({best_multiprocessing['process_count']} processes, {best_multiprocessing['task_size']} tasks): {best_multiprocessing['time_seconds']:.2f} seconds\n"
-        
-        return text
-    
-    def generate_summary(self, results):
-        """Generate a summary of the benchmark results"""
-        system_info = results["system_info"]
-        cpu_cores = system_info["cpu_cores"]
-        total_memory = system_info["total_memory"]
-        
-        # Calculate speedup from parallel processing
-        sequential_time = None
-        best_parallel_time = None
-        
-        for key, result in results["parallel"].items():
-            if "sequential_10000" in key:
-                sequential_time = result["time_seconds"]
-            elif "multiprocessing_10000_" in key:
-                if best_parallel_time is None or result["time_seconds"] < best_parallel_time:
-                    best_parallel_time = result["time_seconds"]
-        
-        speedup = "N/A"
-        if sequential_time and best_parallel_time:
-            speedup = f"{sequential_time / best_parallel_time:.2f}x"
-        
-        summary = f"System with {cpu_cores} CPU cores and {total_memory}GB of memory shows "
-        summary += f"a parallel processing speedup of {speedup} with optimal configuration."
-        
-        return summary
-    
-    def create_report(self, results):
-        """Create a comprehensive performance report"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        system_info = results["system_info"]
-        
-        # Format results
-        cpu_text = self.format_cpu_results(results["cpu"])
-        memory_text = self.format_memory_results(results["memory"])
-        parallel_text = self.format_parallel_results(results["parallel"])
-        summary = self.generate_summary(results)
-        
-        # Generate report
-        report_content = REPORT_TEMPLATE.format(
-            timestamp=timestamp,
-            os_name=system_info["os_name"],
-            cpu_name=system_info["cpu_name"],
-            cpu_cores=system_info["cpu_cores"],
-            total_memory=system_info["total_memory"],
-            cpu_results=cpu_text,
-            memory_results=memory_text,
-            parallel_results=parallel_text,
-            summary=summary
-        )
-        
-        # Save report
-        timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_path = os.path.join(self.reports_dir, f"benchmark_report_{timestamp_str}.txt")
-        
-        with open(report_path, 'w') as f:
-            f.write(report_content)
-        
-        return report_path
+import psutil
+
+from config import MEMORY_SIZES, PARALLEL_TASK_SIZES
+
+
+class DataGenerator:
+    """Generate test data and collect system information"""
+
+    def __init__(self, seed=42):
+        self.seed = seed
+        self._rng = None
+
+    @property
+    def rng(self):
+        """NumPy generator, created on first use so system info alone does not import numpy"""
+        if self._rng is None:
+            import numpy as np
+            self._rng = np.random.default_rng(self.seed)
+        return self._rng
+
+    def generate_matrices(self, sizes=(50, 150)):
+        """Generate pairs of random square matrices"""
+        return {size: (self.rng.random((size, size)), self.rng.random((size, size))) for size in sizes}
+
+    def generate_memory_buffers(self, sizes_mb=None):
+        """Generate random byte buffers of the configured sizes"""
+        sizes_mb = sizes_mb or MEMORY_SIZES
+        return {size_mb: self.rng.integers(0, 256, size_mb * 1024 * 1024, dtype="uint8") for size_mb in sizes_mb}
+
+    def generate_task_lists(self, task_sizes=None):
+        """Generate the integer task lists used by the parallel benchmarks"""
+        task_sizes = task_sizes or PARALLEL_TASK_SIZES
+        return {size: list(range(size)) for size in task_sizes}
+
+    def generate_all(self):
+        """Generate all test data"""
+        return {
+            "matrices": self.generate_matrices(),
+            "memory_buffers": self.generate_memory_buffers(),
+            "task_lists": self.generate_task_lists(),
+        }
+
+    @staticmethod
+    def get_cpu_name():
+        """Best-effort human readable CPU name"""
+        name = platform.processor()
+        if not name and os.path.exists("/proc/cpuinfo"):
+            with open("/proc/cpuinfo") as f:
+                for line in f:
+                    if line.startswith("model name"):
+                        name = line.split(":", 1)[1].strip()
+                        break
+        return name or platform.machine() or "Unknown"
+
+    @staticmethod
+    def get_cache_sizes():
+        """Per-level CPU cache sizes in KB from sysfs (empty where unavailable)"""
+        cache_dir = "/sys/devices/system/cpu/cpu0/cache"
+        sizes = {}
+        if not os.path.isdir(cache_dir):
+            return sizes
+        for entry in sorted(os.listdir(cache_dir)):
+            if not entry.startswith("index"):
+                continue
+            try:
+                with open(os.path.join(cache_dir, entry, "level")) as f:
+                    level = f.read().strip()
+                with open(os.path.join(cache_dir, entry, "type")) as f:
+                    cache_type = f.read().strip()
+                with open(os.path.join(cache_dir, entry, "size")) as f:
+                    size = f.read().strip()
+            except OSError:
+                continue
+            if cache_type == "Instruction":
+                continue
+            label = f"L{level}d" if cache_type == "Data" else f"L{level}"
+            multiplier = 1024 if size.endswith("M") else 1
+            sizes[label] = int(size.rstrip("KM")) * multiplier
+        return sizes
+
+    def get_system_info(self):
+        """Collect static information about the host"""
+        return {
+            "os_name": platform.system(),
+            "cpu_name": self.get_cpu_name(),
+            "cpu_cores": psutil.cpu_count(logical=True) or os.cpu_count(),
+            "total_memory": round(psutil.virtual_memory().total / (1024 ** 3), 2),
+            "cache_sizes_kb": self.get_cache_sizes(),
+        }
@@ -0,0 +1,3 @@
+"""
+Coordinator/agent mode for benchmarking a fleet of machines
+"""
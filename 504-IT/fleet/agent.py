@@ -0,0 +1,46 @@
+"""
+Fleet agent: wait for the coordinator to schedule a run, run the benchmarks
+and stream each suite's results back as soon as it finishes
+"""
+
+import socket
+from datetime import datetime
+
+from fleet.protocol import ProtocolError, encode, decode, machine_id
+
+
+def send(stream, message):
+    stream.write(encode(message))
+    stream.flush()
+
+
+def run_agent(address, run_benchmarks, name=None, storage_dir=None):
+    """Serve one scheduled run for the coordinator at address and return (results, run_id)
+
+    run_benchmarks is main.run_benchmarks; the coordinator chooses the suites,
+    profile and case filter so every agent runs the same workload, while the
+    storage directory stays a local choice.
+    """
+    name = name or socket.gethostname()
+    with socket.create_connection(address) as sock, sock.makefile("rwb") as stream:
+        send(stream, {"type": "hello", "agent": name, "machine": machine_id()})
+        print(f"[OK] Agent {name} connected to {address[0]}:{address[1]}, waiting to be scheduled...")
+        options = decode(stream.readline(), ("run",))["options"]
+
+        def stream_suite(benchmark, cases):
+            send(stream, {"type": "suite", "benchmark": benchmark, "results": cases})
+
+        try:
+            results = run_benchmarks(options["suites"], options["profile"], options["cases"], options["scaling"],
+                                     storage_dir, options["sample_resources"], on_suite=stream_suite)
+        except Exception as e:
+            send(stream, {"type": "error", "message": f"{type(e).__name__}: {e}"})
+            raise
+        results["host"] = name
+        send(stream, {"type": "done", "host": name, "timestamp": results.get("timestamp", datetime.now().isoformat()),
+                      "system_info": results["system_info"], "profile": results["profile"],
+                      "suites": results["suites"]})
+        ack = decode(stream.readline(), ("ack", "error"))
+        if ack["type"] == "error":
+            raise ProtocolError(ack["message"])
+    return results, ack["run_id"]
@@ -0,0 +1,110 @@
+"""
+Fleet-wide aggregation of agent results
+
+Every case is reduced to its primary time metric (the one regression
+detection uses). Percentile tables are taken across hosts per case, and
+hosts are ranked by the median of their case times relative to the fleet
+median, which keeps one slow case from dominating a host's score.
+"""
+
+import os
+import statistics
+from datetime import datetime
+
+from config import BENCHMARK_SUITES, REPORTS_DIR, FLEET_PERCENTILES, FLEET_OUTLIER_RATIO
+from benchmarks.timing import percentile
+from reports.regression import case_time
+
+
+def case_times(runs):
+    """{(benchmark, case): {host: seconds}} for every case with a time metric"""
+    times = {}
+    for host, results in runs.items():
+        for benchmark in BENCHMARK_SUITES:
+            for case, data in results.get(benchmark, {}).items():
+                value, _ = case_time(data)
+                if value:
+                    times.setdefault((benchmark, case), {})[host] = value
+    return times
+
+
+def percentile_table(runs, fractions=FLEET_PERCENTILES):
+    """One row per case: host count, min, the requested percentiles and max across hosts"""
+    rows = []
+    for (benchmark, case), by_host in sorted(case_times(runs).items()):
+        values = list(by_host.values())
+        rows.append({
+            "benchmark": benchmark,
+            "case": case,
+            "hosts": len(values),
+            "min": min(values),
+            "percentiles": {fraction: percentile(values, fraction) for fraction in fractions},
+            "max": max(values),
+        })
+    return rows
+
+
+def host_outliers(runs, ratio=FLEET_OUTLIER_RATIO):
+    """Hosts ranked slowest first by their median case time relative to the fleet median
+
+    Only cases that ran on at least two hosts count.
+    """
+    ratios = {host: {} for host in runs}
+    for key, by_host in case_times(runs).items():
+        if len(by_host) < 2:
+            continue
+        median = statistics.median(by_host.values())
+        for host, value in by_host.items():
+            ratios[host][key] = value / median
+
+    ranking = []
+    for host, by_case in ratios.items():
+        if not by_case:
+            continue
+        worst = max(by_case, key=by_case.get)
+        score = statistics.median(by_case.values())
+        ranking.append({
+            "host": host,
+            "score": score,
+            "cases": len(by_case),
+            "worst_case": f"{worst[0]}/{worst[1]}",
+            "worst_ratio": by_case[worst],
+            "outlier": score >= ratio,
+        })
+    return sorted(ranking, key=lambda row: row["score"], reverse=True)
+
+
+def format_fleet_report(runs, failed=None, fractions=FLEET_PERCENTILES):
+    """Plain-text fleet report: agents, percentile table and outlier ranking"""
+    lines = ["Fleet Benchmark Report", "======================", "",
+             f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+             f"Agents: {len(runs)} ({', '.join(sorted(runs)) or 'none'})"]
+    for agent, reason in (failed or {}).items():
+        lines.append(f"Failed agent {agent}: {reason}")
+
+    headers = ["min"] + [f"p{round(fraction * 100)}" for fraction in fractions] + ["max"]
+    lines += ["", "Fleet-wide case times (ms):",
+              f"{'case':<44} {'hosts':>5} " + " ".join(f"{header:>11}" for header in headers)]
+    for row in percentile_table(runs, fractions):
+        values = [row["min"]] + [row["percentiles"][fraction] for fraction in fractions] + [row["max"]]
+        lines.append(f"{row['benchmark'] + '/' + row['case']:<44} {row['hosts']:>5} "
+                     + " ".join(f"{value * 1e3:>11.4f}" for value in values))
+
+    lines += ["", "Host outlier ranking (median case time relative to the fleet median):"]
+    ranking = host_outliers(runs)
+    if not ranking:
+        lines.append("Not enough hosts to compare")
+    for position, row in enumerate(ranking, 1):
+        marker = " [OUTLIER]" if row["outlier"] else ""
+        lines.append(f"{position:>3}. {row['host']:<32} {row['score']:.3f}x over {row['cases']} cases, "
+                     f"worst {row['worst_case']} {row['worst_ratio']:.3f}x{marker}")
+    return "\n".join(lines) + "\n"
+
+
+def write_fleet_report(runs, failed=None, directory=REPORTS_DIR):
+    """Save the fleet report and return its path"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"fleet_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+    with open(path, "w") as f:
+        f.write(format_fleet_report(runs, failed))
+    return path
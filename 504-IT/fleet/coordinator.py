@@ -0,0 +1,114 @@
+"""
+Fleet coordinator: schedule agent runs and collect their results
+
+Agents connect over TCP and announce the machine they run on. Agents on
+different machines are started right away; agents sharing a machine wait
+on a per-machine lock so only one of them benchmarks at a time and they do
+not skew each other's results. Each finished run is saved in the results
+store under the agent's name.
+"""
+
+import asyncio
+
+from config import RESULTS_DB, FLEET_TIMEOUT_SECONDS, FLEET_MESSAGE_LIMIT
+from storage.results_store import ResultsStore
+from fleet.protocol import ProtocolError, encode, decode
+
+
+class FleetCoordinator:
+    """Serve expected agents, one run each, and return their results keyed by agent name"""
+
+    def __init__(self, address, expected, options, timeout=FLEET_TIMEOUT_SECONDS, store_path=RESULTS_DB):
+        self.address = address
+        self.expected = expected
+        self.options = options
+        self.timeout = timeout
+        self.store_path = store_path
+        self.runs = {}
+        self.failed = {}
+        self.machine_locks = {}
+        self.finished = 0
+        self.done = None
+
+    async def _send(self, writer, message):
+        writer.write(encode(message))
+        await writer.drain()
+
+    def _unique_name(self, name):
+        taken = set(self.runs) | set(self.failed)
+        candidate, suffix = name, 2
+        while candidate in taken:
+            candidate, suffix = f"{name}-{suffix}", suffix + 1
+        return candidate
+
+    async def _collect(self, agent, reader):
+        """Read streamed suites until the agent reports it is done"""
+        results = {}
+        while True:
+            message = decode(await reader.readline(), ("suite", "done", "error"))
+            if message["type"] == "error":
+                raise ProtocolError(message["message"])
+            if message["type"] == "done":
+                results.update({key: value for key, value in message.items() if key != "type"})
+                return results
+            results[message["benchmark"]] = message["results"]
+            print(f"  - {agent}: received {message['benchmark']} results ({len(message['results'])} cases)")
+
+    def _store(self, agent, results):
+        results["host"] = agent
+        with ResultsStore(self.store_path) as store:
+            return store.save_run(results, host=agent)
+
+    async def handle(self, reader, writer):
+        agent = "{}:{}".format(*writer.get_extra_info("peername")[:2])
+        try:
+            hello = decode(await reader.readline(), ("hello",))
+            agent = self._unique_name(hello["agent"])
+            machine = hello["machine"]
+            print(f"[OK] Agent {agent} connected (machine {machine[:12]})")
+            lock = self.machine_locks.setdefault(machine, asyncio.Lock())
+            if lock.locked():
+                print(f"  - {agent}: waiting for another agent on the same machine")
+            async with lock:
+                print(f"  - {agent}: running")
+                await self._send(writer, {"type": "run", "options": self.options})
+                results = await self._collect(agent, reader)
+            run_id = self._store(agent, results)
+            results["run_id"] = run_id
+            self.runs[agent] = results
+            await self._send(writer, {"type": "ack", "run_id": run_id})
+            print(f"[OK] {agent}: stored as run {run_id}")
+        except (ProtocolError, ConnectionError, ValueError, KeyError, asyncio.IncompleteReadError) as e:
+            self.failed[agent] = str(e) or type(e).__name__
+            print(f"[ERROR] Agent {agent} failed: {self.failed[agent]}")
+        finally:
+            writer.close()
+            self.finished += 1
+            if self.finished >= self.expected:
+                self.done.set()
+
+    async def serve(self, spawn=None):
+        """Accept agents until expected runs have finished or the timeout expires
+
+        spawn, if given, is called with the bound (host, port) once the
+        server listens and returns the local agent processes it started.
+        """
+        self.done = asyncio.Event()
+        server = await asyncio.start_server(self.handle, *self.address, limit=FLEET_MESSAGE_LIMIT)
+        host, port = server.sockets[0].getsockname()[:2]
+        print(f"[OK] Coordinator listening on {host}:{port}, expecting {self.expected} agent(s)")
+        processes = spawn((host, port)) if spawn else []
+        try:
+            async with server:
+                await asyncio.wait_for(self.done.wait(), self.timeout)
+        except asyncio.TimeoutError:
+            print(f"[ERROR] Timed out after {self.timeout}s with {self.finished}/{self.expected} agent(s) finished")
+            for process in processes:
+                process.kill()
+        finally:
+            for process in processes:
+                await asyncio.to_thread(process.wait)
+        return self.runs
+
+    def run(self, spawn=None):
+        return asyncio.run(self.serve(spawn))
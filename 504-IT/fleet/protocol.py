@@ -0,0 +1,57 @@
+"""
+Wire protocol between fleet agents and the coordinator
+
+Messages are JSON objects, one per line, over a TCP connection:
+
+    agent -> coordinator  {"type": "hello", "agent": name, "machine": machine_id}
+    coordinator -> agent  {"type": "run", "options": {...}}
+    agent -> coordinator  {"type": "suite", "benchmark": "cpu", "results": {...}}   (one per suite)
+    agent -> coordinator  {"type": "done", "host": ..., "timestamp": ..., "system_info": ..., "profile": ...}
+    coordinator -> agent  {"type": "ack", "run_id": ...}
+
+A suite's results use the schema of the *_benchmark_*.json files, so the
+coordinator rebuilds the same results dict a local run produces.
+"""
+
+import json
+import socket
+
+from config import FLEET_HOST, FLEET_PORT
+
+
+class ProtocolError(Exception):
+    """The peer closed the connection or sent an unexpected message"""
+
+
+def encode(message):
+    return (json.dumps(message, default=str) + "\n").encode()
+
+
+def decode(line, expected=None):
+    """Parse one message line and check its type"""
+    if not line:
+        raise ProtocolError("connection closed by peer")
+    message = json.loads(line)
+    if expected and message.get("type") not in expected:
+        raise ProtocolError(f"expected {'/'.join(expected)} message, got {message.get('type')!r}")
+    return message
+
+
+def parse_address(value):
+    """HOST:PORT, HOST or :PORT into a (host, port) tuple"""
+    value = value or ""
+    host, _, port = value.rpartition(":") if ":" in value else (value, "", "")
+    return host or FLEET_HOST, int(port) if port else FLEET_PORT
+
+
+def machine_id():
+    """Identifier shared by every agent on the same machine (and only them)"""
+    for path in ("/etc/machine-id", "/var/lib/dbus/machine-id"):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        if value:
+            return value
+    return socket.gethostname()
@@ -7,101 +7,454 @@ Main entry point for the application
 import os
 import sys
 import time
+import socket
 import argparse
+import functools
+import importlib
+import subprocess
 from datetime import datetime
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from data.generator import DataGenerator
-from benchmarks.cpu_benchmark import CPUBenchmark
-from benchmarks.memory_benchmark import MemoryBenchmark
-from benchmarks.parallel_benchmark import ParallelBenchmark
-from visualization.charts import ChartGenerator
-from reports.generator import ReportGenerator
-from config import RESULTS_DIR, REPORTS_DIR
+# Heavy modules (numpy, matplotlib, the benchmark suites, reporting) are
+# imported where they are used so headless and selective runs only pay for
+# what they need.
+from storage.results_store import ResultsStore
+from config import (RESULTS_DIR, REPORTS_DIR, RESULTS_DB, REGRESSION_THRESHOLD, BENCHMARK_SUITES, PROFILES,
+                    CHART_DPI, CHART_PREVIEW_DPI, CHART_FORMAT, METRICS_FILE, METRICS_PORT)
+
+BENCHMARK_CLASSES = {
+    "cpu": ("benchmarks.cpu_benchmark", "CPUBenchmark"),
+    "memory": ("benchmarks.memory_benchmark", "MemoryBenchmark"),
+    "parallel": ("benchmarks.parallel_benchmark", "ParallelBenchmark"),
+    "storage": ("benchmarks.storage_benchmark", "StorageBenchmark"),
+}
+
+# Modules a full run imports, in the order main.py loads them
+STARTUP_MODULES = [
+    "config",
+    "storage.results_store",
+    "benchmarks.timing",
+    "data.generator",
+    "benchmarks.cpu_benchmark",
+    "benchmarks.memory_benchmark",
+    "benchmarks.parallel_benchmark",
+    "benchmarks.storage_benchmark",
+    "benchmarks.sampler",
+    "benchmarks.profiler",
+    "fleet.coordinator",
+    "fleet.agent",
+    "reports.streaming",
+    "reports.openmetrics",
+    "reports.generator",
+    "reports.regression",
+    "visualization.charts",
+]
 
 def ensure_directories():
     """Create necessary directories if they don't exist"""
     os.makedirs(RESULTS_DIR, exist_ok=True)
     os.makedirs(REPORTS_DIR, exist_ok=True)
 
-def run_benchmarks():
-    """Run all benchmarks and collect results"""
+def build_benchmarks(suites, profile, case_filter=None, scaling=False, storage_dir=None):
+    """Instantiate the selected benchmark suites with the settings of a profile"""
+    from benchmarks.timing import BenchmarkTimer
+    
+    settings = PROFILES[profile]
+    timer = BenchmarkTimer(warmup_runs=settings["warmup_runs"], target_seconds=settings["target_seconds"],
+                           repetitions=settings["repetitions"])
+    options = {
+        "cpu": {"sieve_limit": settings["sieve_limit"], "matmul_sizes": settings["matmul_sizes"]},
+        "memory": {"sizes": settings["memory_sizes"], "stream_sizes_kb": settings["stream_sizes_kb"],
+                   "latency_sizes_kb": settings["latency_sizes_kb"]},
+        "parallel": {"task_sizes": settings["task_sizes"], "thread_counts": settings["thread_counts"],
+                     "scaling": scaling, "scaling_task_size": settings["scaling_task_size"],
+                     "scaling_work_per_worker": settings["scaling_work_per_worker"],
+                     "async_clients": settings["async_clients"]},
+        "storage": {"directory": storage_dir, "file_mb": settings["storage_file_mb"],
+                    "block_sizes_kb": settings["storage_block_sizes_kb"]},
+    }
+    benchmarks = {}
+    for name in suites:
+        module_name, class_name = BENCHMARK_CLASSES[name]
+        benchmark_class = getattr(importlib.import_module(module_name), class_name)
+        benchmarks[name] = benchmark_class(timer=timer, case_filter=case_filter, **options[name])
+    return benchmarks
+
+def run_benchmarks(suites=None, profile="default", case_filter=None, scaling=False, storage_dir=None,
+                   sample_resources=True, on_suite=None, on_case=None, timestamp=None, profiler=None):
+    """Run the selected benchmarks and collect results
+
+    on_suite(name, results) is called as each suite finishes and
+    on_case(suite, case name, entry) as each case finishes. profiler names
+    a benchmarks.profiler mode to profile every measured case with.
+    """
+    suites = suites or BENCHMARK_SUITES
     print("Starting hardware benchmarking suite...")
     print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Profile: {profile}, suites: {', '.join(suites)}")
     print("-" * 50)
     
+    from data.generator import DataGenerator
+    
     # Initialize data generator
     data_gen = DataGenerator()
     
-    # Generate test data
-    print("Generating test data...")
-    test_data = data_gen.generate_all()
-    
     # Initialize benchmarks
-    cpu_bench = CPUBenchmark()
-    mem_bench = MemoryBenchmark()
-    parallel_bench = ParallelBenchmark()
-    
-    # Run CPU benchmarks
-    print("\nRunning CPU benchmarks...")
-    cpu_results = cpu_bench.run_all()
-    
-    # Run memory benchmarks
-    print("\nRunning memory benchmarks...")
-    mem_results = mem_bench.run_all()
+    benchmarks = build_benchmarks(suites, profile, case_filter, scaling, storage_dir)
+    for bench in benchmarks.values():
+        bench.on_case = on_case
     
-    # Run parallel benchmarks
-    print("\nRunning parallel processing benchmarks...")
-    parallel_results = parallel_bench.run_all()
+    # Generate test data only if a selected benchmark consumes it
+    if any(bench.requires_test_data for bench in benchmarks.values()):
+        print("Generating test data...")
+        test_data = data_gen.generate_all()
+        for bench in benchmarks.values():
+            if bench.requires_test_data:
+                bench.test_data = test_data
     
-    # Combine all results
+    titles = {"cpu": "CPU", "memory": "memory", "parallel": "parallel processing", "storage": "storage I/O"}
     all_results = {
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": timestamp or datetime.now().isoformat(),
+        "host": socket.gethostname(),
         "system_info": data_gen.get_system_info(),
-        "cpu": cpu_results,
-        "memory": mem_results,
-        "parallel": parallel_results
+        "profile": profile,
+        "suites": [name for name in BENCHMARK_SUITES if name in benchmarks],
     }
     
+    # Record machine state during every case unless disabled
+    sampler = None
+    if sample_resources:
+        from benchmarks.sampler import ResourceSampler
+        sampler = ResourceSampler()
+        sampler.start()
+        for bench in benchmarks.values():
+            bench.sampler = sampler
+    
+    # Profile each measured case in a separate pass after its timing
+    if profiler:
+        from benchmarks.profiler import CaseProfiler
+        case_profiler = CaseProfiler(profiler)
+        for bench in benchmarks.values():
+            bench.profiler = case_profiler
+        print(f"Profiling cases with {case_profiler.mode}, stacks in {case_profiler.directory}")
+    
+    try:
+        for name in BENCHMARK_SUITES:
+            if name in benchmarks:
+                print(f"\nRunning {titles[name]} benchmarks...")
+                all_results[name] = benchmarks[name].run()
+                if on_suite:
+                    on_suite(name, all_results[name])
+            else:
+                all_results[name] = {}
+    finally:
+        if sampler:
+            sampler.stop()
+    
     return all_results
 
-def visualize_results(results):
+def parse_list(value):
+    """Split a comma separated command line value"""
+    return [item.strip() for item in value.split(",") if item.strip()] if value else []
+
+def store_results(results, save_json=False):
+    """Persist results in the historical store (and optionally as JSON files)"""
+    with ResultsStore(RESULTS_DB) as store:
+        run_id = store.save_run(results)
+    results["run_id"] = run_id
+    print(f"\n[OK] Results stored as run {run_id} in {RESULTS_DB}")
+    if save_json:
+        for path in ResultsStore.export_json(results, RESULTS_DIR):
+            print(f"[OK] Results saved to {path}")
+    return run_id
+
+def load_stored_results(run_id=None):
+    """Load a run from the historical store (latest if run_id is None)"""
+    with ResultsStore(RESULTS_DB) as store:
+        run_id = run_id or store.latest_run_id()
+        if run_id is None:
+            return None
+        return store.load_run(run_id)
+
+def ingest_results(directory):
+    """Import legacy JSON result files into the historical store"""
+    with ResultsStore(RESULTS_DB) as store:
+        run_ids = store.ingest_directory(directory)
+    print(f"[OK] Ingested {len(run_ids)} run(s) from {directory}")
+
+def compare_baseline(results, spec, threshold):
+    """Compare results against a stored baseline; return True if anything regressed
+
+    Raises LookupError when no case of the run is in the baseline, so a
+    gate never passes on an empty comparison.
+    """
+    from reports.regression import RegressionDetector, resolve_baseline, run_cases, format_cases
+    
+    print(f"\nComparing against baseline '{spec}'...")
+    detector = RegressionDetector(threshold)
+    with ResultsStore(RESULTS_DB) as store:
+        baseline, label = resolve_baseline(store, spec, host=results.get("host"),
+                                           exclude_run_id=results.get("run_id"),
+                                           profile=results.get("profile"), cases=run_cases(results))
+    findings = detector.compare(results, baseline)
+    missing = detector.missing_cases(results, baseline)
+    if not findings:
+        raise LookupError(f"No cases overlap with {label}"
+                          + (f"; not in baseline: {format_cases(missing)}" if missing else ""))
+    print(detector.format_findings(findings, label, missing))
+    return detector.has_regressions(findings)
+
+def chart_generator(args):
+    """ChartGenerator configured from the chart command line options"""
+    from visualization.charts import ChartGenerator
+    dpi = CHART_PREVIEW_DPI if args.chart_preview else CHART_DPI
+    return ChartGenerator(dpi=dpi, fmt=args.chart_format)
+
+def visualize_results(results, args):
     """Generate visualization charts"""
     print("\nGenerating visualization charts...")
-    chart_gen = ChartGenerator()
-    chart_gen.generate_all(results)
+    chart_gen = chart_generator(args)
+    chart_gen.generate_all(results, workers=args.chart_workers)
     print("[OK] Visualization complete")
 
+def build_dashboard(args):
+    """Render charts for every stored run, reusing cached renders"""
+    print("\nBuilding chart dashboard from the results store...")
+    with ResultsStore(RESULTS_DB) as store:
+        chart_generator(args).generate_dashboard(store, workers=args.chart_workers)
+
 def generate_report(results):
     """Generate performance report"""
     print("\nGenerating performance report...")
+    from reports.generator import ReportGenerator
     report_gen = ReportGenerator()
     report_path = report_gen.create_report(results)
     print(f"[OK] Report saved to {report_path}")
 
+def run_coordinator(args, suites):
+    """Schedule agent runs, then print and save fleet-wide aggregates"""
+    from fleet.protocol import parse_address
+    from fleet.coordinator import FleetCoordinator
+    from fleet.aggregate import format_fleet_report, write_fleet_report
+    
+    options = {"suites": suites, "profile": args.profile or "default", "cases": parse_list(args.cases),
+               "scaling": args.scaling, "sample_resources": not args.no_sampler}
+    expected = args.expect_agents or args.spawn_agents or 1
+    
+    def spawn(address):
+        """Start --spawn-agents local agent processes against the bound address"""
+        command = [sys.executable, os.path.abspath(__file__), "--agent", "{}:{}".format(*address)]
+        if args.storage_dir:
+            command += ["--storage-dir", args.storage_dir]
+        return [subprocess.Popen(command + ["--agent-name", f"{socket.gethostname()}-agent{i}"])
+                for i in range(1, args.spawn_agents + 1)]
+    
+    coordinator = FleetCoordinator(parse_address(args.coordinator), expected, options)
+    runs = coordinator.run(spawn if args.spawn_agents else None)
+    print()
+    print(format_fleet_report(runs, coordinator.failed))
+    print(f"[OK] Fleet report saved to {write_fleet_report(runs, coordinator.failed)}")
+    return runs, coordinator.failed
+
+def run_fleet_agent(args, on_case=None):
+    """Run as an agent of the coordinator at --agent"""
+    from fleet.protocol import parse_address
+    from fleet.agent import run_agent
+    
+    address = parse_address(args.agent)
+    run = functools.partial(run_benchmarks, on_case=on_case)
+    try:
+        _, run_id = run_agent(address, run, args.agent_name, args.storage_dir)
+    except OSError as e:
+        print(f"[ERROR] Agent could not reach the coordinator at {address[0]}:{address[1]}: {e}")
+        sys.exit(1)
+    print(f"[OK] Results accepted by the coordinator as run {run_id}")
+
+def open_case_stream(target, host, run_timestamp, profile):
+    """JsonLinesWriter for --stream-jsonl; with '-' the records own stdout and progress output moves to stderr"""
+    from reports.streaming import JsonLinesWriter
+    if target == "-":
+        stream = sys.stdout
+        sys.stdout = sys.stderr
+    else:
+        stream = open(target, "a")
+    return JsonLinesWriter(stream, host, run_timestamp, profile)
+
+def combine_case_callbacks(callbacks):
+    """One on_case callback that forwards to every given callback (None if there are none)"""
+    callbacks = [callback for callback in callbacks if callback]
+    if not callbacks:
+        return None
+    def on_case(benchmark, config, case):
+        for callback in callbacks:
+            callback(benchmark, config, case)
+    return on_case
+
+def start_metrics_server(live, port):
+    """Serve the latest stored run of every host, with this host's run replaced by the live one"""
+    from reports.openmetrics import MetricsServer, render, latest_runs
+    
+    def source():
+        runs = {run["host"]: run for run in latest_runs(RESULTS_DB)}
+        snapshot = live.snapshot()
+        if any(snapshot.get(name) for name in BENCHMARK_SUITES):
+            runs[snapshot["host"]] = snapshot
+        return render(list(runs.values()))
+    
+    server = MetricsServer(source, port=port).start()
+    print(f"[OK] Serving OpenMetrics on {server.url}")
+    return server
+
+def export_openmetrics(path):
+    """Write the latest stored run of every host in OpenMetrics text format"""
+    from reports.openmetrics import render, latest_runs, write_metrics
+    print(f"[OK] OpenMetrics written to {write_metrics(render(latest_runs(RESULTS_DB)), path)}")
+
+def profile_startup(modules=STARTUP_MODULES, top=20):
+    """Report per-module import time using a fresh interpreter with -X importtime"""
+    project_dir = os.path.dirname(os.path.abspath(__file__))
+    code = "; ".join(f"import {name}" for name in modules)
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=project_dir, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        print(f"[ERROR] Startup profiling failed: {proc.stderr.strip().splitlines()[-1:]}")
+        return None
+    
+    timings = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings.append((name.strip(), int(self_us), int(cumulative_us)))
+    
+    print("Startup import profile")
+    print("-" * 50)
+    print(f"Interpreter + imports wall time: {wall * 1e3:.1f} ms")
+    print("\nProject modules (cumulative ms):")
+    for name, _, cumulative_us in timings:
+        if name in modules:
+            print(f"  {name:<32} {cumulative_us / 1e3:8.1f}")
+    print(f"\nTop {top} modules by self time (ms):")
+    for name, self_us, cumulative_us in sorted(timings, key=lambda t: t[1], reverse=True)[:top]:
+        print(f"  {name:<40} {self_us / 1e3:8.1f} (cumulative {cumulative_us / 1e3:.1f})")
+    return timings
+
 def main():
     """Main function"""
     parser = argparse.ArgumentParser(description="Hardware Performance Benchmarking Tool")
     parser.add_argument("--no-charts", action="store_true", help="Skip chart generation")
     parser.add_argument("--no-report", action="store_true", help="Skip report generation")
+    parser.add_argument("--only", metavar="SUITES", help=f"Comma separated suites to run ({','.join(BENCHMARK_SUITES)})")
+    parser.add_argument("--cases", metavar="PATTERNS", help="Comma separated case name filters, e.g. 'integer_ops,stream_triad_*'")
+    profile_group = parser.add_mutually_exclusive_group()
+    profile_group.add_argument("--quick", dest="profile", action="store_const", const="quick", help="Small sizes and few repetitions")
+    profile_group.add_argument("--full", dest="profile", action="store_const", const="full", help="Large sizes and many repetitions")
+    parser.add_argument("--scaling", action="store_true", help="Add a pinned strong/weak core-scaling sweep (1..cpu_count workers) to the parallel suite")
+    parser.add_argument("--storage-dir", metavar="DIR", help="Directory on the disk to benchmark for the storage suite (default: results/storage_scratch)")
+    parser.add_argument("--no-sampler", action="store_true", help="Do not record CPU frequency, RSS and context switches during each case")
+    parser.add_argument("--coordinator", metavar="HOST:PORT", nargs="?", const="", default=None,
+                        help="Schedule and aggregate runs of fleet agents instead of benchmarking locally")
+    parser.add_argument("--expect-agents", type=int, default=None, help="Agent runs the coordinator waits for (default: --spawn-agents or 1)")
+    parser.add_argument("--spawn-agents", type=int, default=0, help="Start N local agent processes for the coordinator")
+    parser.add_argument("--agent", metavar="HOST:PORT", help="Run as a fleet agent and send results to this coordinator")
+    parser.add_argument("--agent-name", help="Name reported by this agent (default: hostname)")
+    parser.add_argument("--stream-jsonl", metavar="PATH", nargs="?", const="-", default=None,
+                        help="Append one JSON Lines record per finished case to PATH ('-' or no value: stdout, progress goes to stderr)")
+    parser.add_argument("--openmetrics", metavar="PATH", nargs="?", const=METRICS_FILE, default=None,
+                        help=f"Write the latest run of every host in OpenMetrics text format (default {os.path.relpath(METRICS_FILE)})")
+    parser.add_argument("--serve-metrics", metavar="PORT", nargs="?", type=int, const=METRICS_PORT, default=None,
+                        help=f"Serve live OpenMetrics on localhost (default port {METRICS_PORT}) until interrupted")
+    parser.add_argument("--profile", dest="profiler", metavar="MODE", nargs="?", const="sampling", default=None,
+                        choices=["sampling", "cprofile"],
+                        help="Profile every case in a separate pass and write collapsed stacks for flame graphs to results/profiles (default mode: sampling)")
+    parser.add_argument("--profile-startup", action="store_true", help="Report per-module import time and exit")
+    parser.add_argument("--chart-preview", action="store_true", help=f"Render charts at {CHART_PREVIEW_DPI} DPI instead of {CHART_DPI}")
+    parser.add_argument("--chart-format", choices=["png", "svg"], default=CHART_FORMAT, help="Chart file format")
+    parser.add_argument("--chart-workers", type=int, default=None, help="Processes used to render charts (default: CPU count)")
+    parser.add_argument("--dashboard", action="store_true", help="Render charts for every stored run into results/dashboard and exit")
+    parser.add_argument("--save-json", action="store_true", help="Also write per-benchmark JSON files to the results directory")
+    parser.add_argument("--ingest", metavar="DIR", help="Import legacy *_benchmark_*.json files from DIR into the results store and exit")
+    parser.add_argument("--from-store", metavar="RUN_ID", nargs="?", type=int, const=0, default=None,
+                        help="Skip benchmarking and build charts/report from a stored run (latest if no id)")
+    parser.add_argument("--compare-baseline", metavar="RUN", help="Compare against a stored run id, 'latest' or 'rolling[:N]' and exit non-zero on regressions")
+    parser.add_argument("--regression-threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help=f"Relative slowdown that counts as a regression (default {REGRESSION_THRESHOLD})")
     args = parser.parse_args()
     
+    suites = parse_list(args.only) or BENCHMARK_SUITES
+    unknown = [name for name in suites if name not in BENCHMARK_SUITES]
+    if unknown:
+        parser.error(f"unknown suite(s) for --only: {', '.join(unknown)}")
+    
+    if args.profile_startup:
+        profile_startup()
+        return
+    
     # Ensure directories exist
     ensure_directories()
     
-    # Run benchmarks
-    start_time = time.time()
-    results = run_benchmarks()
-    end_time = time.time()
+    profile = args.profile or "default"
+    run_timestamp = datetime.now().isoformat()
+    case_stream = (open_case_stream(args.stream_jsonl, args.agent_name or socket.gethostname(), run_timestamp, profile)
+                   if args.stream_jsonl else None)
+    
+    if args.agent:
+        run_fleet_agent(args, case_stream)
+        return
+    
+    if args.coordinator is not None:
+        runs, failed = run_coordinator(args, suites)
+        if failed or not runs:
+            sys.exit(1)
+        return
+    
+    if args.ingest:
+        ingest_results(args.ingest)
+        return
+    
+    if args.dashboard:
+        build_dashboard(args)
+        return
+    
+    # Live results for metrics scrapes while the run is in progress
+    live = None
+    metrics_server = None
+    if args.serve_metrics is not None:
+        from reports.streaming import LiveRun
+        live = LiveRun(socket.gethostname(), run_timestamp, profile)
+        metrics_server = start_metrics_server(live, args.serve_metrics)
     
-    print(f"\nBenchmarking completed in {end_time - start_time:.2f} seconds")
+    if args.from_store is not None:
+        results = load_stored_results(args.from_store or None)
+        if results is None:
+            print("[ERROR] No stored runs found")
+            sys.exit(1)
+        print(f"Loaded stored run {results['run_id']} ({results['host']}, {results['timestamp']})")
+    else:
+        # Run benchmarks
+        start_time = time.time()
+        results = run_benchmarks(suites, profile, parse_list(args.cases), args.scaling, args.storage_dir,
+                                 not args.no_sampler, on_case=combine_case_callbacks([case_stream, live]),
+                                 timestamp=run_timestamp, profiler=args.profiler)
+        end_time = time.time()
+        
+        print(f"\nBenchmarking completed in {end_time - start_time:.2f} seconds")
+        
+        store_results(results, save_json=args.save_json)
+    if live:
+        live.replace(results)
+    
+    if args.openmetrics:
+        export_openmetrics(args.openmetrics)
     
     # Generate visualizations
     if not args.no_charts:
         try:
-            visualize_results(results)
+            visualize_results(results, args)
         except Exception as e:
             print(f"[ERROR] Visualization failed: {e}")
     
@@ -112,6 +465,29 @@ def main():
         except Exception as e:
             print(f"[ERROR] Report generation failed: {e}")
     
+    # Compare against a baseline last so the exit code reflects regressions
+    regressed = False
+    if args.compare_baseline:
+        try:
+            regressed = compare_baseline(results, args.compare_baseline, args.regression_threshold)
+        except (LookupError, ValueError, KeyError) as e:
+            print(f"[ERROR] Baseline comparison failed: {e}")
+            sys.exit(2)
+    
+    if metrics_server:
+        print(f"\nServing metrics on {metrics_server.url} (Ctrl-C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            metrics_server.stop()
+    
+    if regressed:
+        print("\n[ERROR] Performance regressions detected")
+        sys.exit(1)
+    
     print("\nBenchmarking process completed successfully!")
 
 if __name__ == "__main__":
@@ -4,7 +4,9 @@ Report generation for benchmark results
 
 import os
 from datetime import datetime
-from config import REPORTS_DIR, REPORT_TEMPLATE
+from config import REPORTS_DIR, REPORT_TEMPLATE, BENCHMARK_SUITES
+
+MB = 1024 * 1024
 
 class ReportGenerator:
     """Generate performance reports"""
@@ -13,24 +15,74 @@ class ReportGenerator:
         self.reports_dir = REPORTS_DIR
         os.makedirs(self.reports_dir, exist_ok=True)
     
+    @staticmethod
+    def format_timing(result):
+        """Format the measurement spread recorded by the timing engine"""
+        timing = result.get("timing")
+        if not timing:
+            return ""
+        confidence = int(timing["confidence"] * 100)
+        return (f" [median {timing['median_seconds'] * 1e3:.4f} ms, "
+                f"p95 {timing['p95_seconds'] * 1e3:.4f} ms, "
+                f"{confidence}% CI {timing['ci_low_seconds'] * 1e3:.4f}-{timing['ci_high_seconds'] * 1e3:.4f} ms, "
+                f"n={timing['repetitions']}x{timing['iterations']}]")
+    
     def format_cpu_results(self, cpu_results):
         """Format CPU benchmark results for report"""
-        text = f"Integer Operations: {cpu_results['integer_ops']['operations_per_second']:.2f} ops/sec\n"
-        text += f"Matrix Multiplication (Small): {cpu_results['floating_point_ops_small']['flops']:.2f} FLOPS\n"
-        text += f"Matrix Multiplication (Medium): {cpu_results['floating_point_ops_medium']['flops']:.2f} FLOPS\n"
-        text += f"Prime Calculation: {cpu_results['prime_calculation']['primes_found']} primes in {cpu_results['prime_calculation']['time_seconds']:.2f} seconds"
-        return text
+        text = ""
+        if "integer_ops" in cpu_results:
+            text += f"Integer Operations: {cpu_results['integer_ops']['operations_per_second']:.2f} ops/sec{self.format_timing(cpu_results['integer_ops'])}\n"
+        if "floating_point_ops_small" in cpu_results:
+            text += f"Matrix Multiplication (Small): {cpu_results['floating_point_ops_small']['flops']:.2f} FLOPS{self.format_timing(cpu_results['floating_point_ops_small'])}\n"
+        if "floating_point_ops_medium" in cpu_results:
+            text += f"Matrix Multiplication (Medium): {cpu_results['floating_point_ops_medium']['flops']:.2f} FLOPS{self.format_timing(cpu_results['floating_point_ops_medium'])}\n"
+        matmul_results = [v for v in cpu_results.values() if v.get("operation") == "matmul_sweep"]
+        for dtype, threads in sorted({(v['dtype'], v['threads']) for v in matmul_results}):
+            curve = sorted((v for v in matmul_results if v['dtype'] == dtype and v['threads'] == threads), key=lambda x: x['matrix_size'])
+            points = ", ".join(f"{v['matrix_size']}: {v['gflops']:.1f}" for v in curve)
+            text += f"Matmul Sweep ({dtype}, {threads} BLAS thread{'s' if threads > 1 else ''}, {curve[0]['blas']}): {points} GFLOPS\n"
+        if "prime_calculation" in cpu_results:
+            text += f"Prime Calculation: {cpu_results['prime_calculation']['primes_found']} primes in {cpu_results['prime_calculation']['time_seconds']:.6f} seconds{self.format_timing(cpu_results['prime_calculation'])}\n"
+        sieve_results = [v for v in cpu_results.values() if v.get("operation") == "prime_sieve"]
+        for result in sorted(sieve_results, key=lambda x: x['processes']):
+            peak = f", RSS growth {result['rss_growth_mb']:.1f} MB" if result.get("rss_growth_mb") is not None else ""
+            text += (f"Segmented Sieve ({result['limit']:,}, {result['processes']} process{'es' if result['processes'] > 1 else ''}): "
+                     f"{result['primes_found']} primes, {result['numbers_per_second']:.3e} numbers/sec, "
+                     f"{result['segments_per_second']:.1f} segments/sec of {result['segment_kb']} KB{peak}{self.format_timing(result)}\n")
+        return text.rstrip("\n") or "Not run"
     
     def format_memory_results(self, mem_results):
         """Format memory benchmark results for report"""
         text = ""
         for key, result in mem_results.items():
             if "sequential_access" in key:
-                text += f"Sequential Access ({result['size_mb']}MB): {result['bandwidth_mb_per_sec']:.2f} MB/sec\n"
+                text += f"Sequential Access ({result['size_mb']}MB): {result['bandwidth_mb_per_sec']:.2f} MB/sec{self.format_timing(result)}\n"
             elif "random_access" in key:
-                text += f"Random Access ({result['size_mb']}MB): {result['bandwidth_mb_per_sec']:.2f} MB/sec\n"
+                text += f"Random Access ({result['size_mb']}MB): {result['bandwidth_mb_per_sec']:.2f} MB/sec{self.format_timing(result)}\n"
             elif "allocation" in key:
-                text += f"Memory Allocation ({result['size_mb']}MB): {result['allocation_mb_per_sec']:.2f} MB/sec\n"
+                text += f"Memory Allocation ({result['size_mb']}MB): {result['allocation_mb_per_sec']:.2f} MB/sec{self.format_timing(result)}\n"
+            elif key.startswith("latency_"):
+                text += f"Memory Latency ({result['size_kb']}KB): {result['ns_per_access']:.1f} ns/access ({result['ns_per_access_adjusted']:.1f} ns above L1 loop baseline){self.format_timing(result)}\n"
+        
+        # Allocator stress patterns
+        for result in (v for v in mem_results.values() if v.get("operation") == "allocator_stress"):
+            text += f"Allocator ({result['pattern'].replace('_', ' ')}): {result['allocations_per_second']:.0f} allocations/sec"
+            if "ns_per_page" in result:
+                faults = f", {result['minor_faults']} minor faults" if result.get("minor_faults") is not None else ""
+                text += f", {result['ns_per_page']:.1f} ns/page{faults}"
+            else:
+                text += (f", {result['bytes_per_allocation']:.0f} bytes/allocation live, "
+                         f"RSS +{result['rss_growth_bytes'] / MB:.1f} MB, {result['retained_bytes'] / MB:.1f} MB retained after free")
+            text += f"{self.format_timing(result)}\n"
+        
+        # STREAM bandwidth sweep, one line per working-set size
+        stream = {}
+        for key, result in mem_results.items():
+            if key.startswith("stream_"):
+                stream.setdefault(result["size_kb"], {})[result["operation"][len("stream_"):]] = result["bandwidth_mb_per_sec"]
+        for size_kb in sorted(stream):
+            kernels = ", ".join(f"{name} {bandwidth:.0f}" for name, bandwidth in stream[size_kb].items())
+            text += f"STREAM ({size_kb}KB working set): {kernels} MB/sec\n"
         return text
     
     def format_parallel_results(self, parallel_results):
@@ -40,45 +92,168 @@ class ReportGenerator:
         # Find sequential results
         sequential_results = {k: v for k, v in parallel_results.items() if "sequential_" in k}
         for key, result in sequential_results.items():
-            text += f"Sequential ({result['task_size']} tasks): {result['time_seconds']:.2f} seconds\n"
+            text += f"Sequential ({result['task_size']} tasks): {result['time_seconds']:.6f} seconds{self.format_timing(result)}\n"
         
         # Find best threading result
         threading_results = {k: v for k, v in parallel_results.items() if "threading_" in k}
         if threading_results:
             best_threading = min(threading_results.values(), key=lambda x: x['time_seconds'])
-            text += f"Best Threading ({best_threading['thread_count']} threads, {best_threading['task_size']} tasks): {best_threading['time_seconds']:.2f} seconds\n"
+            text += f"Best Threading ({best_threading['thread_count']} threads, {best_threading['task_size']} tasks): {best_threading['time_seconds']:.6f} seconds{self.format_timing(best_threading)}\n"
         
         # Find best multiprocessing result
         multiprocessing_results = {k: v for k, v in parallel_results.items() if "multiprocessing_" in k}
         if multiprocessing_results:
             best_multiprocessing = min(multiprocessing_results.values(), key=lambda x: x['time_seconds'])
-            text += f"Best Multiprocessing ({best_multiprocessing['process_count']} processes, {best_multiprocessing['task_size']} tasks): {best_multiprocessing['time_seconds']:.2f} seconds\n"
+            text += f"Best Multiprocessing ({best_multiprocessing['process_count']} processes, {best_multiprocessing['task_size']} tasks): {best_multiprocessing['time_seconds']:.6f} seconds{self.format_timing(best_multiprocessing)}\n"
+        
+        # Pickle vs shared memory data paths, with IPC split from compute
+        for path in ("pickle", "shared_memory"):
+            path_results = [v for v in parallel_results.values() if v.get("method") == path]
+            if path_results:
+                best = min(path_results, key=lambda x: x['time_seconds'])
+                text += f"Best {path.replace('_', ' ').title()} Data Path ({best['process_count']} processes, {best['task_size']} tasks): {best['time_seconds']:.6f} seconds{self.format_timing(best)}\n"
+                text += f"  compute {best['compute_seconds']:.6f} s, IPC {best['ipc_seconds']:.6f} s, {best['pickled_bytes'] / 1024:.1f} KB pickled, serialization {best['serialization_seconds'] * 1e3:.3f} ms"
+                if best.get("shared_setup_seconds") is not None:
+                    text += f", segment setup {best['shared_setup_seconds'] * 1e3:.3f} ms"
+                text += "\n"
+        
+        # GIL-free kernels next to the GIL-bound prime workload
+        gil_free = [v for v in parallel_results.values() if v.get("gil_bound") is False]
+        if gil_free:
+            build = "free-threaded" if gil_free[0].get("free_threaded_build") else "standard"
+            gil = "enabled" if gil_free[0].get("gil_enabled") else "disabled"
+            text += f"GIL-free kernels (CPython {build} build, GIL {gil}):\n"
+            for kernel in sorted({v["workload"] for v in gil_free}):
+                line = f"  {kernel}:"
+                for method in ("sequential", "threading", "multiprocessing"):
+                    candidates = [v for v in gil_free if v["workload"] == kernel and v["method"] == method]
+                    if candidates:
+                        best = max(candidates, key=lambda x: x["mb_per_second"])
+                        line += f" {method} {best['mb_per_second']:.1f} MB/sec"
+                        if method != "sequential":
+                            line += f" ({best['workers']} workers, {best.get('speedup', 0):.2f}x)"
+                        line += ";"
+                text += line.rstrip(";") + "\n"
         
+        # Event loop vs thread pool on the loopback echo workload
+        echo_results = [v for v in parallel_results.values() if v.get("workload") == "echo"]
+        for result in echo_results:
+            text += (f"Echo {result['method'].replace('_', ' ')} ({result['clients']} clients, {result['transport']}): "
+                     f"{result['requests_per_second']:.0f} requests/sec, latency p50 {result['latency_p50_seconds'] * 1e3:.3f} ms, "
+                     f"p95 {result['latency_p95_seconds'] * 1e3:.3f} ms, p99 {result['latency_p99_seconds'] * 1e3:.3f} ms")
+            if result.get("concurrency", result["clients"]) < result["clients"]:
+                text += f", only {result['concurrency']} in flight"
+            if result["method"] != "asyncio" and "relative_to_asyncio" in result:
+                text += f" ({result['relative_to_asyncio']:.2f}x asyncio)"
+            text += "\n"
+        if any(v.get("uvloop_installed") is False for v in echo_results):
+            text += "Echo asyncio uvloop: not run (uvloop not installed)\n"
+        
+        # Pool startup is reported apart from steady-state throughput
+        startup_results = [v for v in parallel_results.values() if v.get("method") == "pool_startup"]
+        for result in sorted(startup_results, key=lambda x: (x['pool_type'], x['worker_count'])):
+            text += f"Pool Startup ({result['pool_type']}, {result['worker_count']} workers): {result['startup_seconds'] * 1e3:.2f} ms\n"
+        
+        return text
+    
+    def format_storage_results(self, storage_results):
+        """Format storage I/O benchmark results for report"""
+        text = ""
+        titles = [("sequential_write", "Sequential Write"), ("sequential_read", "Sequential Read"),
+                  ("random_write", "Random Write"), ("random_read", "Random Read"),
+                  ("direct_write", "O_DIRECT Write"), ("direct_read", "O_DIRECT Read"),
+                  ("mmap_read", "mmap Read"), ("buffered_read", "Buffered Read")]
+        for operation, title in titles:
+            for result in sorted((v for v in storage_results.values() if v.get("operation") == operation),
+                                 key=lambda x: x['block_kb']):
+                text += f"{title} ({result['block_kb']}KB blocks"
+                if result.get("cache"):
+                    text += f", {result['cache']} cache"
+                text += f"): {result['mb_per_second']:.2f} MB/sec"
+                if "iops" in result:
+                    text += f", {result['iops']:.0f} IOPS"
+                text += f"{self.format_timing(result)}\n"
+        fsync = storage_results.get("fsync_latency")
+        if fsync:
+            text += (f"fsync Latency ({fsync['samples']} samples): p50 {fsync['p50_seconds'] * 1e3:.3f} ms, "
+                     f"p95 {fsync['p95_seconds'] * 1e3:.3f} ms, p99 {fsync['p99_seconds'] * 1e3:.3f} ms, "
+                     f"max {fsync['max_seconds'] * 1e3:.3f} ms\n")
         return text
     
     def generate_summary(self, results):
         """Generate a summary of the benchmark results"""
         system_info = results["system_info"]
-        cpu_cores = system_info["cpu_cores"]
-        total_memory = system_info["total_memory"]
+        cpu_cores = system_info.get("cpu_cores", "Unknown")
+        total_memory = system_info.get("total_memory", "Unknown")
         
-        # Calculate speedup from parallel processing
+        # Calculate speedup from parallel processing at the largest task size
         sequential_time = None
         best_parallel_time = None
         
-        for key, result in results["parallel"].items():
-            if "sequential_10000" in key:
-                sequential_time = result["time_seconds"]
-            elif "multiprocessing_10000_" in key:
-                if best_parallel_time is None or result["time_seconds"] < best_parallel_time:
-                    best_parallel_time = result["time_seconds"]
+        parallel_results = results.get("parallel", {})
+        sequential_sizes = [r["task_size"] for r in parallel_results.values() if r.get("method") == "sequential" and "task_size" in r]
+        if sequential_sizes:
+            task_size = max(sequential_sizes)
+            for result in parallel_results.values():
+                if result.get("task_size") != task_size:
+                    continue
+                if result.get("method") == "sequential":
+                    sequential_time = result["time_seconds"]
+                elif result.get("method") in ("threading", "multiprocessing"):
+                    if best_parallel_time is None or result["time_seconds"] < best_parallel_time:
+                        best_parallel_time = result["time_seconds"]
         
-        speedup = "N/A"
+        summary = f"System with {cpu_cores} CPU cores and {total_memory}GB of memory"
+        # Only claim a speedup when the parallel suite measured one
         if sequential_time and best_parallel_time:
-            speedup = f"{sequential_time / best_parallel_time:.2f}x"
+            summary += (f" shows a parallel processing speedup of {sequential_time / best_parallel_time:.2f}x"
+                        " with optimal configuration.")
+        else:
+            summary += "."
+        
+        # Fitted scaling laws from the core-scaling sweep
+        amdahl = parallel_results.get("scaling_fit_amdahl")
+        if amdahl:
+            max_speedup = f"{amdahl['max_speedup']:.1f}x" if amdahl["max_speedup"] else "unbounded"
+            summary += (f"\nAmdahl fit over {amdahl['worker_counts']} workers: parallel fraction "
+                        f"{amdahl['parallel_fraction']:.3f} (serial {amdahl['serial_fraction'] * 100:.1f}%), "
+                        f"maximum speedup {max_speedup}.")
+        gustafson = parallel_results.get("scaling_fit_gustafson")
+        if gustafson:
+            summary += f"\nGustafson fit (weak scaling): parallel fraction {gustafson['parallel_fraction']:.3f}."
+        efficiencies = [r for r in parallel_results.values() if r.get("method") == "strong_scaling" and "efficiency" in r]
+        if efficiencies:
+            summary += "\nStrong-scaling efficiency: " + ", ".join(
+                f"{r['workers']} workers {r['efficiency'] * 100:.0f}%" for r in sorted(efficiencies, key=lambda x: x["workers"]))
         
-        summary = f"System with {cpu_cores} CPU cores and {total_memory}GB of memory shows "
-        summary += f"a parallel processing speedup of {speedup} with optimal configuration."
+        # Cases whose resource samples suggest the timing is not trustworthy
+        flagged = {}
+        sampled = 0
+        for benchmark in BENCHMARK_SUITES:
+            for key, result in results.get(benchmark, {}).items():
+                resources = result.get("resources") if isinstance(result, dict) else None
+                if resources:
+                    sampled += 1
+                    for flag in resources.get("flags", []):
+                        flagged.setdefault(flag, []).append(f"{benchmark}/{key}")
+        if sampled:
+            if flagged:
+                for flag, cases in sorted(flagged.items()):
+                    shown = ", ".join(cases[:5]) + (f" and {len(cases) - 5} more" if len(cases) > 5 else "")
+                    summary += f"\nFlagged {flag.replace('_', ' ')}: {len(cases)} of {sampled} cases ({shown})."
+            else:
+                summary += f"\nResource sampling: no throttling or noisy-neighbor activity in {sampled} cases."
+        
+        # Profiler overhead of the separate profiled pass (the reported timings exclude it)
+        profiles = [result["profile"] for benchmark in BENCHMARK_SUITES
+                    for result in results.get(benchmark, {}).values()
+                    if isinstance(result, dict) and result.get("profile")]
+        overheads = sorted(p["overhead_percent"] for p in profiles if p.get("overhead_percent") is not None)
+        if profiles:
+            summary += (f"\nProfiled {len(profiles)} cases with {profiles[0]['profiler']} "
+                        f"(median overhead {overheads[len(overheads) // 2]:.1f}%, max {overheads[-1]:.1f}%), "
+                        f"stacks in {os.path.dirname(profiles[0]['stacks_file'])}."
+                        if overheads else f"\nProfiled {len(profiles)} cases with {profiles[0]['profiler']}.")
         
         return summary
     
@@ -88,21 +263,23 @@ class ReportGenerator:
         system_info = results["system_info"]
         
         # Format results
-        cpu_text = self.format_cpu_results(results["cpu"])
-        memory_text = self.format_memory_results(results["memory"])
-        parallel_text = self.format_parallel_results(results["parallel"])
+        cpu_text = self.format_cpu_results(results.get("cpu", {}))
+        memory_text = self.format_memory_results(results.get("memory", {})) or "Not run"
+        parallel_text = self.format_parallel_results(results.get("parallel", {})) or "Not run"
+        storage_text = self.format_storage_results(results.get("storage", {})) or "Not run"
         summary = self.generate_summary(results)
         
         # Generate report
         report_content = REPORT_TEMPLATE.format(
             timestamp=timestamp,
-            os_name=system_info["os_name"],
-            cpu_name=system_info["cpu_name"],
-            cpu_cores=system_info["cpu_cores"],
-            total_memory=system_info["total_memory"],
+            os_name=system_info.get("os_name", "Unknown"),
+            cpu_name=system_info.get("cpu_name", "Unknown"),
+            cpu_cores=system_info.get("cpu_cores", "Unknown"),
+            total_memory=system_info.get("total_memory", "Unknown"),
             cpu_results=cpu_text,
             memory_results=memory_text,
             parallel_results=parallel_text,
+            storage_results=storage_text,
             summary=summary
         )
         
@@ -114,3 +291,10 @@ class ReportGenerator:
             f.write(report_content)
         
         return report_path
+    
+    def create_report_from_store(self, store, run_id=None, host=None):
+        """Create a report for a stored run (latest run by default)"""
+        run_id = run_id or store.latest_run_id(host)
+        if run_id is None:
+            raise LookupError("No stored runs to report on")
+        return self.create_report(store.load_run(run_id))
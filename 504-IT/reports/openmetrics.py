@@ -0,0 +1,127 @@
+"""
+OpenMetrics text export of benchmark results
+
+Every numeric field of a case becomes a gauge sample named after the field
+(nested fields joined by underscores) and labelled with host, benchmark and
+config; a run_timestamp_seconds gauge per host carries the run id. The
+text avoids the info type and reserved suffixes, so the Prometheus text
+parser (for example the node_exporter textfile collector) accepts it too.
+"""
+
+import re
+import math
+import threading
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from config import BENCHMARK_SUITES, RESULTS_DB, METRICS_HOST, METRICS_PORT, METRICS_PREFIX
+from storage.results_store import ResultsStore, flatten_metrics
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+RESERVED_SUFFIXES = ("_total", "_created", "_count", "_sum", "_bucket", "_gcount", "_gsum", "_info")
+
+
+def family_name(metric, prefix=METRICS_PREFIX):
+    name = re.sub(r"[^a-zA-Z0-9_]", "_", prefix + metric)
+    return name + "_value" if name.endswith(RESERVED_SUFFIXES) else name
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def format_labels(labels):
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in labels.items()) + "}"
+
+
+def format_value(value):
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def render(runs, prefix=METRICS_PREFIX):
+    """OpenMetrics text for a list of results dicts (one per host)"""
+    families = {}
+
+    def add(metric, help_text, labels, value):
+        samples = families.setdefault(family_name(metric, prefix), (help_text, {}))[1]
+        samples.setdefault(tuple(labels.items()), value)
+
+    for results in runs:
+        host = results.get("host", "")
+        try:
+            started = datetime.fromisoformat(results["timestamp"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            started = None
+        if started is not None:
+            add("run_timestamp_seconds", "Start time of the host's latest run",
+                {"host": host, "run_id": results.get("run_id", "")}, started)
+        for benchmark in BENCHMARK_SUITES:
+            for config, case in results.get(benchmark, {}).items():
+                for metric, value in flatten_metrics(case):
+                    add(metric.replace(".", "_"), f"Benchmark result field {metric}",
+                        {"host": host, "benchmark": benchmark, "config": config}, value)
+
+    lines = []
+    for name, (help_text, samples) in sorted(families.items()):
+        lines += [f"# TYPE {name} gauge", f"# HELP {name} {help_text}"]
+        lines += [f"{name}{format_labels(dict(labels))} {format_value(value)}" for labels, value in samples.items()]
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def latest_runs(path=RESULTS_DB):
+    """Latest stored run of every host"""
+    with ResultsStore(path) as store:
+        return [store.load_run(run_id) for run_id, _ in store.latest_per_host().values()]
+
+
+def write_metrics(text, path):
+    with open(path, "w") as f:
+        f.write(text)
+    return path
+
+
+def _metrics_handler(source):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = source().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+
+class MetricsServer:
+    """Serve source() as /metrics on a daemon thread; source is called per scrape"""
+
+    def __init__(self, source, host=METRICS_HOST, port=METRICS_PORT):
+        self.server = ThreadingHTTPServer((host, port), _metrics_handler(source))
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,181 @@
+"""
+Regression detection against a stored baseline run
+"""
+
+import statistics
+
+from config import REGRESSION_THRESHOLD, REGRESSION_ROLLING_RUNS
+from benchmarks.timing import bootstrap_ci
+from storage.results_store import BENCHMARKS
+
+
+def case_time(case):
+    """Primary lower-is-better metric of a case and its (low, high) interval"""
+    if "time_seconds" in case:
+        value = case["time_seconds"]
+    elif "startup_seconds" in case:
+        value = case["startup_seconds"]
+    else:
+        return None, None
+    timing = case.get("timing")
+    if timing and value is not None:
+        return value, (timing["ci_low_seconds"], timing["ci_high_seconds"])
+    return value, None
+
+
+def run_cases(results):
+    """Set of (benchmark, config) pairs of a run that have a comparable time"""
+    return {(benchmark, config) for benchmark in BENCHMARKS
+            for config, case in results.get(benchmark, {}).items() if case_time(case)[0]}
+
+
+class RegressionDetector:
+    """Compare the cases of a run against a baseline run or a rolling median"""
+
+    def __init__(self, threshold=REGRESSION_THRESHOLD):
+        self.threshold = threshold
+
+    @staticmethod
+    def baseline_from_run(run):
+        """Baseline values and intervals taken directly from one stored run"""
+        baseline = {}
+        for benchmark in BENCHMARKS:
+            for config, case in run.get(benchmark, {}).items():
+                value, interval = case_time(case)
+                if value:
+                    baseline[(benchmark, config)] = (value, interval)
+        return baseline
+
+    @staticmethod
+    def baseline_from_runs(runs):
+        """Rolling baseline: per-case median across runs, bootstrap CI as its spread"""
+        samples = {}
+        for run in runs:
+            for benchmark in BENCHMARKS:
+                for config, case in run.get(benchmark, {}).items():
+                    value, _ = case_time(case)
+                    if value:
+                        samples.setdefault((benchmark, config), []).append(value)
+        baseline = {}
+        for key, values in samples.items():
+            interval = bootstrap_ci(values) if len(values) > 1 else None
+            baseline[key] = (statistics.median(values), interval)
+        return baseline
+
+    def compare(self, results, baseline):
+        """Return one finding per case present in both the run and the baseline
+
+        A case regresses when it is slower than the baseline by more than the
+        threshold and the confidence intervals of both sides do not overlap.
+        Cases without a recorded spread on either side (single-shot metrics
+        such as pool startup or fsync latency) cannot be told apart from
+        noise; changes beyond the threshold are reported as "unverified" and
+        never count as regressions.
+        """
+        findings = []
+        for benchmark in BENCHMARKS:
+            for config, case in results.get(benchmark, {}).items():
+                if (benchmark, config) not in baseline:
+                    continue
+                current, current_interval = case_time(case)
+                base, base_interval = baseline[(benchmark, config)]
+                if not current or not base:
+                    continue
+                change = current / base - 1.0
+                measured_spread = bool(current_interval and base_interval)
+                significant = measured_spread and (current_interval[0] > base_interval[1]
+                                                   or current_interval[1] < base_interval[0])
+                if change > self.threshold and significant:
+                    status = "regression"
+                elif change < -self.threshold and significant:
+                    status = "improvement"
+                elif abs(change) > self.threshold and not measured_spread:
+                    status = "unverified"
+                else:
+                    status = "unchanged"
+                findings.append({
+                    "benchmark": benchmark,
+                    "config": config,
+                    "baseline_seconds": base,
+                    "current_seconds": current,
+                    "change": change,
+                    "significant": significant,
+                    "status": status,
+                })
+        findings.sort(key=lambda f: f["change"], reverse=True)
+        return findings
+
+    @staticmethod
+    def missing_cases(results, baseline):
+        """Sorted (benchmark, config) pairs of the run that the baseline has no value for"""
+        return sorted(run_cases(results) - set(baseline))
+
+    @staticmethod
+    def has_regressions(findings):
+        return any(f["status"] == "regression" for f in findings)
+
+    def format_findings(self, findings, baseline_label, missing=()):
+        """Format findings as report text, listing run cases missing from the baseline"""
+        regressions = [f for f in findings if f["status"] == "regression"]
+        improvements = [f for f in findings if f["status"] == "improvement"]
+        unverified = [f for f in findings if f["status"] == "unverified"]
+        text = f"Compared {len(findings)} cases against {baseline_label} (threshold {self.threshold * 100:.1f}%)\n"
+        text += f"Regressions: {len(regressions)}, Improvements: {len(improvements)}"
+        text += f", Unverified (no recorded spread, not gated): {len(unverified)}\n" if unverified else "\n"
+        for f in regressions + improvements + unverified:
+            text += (f"{f['status'].upper()} {f['benchmark']}/{f['config']}: {f['change'] * 100:+.1f}% "
+                     f"({f['baseline_seconds']:.6f}s -> {f['current_seconds']:.6f}s)\n")
+        if missing:
+            text += f"Not in baseline ({len(missing)}): {format_cases(missing)}\n"
+        return text
+
+
+def format_cases(cases):
+    """Comma separated benchmark/config names"""
+    return ", ".join(f"{benchmark}/{config}" for benchmark, config in cases)
+
+
+def baseline_run_ids(store, count, host=None, exclude_run_id=None, profile=None, cases=None):
+    """Newest stored runs usable as a baseline, at most count of them
+
+    Only runs of the same host and profile qualify, and with cases given
+    (see run_cases) only runs that stored at least one of them.
+    """
+    run_ids = []
+    for run_id in store.recent_run_ids(host, -1, profile=profile):
+        if run_id == exclude_run_id:
+            continue
+        if cases is not None and not cases & store.case_keys(run_id):
+            continue
+        run_ids.append(run_id)
+        if len(run_ids) == count:
+            break
+    return run_ids
+
+
+def resolve_baseline(store, spec, host=None, exclude_run_id=None, default_runs=REGRESSION_ROLLING_RUNS,
+                     profile=None, cases=None):
+    """Build a baseline from a spec: a run id, "latest", or "rolling[:N]"
+
+    "latest" and "rolling" pick runs with baseline_run_ids, so a quick run
+    is never measured against a default one and a storage-only run never
+    serves as the baseline of a CPU run. An explicit run id is used as is.
+    Returns (baseline dict, human readable label).
+    """
+    spec = str(spec)
+    described = f" with profile '{profile}'" if profile else ""
+    if spec.startswith("rolling"):
+        count = int(spec.split(":", 1)[1]) if ":" in spec else default_runs
+        run_ids = baseline_run_ids(store, count, host, exclude_run_id, profile, cases)
+        if not run_ids:
+            raise LookupError(f"No stored runs{described} sharing cases with this run for a rolling baseline")
+        runs = [store.load_run(r) for r in run_ids]
+        return RegressionDetector.baseline_from_runs(runs), f"rolling median of {len(runs)} run(s)"
+    if spec == "latest":
+        run_ids = baseline_run_ids(store, 1, host, exclude_run_id, profile, cases)
+        if not run_ids:
+            raise LookupError(f"No previous stored run{described} sharing cases with this run to compare against")
+        run_id = run_ids[0]
+    else:
+        run_id = int(spec)
+    return RegressionDetector.baseline_from_run(store.load_run(run_id)), f"run {run_id}"
@@ -0,0 +1,58 @@
+"""
+Per-case streaming of benchmark results while a run is in progress
+"""
+
+import copy
+import json
+import threading
+from datetime import datetime
+
+
+class JsonLinesWriter:
+    """Write one JSON record per finished case and flush it immediately
+
+    Each record carries the run's host, start timestamp and profile next to
+    the suite, the case name and the case entry exactly as it appears in
+    the *_benchmark_*.json files.
+    """
+
+    def __init__(self, stream, host, run_timestamp, profile):
+        self.stream = stream
+        self.host = host
+        self.run_timestamp = run_timestamp
+        self.profile = profile
+
+    def __call__(self, benchmark, config, case):
+        record = {
+            "type": "case",
+            "timestamp": datetime.now().isoformat(),
+            "host": self.host,
+            "run_timestamp": self.run_timestamp,
+            "profile": self.profile,
+            "benchmark": benchmark,
+            "config": config,
+            "result": case,
+        }
+        self.stream.write(json.dumps(record, default=str) + "\n")
+        self.stream.flush()
+
+
+class LiveRun:
+    """Results dict of the running benchmark, safe to snapshot from another thread"""
+
+    def __init__(self, host, run_timestamp, profile):
+        self.lock = threading.Lock()
+        self.results = {"host": host, "timestamp": run_timestamp, "profile": profile}
+
+    def __call__(self, benchmark, config, case):
+        with self.lock:
+            self.results.setdefault(benchmark, {})[config] = copy.deepcopy(case)
+
+    def replace(self, results):
+        """Swap in the finished, stored results"""
+        with self.lock:
+            self.results = copy.deepcopy(results)
+
+    def snapshot(self):
+        with self.lock:
+            return copy.deepcopy(self.results)
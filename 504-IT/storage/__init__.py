@@ -0,0 +1,3 @@
+"""
+Persistent storage for benchmark results
+"""
@@ -0,0 +1,267 @@
+"""
+SQLite-backed historical store for benchmark results
+"""
+
+import os
+import re
+import json
+import glob
+import socket
+import sqlite3
+from datetime import datetime
+
+from config import RESULTS_DB
+
+BENCHMARKS = ("cpu", "memory", "parallel", "storage")
+JSON_FILE_PATTERN = re.compile(r"^(?P<benchmark>[a-z]+)_benchmark_(?P<stamp>\d{8}_\d{6})\.json$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    host TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    system_info TEXT,
+    profile TEXT,
+    suites TEXT
+);
+CREATE TABLE IF NOT EXISTS cases (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    benchmark TEXT NOT NULL,
+    config TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (run_id, benchmark, config)
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    benchmark TEXT NOT NULL,
+    config TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, benchmark, config, metric)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_host_time ON runs(host, timestamp);
+CREATE INDEX IF NOT EXISTS idx_runs_time ON runs(timestamp);
+CREATE INDEX IF NOT EXISTS idx_metrics_lookup ON metrics(benchmark, config, metric);
+"""
+
+# Columns added to runs after the first schema, for databases created before them
+RUN_COLUMNS = ("profile", "suites")
+
+
+def flatten_metrics(case, prefix=""):
+    """Yield (dotted name, value) for every numeric field of a result case"""
+    for name, value in case.items():
+        if isinstance(value, bool):
+            continue
+        if isinstance(value, (int, float)):
+            yield prefix + name, float(value)
+        elif isinstance(value, dict):
+            yield from flatten_metrics(value, f"{prefix}{name}.")
+
+
+class ResultsStore:
+    """Store runs keyed by host, timestamp, benchmark and configuration"""
+
+    def __init__(self, path=RESULTS_DB):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(runs)")}
+        with self.conn:
+            for column in RUN_COLUMNS:
+                if column not in columns:
+                    self.conn.execute(f"ALTER TABLE runs ADD COLUMN {column} TEXT")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def save_run(self, results, host=None):
+        """Store a complete results dict as one run and return its run_id
+
+        The run's profile and the suites it ran are kept with it; runs
+        without a "suites" list count every benchmark that has cases.
+        """
+        host = host or results.get("host") or socket.gethostname()
+        timestamp = results.get("timestamp") or datetime.now().isoformat()
+        suites = results.get("suites") or [benchmark for benchmark in BENCHMARKS if results.get(benchmark)]
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (host, timestamp, system_info, profile, suites) VALUES (?, ?, ?, ?, ?)",
+                (host, timestamp, json.dumps(results.get("system_info", {})), results.get("profile"),
+                 json.dumps(list(suites))),
+            )
+            run_id = cursor.lastrowid
+            for benchmark in BENCHMARKS:
+                if benchmark in results:
+                    self._insert_cases(run_id, benchmark, results[benchmark])
+        return run_id
+
+    def _insert_cases(self, run_id, benchmark, cases):
+        for config, case in cases.items():
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cases (run_id, benchmark, config, data) VALUES (?, ?, ?, ?)",
+                (run_id, benchmark, config, json.dumps(case)),
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO metrics (run_id, benchmark, config, metric, value) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, benchmark, config, metric, value) for metric, value in flatten_metrics(case)],
+            )
+
+    def ingest_directory(self, directory, host=None):
+        """Import legacy *_benchmark_YYYYMMDD_HHMMSS.json files, returning new run_ids
+
+        Files are grouped into runs in timestamp order; a run ends when a
+        benchmark that is already part of it appears again.
+        """
+        files = []
+        for path in glob.glob(os.path.join(directory, "*_benchmark_*.json")):
+            match = JSON_FILE_PATTERN.match(os.path.basename(path))
+            if match and match.group("benchmark") in BENCHMARKS:
+                stamp = datetime.strptime(match.group("stamp"), "%Y%m%d_%H%M%S")
+                files.append((stamp, match.group("benchmark"), path))
+        files.sort()
+
+        runs = []
+        current = None
+        for stamp, benchmark, path in files:
+            if current is None or benchmark in current:
+                current = {"timestamp": stamp.isoformat()}
+                runs.append(current)
+            with open(path) as f:
+                current[benchmark] = json.load(f)
+
+        return [self.save_run(run, host=host) for run in runs if not self._has_run(host, run["timestamp"])]
+
+    def _has_run(self, host, timestamp):
+        host = host or socket.gethostname()
+        row = self.conn.execute(
+            "SELECT 1 FROM runs WHERE host = ? AND timestamp = ?", (host, timestamp)
+        ).fetchone()
+        return row is not None
+
+    def load_run(self, run_id):
+        """Rebuild the results dict of a stored run"""
+        run = self.conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if run is None:
+            raise KeyError(f"No stored run with id {run_id}")
+        results = {
+            "run_id": run["run_id"],
+            "host": run["host"],
+            "timestamp": run["timestamp"],
+            "system_info": json.loads(run["system_info"] or "{}"),
+            "profile": run["profile"],
+            "suites": json.loads(run["suites"] or "[]"),
+        }
+        for row in self.conn.execute(
+            "SELECT benchmark, config, data FROM cases WHERE run_id = ? ORDER BY rowid", (run_id,)
+        ):
+            results.setdefault(row["benchmark"], {})[row["config"]] = json.loads(row["data"])
+        for benchmark in BENCHMARKS:
+            results.setdefault(benchmark, {})
+        return results
+
+    def latest_run_id(self, host=None):
+        """run_id of the most recent run, optionally restricted to one host"""
+        if host:
+            row = self.conn.execute(
+                "SELECT run_id FROM runs WHERE host = ? ORDER BY timestamp DESC, run_id DESC LIMIT 1", (host,)
+            ).fetchone()
+        else:
+            row = self.conn.execute(
+                "SELECT run_id FROM runs ORDER BY timestamp DESC, run_id DESC LIMIT 1"
+            ).fetchone()
+        return row["run_id"] if row else None
+
+    def recent_run_ids(self, host=None, limit=10, profile=None):
+        """run_ids of the most recent runs, newest first, optionally of one host and profile"""
+        query = "SELECT run_id FROM runs"
+        conditions, params = [], []
+        if host:
+            conditions.append("host = ?")
+            params.append(host)
+        if profile:
+            conditions.append("profile = ?")
+            params.append(profile)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY timestamp DESC, run_id DESC LIMIT ?"
+        return [row["run_id"] for row in self.conn.execute(query, params + [limit])]
+
+    def case_keys(self, run_id):
+        """Set of (benchmark, config) pairs stored for a run"""
+        rows = self.conn.execute("SELECT benchmark, config FROM cases WHERE run_id = ?", (run_id,))
+        return {(row["benchmark"], row["config"]) for row in rows}
+
+    def latest_per_host(self):
+        """Map each host to (run_id, timestamp) of its most recent run"""
+        rows = self.conn.execute(
+            """
+            SELECT host, MAX(timestamp) AS timestamp FROM runs GROUP BY host
+            """
+        ).fetchall()
+        latest = {}
+        for row in rows:
+            run = self.conn.execute(
+                "SELECT run_id FROM runs WHERE host = ? AND timestamp = ? ORDER BY run_id DESC LIMIT 1",
+                (row["host"], row["timestamp"]),
+            ).fetchone()
+            latest[row["host"]] = (run["run_id"], row["timestamp"])
+        return latest
+
+    def time_series(self, benchmark, config, metric, host=None):
+        """List of (timestamp, host, value) for one metric, oldest first"""
+        query = """
+            SELECT r.timestamp, r.host, m.value FROM metrics m
+            JOIN runs r ON r.run_id = m.run_id
+            WHERE m.benchmark = ? AND m.config = ? AND m.metric = ?
+        """
+        params = [benchmark, config, metric]
+        if host:
+            query += " AND r.host = ?"
+            params.append(host)
+        query += " ORDER BY r.timestamp"
+        return [tuple(row) for row in self.conn.execute(query, params)]
+
+    def slowest_hosts(self, benchmark, config, metric="time_seconds", limit=10, higher_is_slower=True):
+        """Rank hosts by the metric from their latest run, slowest first"""
+        order = "DESC" if higher_is_slower else "ASC"
+        query = f"""
+            SELECT r.host, r.timestamp, m.value FROM metrics m
+            JOIN runs r ON r.run_id = m.run_id
+            WHERE m.benchmark = ? AND m.config = ? AND m.metric = ?
+              AND r.run_id = (
+                  SELECT r2.run_id FROM runs r2 WHERE r2.host = r.host
+                  ORDER BY r2.timestamp DESC, r2.run_id DESC LIMIT 1
+              )
+            ORDER BY m.value {order}
+            LIMIT ?
+        """
+        return [tuple(row) for row in self.conn.execute(query, (benchmark, config, metric, limit))]
+
+    @staticmethod
+    def export_json(results, directory):
+        """Write a results dict as the legacy per-benchmark JSON files"""
+        os.makedirs(directory, exist_ok=True)
+        timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+        paths = []
+        for benchmark in BENCHMARKS:
+            if benchmark in results:
+                path = os.path.join(directory, f"{benchmark}_benchmark_{timestamp_str}.json")
+                with open(path, 'w') as f:
+                    json.dump(results[benchmark], f, indent=4)
+                paths.append(path)
+        return paths
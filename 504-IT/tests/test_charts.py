@@ -0,0 +1,60 @@
+"""
+Smoke test: every chart renders from a sample results dict
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from visualization.charts import ChartGenerator
+
+
+def timing(seconds):
+    return {"median_seconds": seconds, "ci_low_seconds": seconds * 0.95, "ci_high_seconds": seconds * 1.05}
+
+
+def sample_results():
+    cpu = {
+        "integer_ops": {"operations_per_second": 2.0e7, "time_seconds": 0.05, "timing": timing(0.05)},
+        "floating_point_ops_small": {"matrix_size": 100, "flops": 1.0e9, "time_seconds": 0.002},
+    }
+    for size, gflops in ((64, 5.0), (256, 20.0), (1024, 40.0)):
+        cpu[f"matmul_float64_{size}_threads_1"] = {"operation": "matmul_sweep", "dtype": "float64", "threads": 1,
+                                                    "matrix_size": size, "gflops": gflops, "blas": "openblas"}
+
+    memory = {"sequential_access_5mb": {"size_mb": 5, "bandwidth_mb_per_sec": 8000.0, "time_seconds": 0.001}}
+    for size_kb, bandwidth in ((16, 40000.0), (1024, 25000.0), (65536, 9000.0)):
+        for kernel in ("copy", "triad"):
+            memory[f"stream_{kernel}_{size_kb}kb"] = {"operation": f"stream_{kernel}", "size_kb": size_kb,
+                                                      "bandwidth_mb_per_sec": bandwidth}
+
+    parallel = {"sequential_500": {"task_size": 500, "time_seconds": 0.4}}
+    for count in (1, 2):
+        parallel[f"threading_500_{count}"] = {"task_size": 500, "thread_count": count, "time_seconds": 0.4}
+        parallel[f"multiprocessing_500_{count}"] = {"task_size": 500, "process_count": count, "time_seconds": 0.4 / count}
+        parallel[f"pickle_500_{count}"] = {"method": "pickle", "task_size": 500, "process_count": count,
+                                           "time_seconds": 0.5 / count}
+        parallel[f"gil_free_hash_threading_{count}"] = {"workload": "hash", "method": "threading", "workers": count,
+                                                        "gil_bound": False, "speedup": float(count)}
+        parallel[f"scaling_strong_{count}"] = {"method": "strong_scaling", "workers": count, "speedup": float(count),
+                                               "efficiency": 1.0}
+    parallel["scaling_fit_amdahl"] = {"parallel_fraction": 0.95}
+
+    storage = {f"seq_read_{kb}kb": {"operation": "sequential_read", "block_kb": kb, "mb_per_second": 100.0 * kb}
+               for kb in (4, 64)}
+    storage["fsync_latency"] = {"p50_seconds": 0.001, "p95_seconds": 0.002, "p99_seconds": 0.003,
+                                "max_seconds": 0.004}
+
+    return {"system_info": {"cache_sizes_kb": {"L1d": 32, "L2": 1024}},
+            "cpu": cpu, "memory": memory, "parallel": parallel, "storage": storage}
+
+
+def test_every_chart_renders(tmp_path):
+    generator = ChartGenerator(dpi=20, results_dir=str(tmp_path))
+    jobs = generator.chart_jobs(sample_results())
+    assert {name for name, _, _ in jobs} == {"cpu_performance", "memory_performance", "parallel_execution_time",
+                                              "parallel_scaling", "storage_performance"}
+    for name, method, args in jobs:
+        path = getattr(generator, method)(*args)
+        assert path and os.path.exists(path), f"{name} was not rendered"
@@ -0,0 +1,125 @@
+"""
+Regression detection and baseline selection
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from reports.regression import RegressionDetector, resolve_baseline, run_cases
+from storage.results_store import ResultsStore
+
+
+def case(seconds, spread=0.01):
+    """A timed case whose confidence interval is seconds +/- spread (relative)"""
+    timing = {"median_seconds": seconds, "ci_low_seconds": seconds * (1 - spread),
+              "ci_high_seconds": seconds * (1 + spread)}
+    return {"time_seconds": seconds, "timing": timing}
+
+
+def run(timestamp, profile="quick", host="bench", **suites):
+    return {"timestamp": timestamp, "host": host, "profile": profile, "suites": list(suites), **suites}
+
+
+def by_config(findings):
+    return {f["config"]: f for f in findings}
+
+
+class TestCompare:
+    detector = RegressionDetector(threshold=0.10)
+
+    def test_slower_with_separate_intervals_regresses(self):
+        baseline = RegressionDetector.baseline_from_run({"cpu": {"a": case(1.0)}})
+        findings = self.detector.compare({"cpu": {"a": case(1.5)}}, baseline)
+        assert findings[0]["status"] == "regression" and findings[0]["significant"]
+        assert findings[0]["change"] == pytest.approx(0.5)
+        assert RegressionDetector.has_regressions(findings)
+
+    def test_faster_with_separate_intervals_improves(self):
+        baseline = RegressionDetector.baseline_from_run({"cpu": {"a": case(1.0)}})
+        findings = self.detector.compare({"cpu": {"a": case(0.5)}}, baseline)
+        assert findings[0]["status"] == "improvement"
+        assert not RegressionDetector.has_regressions(findings)
+
+    def test_overlapping_intervals_are_not_significant(self):
+        baseline = RegressionDetector.baseline_from_run({"cpu": {"a": case(1.0, spread=0.3)}})
+        findings = self.detector.compare({"cpu": {"a": case(1.2, spread=0.3)}}, baseline)
+        assert findings[0]["status"] == "unchanged" and not findings[0]["significant"]
+
+    def test_change_below_threshold_is_unchanged(self):
+        baseline = RegressionDetector.baseline_from_run({"cpu": {"a": case(1.0, spread=0.001)}})
+        findings = self.detector.compare({"cpu": {"a": case(1.05, spread=0.001)}}, baseline)
+        assert findings[0]["significant"] and findings[0]["status"] == "unchanged"
+
+    def test_cases_without_spread_are_unverified_and_not_gated(self):
+        baseline = RegressionDetector.baseline_from_run({"storage": {"fsync": {"time_seconds": 0.001}}})
+        findings = self.detector.compare({"storage": {"fsync": {"time_seconds": 0.005}}}, baseline)
+        assert findings[0]["status"] == "unverified"
+        assert not RegressionDetector.has_regressions(findings)
+
+    def test_rolling_baseline_uses_the_median(self):
+        runs = [{"cpu": {"a": case(seconds)}} for seconds in (1.0, 1.1, 5.0)]
+        value, interval = RegressionDetector.baseline_from_runs(runs)[("cpu", "a")]
+        assert value == 1.1
+        assert interval[0] <= value <= interval[1]
+
+    def test_no_overlap_finds_nothing_and_lists_missing_cases(self):
+        baseline = RegressionDetector.baseline_from_run({"storage": {"seq_read": case(1.0)}})
+        results = {"cpu": {"b": case(1.0), "a": case(1.0)}}
+        assert self.detector.compare(results, baseline) == []
+        assert RegressionDetector.missing_cases(results, baseline) == [("cpu", "a"), ("cpu", "b")]
+
+    def test_partial_overlap_reports_the_missing_cases(self):
+        baseline = RegressionDetector.baseline_from_run({"cpu": {"a": case(1.0)}})
+        results = {"cpu": {"a": case(1.0), "new": case(1.0)}}
+        findings = self.detector.compare(results, baseline)
+        missing = RegressionDetector.missing_cases(results, baseline)
+        assert [f["config"] for f in findings] == ["a"]
+        assert "Not in baseline (1): cpu/new" in self.detector.format_findings(findings, "run 1", missing)
+
+
+class TestResolveBaseline:
+    @pytest.fixture
+    def store(self, tmp_path):
+        with ResultsStore(str(tmp_path / "results.db")) as store:
+            self.quick_cpu = store.save_run(run("2026-01-01T00:00:00", cpu={"a": case(1.0)}))
+            self.default_cpu = store.save_run(run("2026-01-02T00:00:00", profile="default", cpu={"a": case(9.0)}))
+            self.storage_only = store.save_run(run("2026-01-03T00:00:00", storage={"seq_read": case(1.0)}))
+            self.other_host = store.save_run(run("2026-01-04T00:00:00", host="elsewhere", cpu={"a": case(2.0)}))
+            yield store
+
+    def resolve(self, store, spec, results, **kwargs):
+        return resolve_baseline(store, spec, host="bench", profile=results["profile"], cases=run_cases(results),
+                                **kwargs)
+
+    def test_latest_skips_other_profiles_suites_and_hosts(self, store):
+        baseline, label = self.resolve(store, "latest", run("2026-02-01T00:00:00", cpu={"a": case(1.0)}))
+        assert label == f"run {self.quick_cpu}"
+        assert baseline[("cpu", "a")][0] == 1.0
+
+    def test_latest_excludes_the_current_run(self, store):
+        results = run("2026-02-01T00:00:00", cpu={"a": case(1.0)})
+        current = store.save_run(results)
+        _, label = self.resolve(store, "latest", results, exclude_run_id=current)
+        assert label == f"run {self.quick_cpu}"
+
+    def test_rolling_uses_only_matching_runs(self, store):
+        store.save_run(run("2026-01-05T00:00:00", cpu={"a": case(3.0)}))
+        baseline, label = self.resolve(store, "rolling:5", run("2026-02-01T00:00:00", cpu={"a": case(1.0)}))
+        assert label == "rolling median of 2 run(s)"
+        assert baseline[("cpu", "a")][0] == 2.0
+
+    def test_no_matching_run_raises(self, store):
+        for spec in ("latest", "rolling"):
+            with pytest.raises(LookupError):
+                self.resolve(store, spec, run("2026-02-01T00:00:00", memory={"stream": case(1.0)}))
+        with pytest.raises(LookupError):
+            self.resolve(store, "latest", run("2026-02-01T00:00:00", profile="full", cpu={"a": case(1.0)}))
+
+    def test_explicit_run_id_is_used_as_is(self, store):
+        baseline, label = self.resolve(store, str(self.default_cpu), run("2026-02-01T00:00:00", cpu={"a": case(1.0)}))
+        assert label == f"run {self.default_cpu}"
+        assert baseline[("cpu", "a")][0] == 9.0
@@ -0,0 +1,100 @@
+"""
+ResultsStore round trips and queries on a temporary database
+"""
+
+import os
+import sys
+import sqlite3
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from storage.results_store import ResultsStore, BENCHMARKS
+
+
+def sample_run(**extra):
+    run = {
+        "timestamp": "2026-01-02T03:04:05",
+        "host": "bench-a",
+        "system_info": {"cpu_cores": 8, "cache_sizes_kb": {"L1d": 32}},
+        "profile": "quick",
+        "suites": ["cpu", "storage"],
+        "cpu": {
+            "integer_ops": {"time_seconds": 0.05, "operations_per_second": 2.0e7, "gil_bound": True,
+                            "timing": {"median_seconds": 0.05, "ci_low_seconds": 0.049, "ci_high_seconds": 0.051}},
+        },
+        "storage": {
+            "fsync_latency": {"p50_seconds": 0.001, "samples": 100, "resources": {"flags": ["throttled"]}},
+        },
+    }
+    run.update(extra)
+    return run
+
+
+def test_save_and_load_round_trip(tmp_path):
+    with ResultsStore(str(tmp_path / "results.db")) as store:
+        run = sample_run()
+        run_id = store.save_run(run)
+        loaded = store.load_run(run_id)
+
+    assert loaded["run_id"] == run_id
+    for key in ("host", "timestamp", "system_info", "profile", "suites", "cpu", "storage"):
+        assert loaded[key] == run[key]
+    # Benchmarks the run did not include come back empty
+    assert loaded["memory"] == {} and loaded["parallel"] == {}
+    assert set(BENCHMARKS) <= set(loaded)
+
+
+def test_suites_default_to_the_benchmarks_with_cases(tmp_path):
+    run = sample_run()
+    del run["suites"], run["profile"]
+    with ResultsStore(str(tmp_path / "results.db")) as store:
+        loaded = store.load_run(store.save_run(run, host="legacy"))
+    assert loaded["host"] == "legacy"
+    assert loaded["suites"] == ["cpu", "storage"]
+    assert loaded["profile"] is None
+
+
+def test_numeric_fields_become_metrics(tmp_path):
+    with ResultsStore(str(tmp_path / "results.db")) as store:
+        store.save_run(sample_run())
+        store.save_run(sample_run(timestamp="2026-01-03T00:00:00", host="bench-b"))
+        series = store.time_series("cpu", "integer_ops", "timing.median_seconds")
+        assert series == [("2026-01-02T03:04:05", "bench-a", 0.05), ("2026-01-03T00:00:00", "bench-b", 0.05)]
+        # Booleans are not metrics
+        assert store.time_series("cpu", "integer_ops", "gil_bound") == []
+        assert store.case_keys(store.latest_run_id()) == {("cpu", "integer_ops"), ("storage", "fsync_latency")}
+
+
+def test_recent_run_ids_filter_by_host_and_profile(tmp_path):
+    with ResultsStore(str(tmp_path / "results.db")) as store:
+        first = store.save_run(sample_run(timestamp="2026-01-01T00:00:00"))
+        other_host = store.save_run(sample_run(timestamp="2026-01-02T00:00:00", host="bench-b"))
+        default = store.save_run(sample_run(timestamp="2026-01-03T00:00:00", profile="default"))
+        last = store.save_run(sample_run(timestamp="2026-01-04T00:00:00"))
+        assert store.recent_run_ids(limit=-1) == [last, default, other_host, first]
+        assert store.recent_run_ids("bench-a", -1, profile="quick") == [last, first]
+        assert store.recent_run_ids("bench-a", 1) == [last]
+        assert store.latest_run_id("bench-b") == other_host
+
+
+def test_databases_from_before_the_profile_columns_are_migrated(tmp_path):
+    path = str(tmp_path / "results.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE runs (run_id INTEGER PRIMARY KEY AUTOINCREMENT, host TEXT NOT NULL, "
+                 "timestamp TEXT NOT NULL, system_info TEXT)")
+    conn.execute("INSERT INTO runs (host, timestamp, system_info) VALUES ('old', '2025-01-01T00:00:00', '{}')")
+    conn.commit()
+    conn.close()
+
+    with ResultsStore(path) as store:
+        old = store.load_run(1)
+        assert old["profile"] is None and old["suites"] == []
+        assert store.load_run(store.save_run(sample_run()))["profile"] == "quick"
+
+
+def test_unknown_run_raises_key_error(tmp_path):
+    with ResultsStore(str(tmp_path / "results.db")) as store:
+        with pytest.raises(KeyError):
+            store.load_run(42)
@@ -0,0 +1,52 @@
+"""
+Segmented sieve prime counts against known values and the plain sieve
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from benchmarks.sieve import simple_sieve, count_primes_segmented, segmented_sieve
+
+
+class SerialPool:
+    """Stand-in for multiprocessing.Pool that runs starmap in this process"""
+
+    def starmap(self, func, iterable, chunksize=1):
+        return [func(*args) for args in iterable]
+
+
+# pi(n): number of primes below n
+KNOWN_COUNTS = [(0, 0), (2, 0), (3, 1), (4, 2), (10, 4), (100, 25), (1000, 168), (10 ** 6, 78498)]
+
+
+@pytest.mark.parametrize("limit,expected", KNOWN_COUNTS)
+def test_segmented_sieve_matches_known_counts(limit, expected):
+    count, _, _ = segmented_sieve(limit, 64)
+    assert count == expected
+
+
+@pytest.mark.parametrize("segment_bytes", [1, 7, 64, 4096])
+def test_segment_size_does_not_change_the_count(segment_bytes):
+    limit = 50_000
+    count, segments, _ = count_primes_segmented(0, limit, segment_bytes)
+    assert count == len(simple_sieve(limit - 1))
+    assert segments == -(-(limit - 3) // (2 * segment_bytes))
+
+
+def test_ranges_add_up_to_the_whole():
+    limit = 30_011
+    bounds = [0, 2, 3, 97, 1000, 1001, 17_000, limit]
+    total = sum(count_primes_segmented(low, high, 32)[0] for low, high in zip(bounds, bounds[1:]))
+    assert total == len(simple_sieve(limit - 1))
+
+
+def test_pool_blocks_match_the_serial_count():
+    limit = 200_003
+    serial, serial_segments, _ = segmented_sieve(limit, 256)
+    pooled, pooled_segments, _ = segmented_sieve(limit, 256, pool=SerialPool(), workers=3)
+    assert pooled == serial == len(simple_sieve(limit - 1))
+    assert pooled_segments >= serial_segments
@@ -3,47 +3,72 @@ Chart generation for benchmark results
 """
 
 import os
+import matplotlib
+matplotlib.use("Agg")  # headless hosts have no display; never pick an interactive backend
 import matplotlib.pyplot as plt
-from config import RESULTS_DIR, CHART_DPI, CHART_STYLE
+from config import RESULTS_DIR, CHART_DPI, CHART_STYLE, CHART_FORMAT
 
 class ChartGenerator:
     """Generate charts from benchmark results"""
     
-    def __init__(self):
+    def __init__(self, dpi=CHART_DPI, fmt=CHART_FORMAT, results_dir=RESULTS_DIR):
         try:
             plt.style.use(CHART_STYLE)
         except:
             plt.style.use('default')
-        self.results_dir = RESULTS_DIR
+        self.dpi = dpi
+        self.fmt = fmt
+        self.results_dir = results_dir
         os.makedirs(self.results_dir, exist_ok=True)
     
-    def generate_cpu_chart(self, cpu_results):
+    def chart_path(self, name):
+        """Default output path for a chart name in the configured format"""
+        return os.path.join(self.results_dir, f"{name}.{self.fmt}")
+    
+    def generate_cpu_chart(self, cpu_results, chart_path=None):
         """Generate CPU performance chart"""
         try:
             fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
             
             # Integer operations
-            ops_sec = cpu_results["integer_ops"]["operations_per_second"]
-            ax1.bar(["Integer Ops"], [ops_sec], color='skyblue')
-            ax1.set_ylabel('Operations per Second')
-            ax1.set_title('CPU Integer Performance')
-            ax1.set_ylim(0, ops_sec * 1.2)
-            
-            # Floating point operations
-            sizes = ["Small (50)", "Medium (150)"]
-            flops = [
-                cpu_results["floating_point_ops_small"]["flops"],
-                cpu_results["floating_point_ops_medium"]["flops"]
-            ]
-            
-            ax2.bar(sizes, flops, color='lightcoral')
-            ax2.set_ylabel('FLOPS')
-            ax2.set_title('CPU Floating Point Performance')
-            ax2.set_ylim(0, max(flops) * 1.2)
+            if "integer_ops" in cpu_results:
+                ops_sec = cpu_results["integer_ops"]["operations_per_second"]
+                ax1.bar(["Integer Ops"], [ops_sec], color='skyblue')
+                ax1.set_ylabel('Operations per Second')
+                ax1.set_title('CPU Integer Performance')
+                ax1.set_ylim(0, ops_sec * 1.2)
+            
+            # Floating point operations: the matmul size-vs-GFLOPS curve when swept, fixed sizes otherwise
+            fp_results = [v for k, v in cpu_results.items() if k.startswith("floating_point_ops_")]
+            matmul_results = [v for v in cpu_results.values() if v.get("operation") == "matmul_sweep"]
+            if matmul_results:
+                for dtype, threads in sorted({(v["dtype"], v["threads"]) for v in matmul_results}):
+                    curve = sorted((v["matrix_size"], v["gflops"]) for v in matmul_results
+                                   if v["dtype"] == dtype and v["threads"] == threads)
+                    ax2.plot([p[0] for p in curve], [p[1] for p in curve], marker='o', linewidth=2,
+                             linestyle='-' if threads == 1 else '--',
+                             label=f"{dtype}, {threads} thread{'s' if threads > 1 else ''}")
+                ax2.set_xscale('log', base=2)
+                sizes = sorted({v["matrix_size"] for v in matmul_results})
+                ax2.set_xticks(sizes)
+                ax2.set_xticklabels([str(size) for size in sizes])
+                ax2.set_xlabel('Matrix Size (N x N)')
+                ax2.set_ylabel('GFLOPS')
+                ax2.set_title(f'Matrix Multiplication ({matmul_results[0]["blas"]})')
+                ax2.grid(True, alpha=0.3)
+                ax2.legend()
+            elif fp_results:
+                sizes = [f"{v['matrix_size']}x{v['matrix_size']}" for v in fp_results]
+                flops = [v["flops"] for v in fp_results]
+                
+                ax2.bar(sizes, flops, color='lightcoral')
+                ax2.set_ylabel('FLOPS')
+                ax2.set_title('CPU Floating Point Performance')
+                ax2.set_ylim(0, max(flops) * 1.2)
             
             plt.tight_layout()
-            chart_path = os.path.join(self.results_dir, "cpu_performance.png")
-            plt.savefig(chart_path, dpi=CHART_DPI)
+            chart_path = chart_path or self.chart_path("cpu_performance")
+            plt.savefig(chart_path, dpi=self.dpi)
             plt.close()
             
             print(f"[OK] CPU chart saved: {chart_path}")
@@ -52,10 +77,14 @@ class ChartGenerator:
             print(f"[ERROR] CPU chart failed: {e}")
             return None
     
-    def generate_memory_chart(self, mem_results):
+    def generate_memory_chart(self, mem_results, cache_sizes=None, chart_path=None):
         """Generate memory performance chart"""
         try:
-            fig, ax = plt.subplots(1, 1, figsize=(12, 6))
+            stream_data = {k: v for k, v in mem_results.items() if k.startswith("stream_")}
+            if stream_data:
+                fig, (ax, ax2) = plt.subplots(1, 2, figsize=(18, 6))
+            else:
+                fig, ax = plt.subplots(1, 1, figsize=(12, 6))
             
             # Sequential access
             seq_data = {k: v for k, v in mem_results.items() if "sequential_access" in k}
@@ -67,9 +96,31 @@ class ChartGenerator:
                 ax.set_title('Sequential Memory Access Performance')
                 ax.set_ylim(0, max(values) * 1.2)
             
+            # STREAM bandwidth vs working-set size, with cache boundaries
+            if stream_data:
+                kernels = {}
+                for result in stream_data.values():
+                    name = result["operation"][len("stream_"):]
+                    kernels.setdefault(name, []).append((result["size_kb"], result["bandwidth_mb_per_sec"]))
+                for name, points in kernels.items():
+                    points.sort()
+                    ax2.plot([p[0] for p in points], [p[1] for p in points], marker='o', linewidth=2, label=name.capitalize())
+                for level, size_kb in (cache_sizes or {}).items():
+                    ax2.axvline(x=size_kb, color='gray', linestyle='--', alpha=0.6)
+                    ax2.text(size_kb, ax2.get_ylim()[1] * 0.95, f" {level}", color='gray')
+                ax2.set_xscale('log', base=2)
+                sizes = sorted({v["size_kb"] for v in stream_data.values()})
+                ax2.set_xticks(sizes)
+                ax2.set_xticklabels([str(size) for size in sizes])
+                ax2.set_xlabel('Working Set Size (KB)')
+                ax2.set_ylabel('MB/sec')
+                ax2.set_title('STREAM Bandwidth vs Working Set Size')
+                ax2.grid(True, alpha=0.3)
+                ax2.legend(loc='best')
+            
             plt.tight_layout()
-            chart_path = os.path.join(self.results_dir, "memory_performance.png")
-            plt.savefig(chart_path, dpi=CHART_DPI)
+            chart_path = chart_path or self.chart_path("memory_performance")
+            plt.savefig(chart_path, dpi=self.dpi)
             plt.close()
             
             print(f"[OK] Memory chart saved: {chart_path}")
@@ -78,7 +129,7 @@ class ChartGenerator:
             print(f"[ERROR] Memory chart failed: {e}")
             return None
     
-    def generate_parallel_chart(self, parallel_results):
+    def generate_parallel_chart(self, parallel_results, chart_path=None):
         """Generate execution time line graph: sequential vs parallel execution"""
         try:
             # Extract data for each task size
@@ -87,9 +138,12 @@ class ChartGenerator:
                 task_size = result.get("task_size")
                 if task_size:
                     if task_size not in task_sizes:
-                        task_sizes[task_size] = {"sequential": None, "threading": {}, "multiprocessing": {}}
+                        task_sizes[task_size] = {"sequential": None, "threading": {}, "multiprocessing": {},
+                                                 "pickle": {}, "shared_memory": {}}
                     
-                    if "sequential_" in key:
+                    if result.get("method") in ("pickle", "shared_memory"):
+                        task_sizes[task_size][result["method"]][result["process_count"]] = result["time_seconds"]
+                    elif "sequential_" in key:
                         task_sizes[task_size]["sequential"] = result["time_seconds"]
                     elif "threading_" in key:
                         thread_count = result.get("thread_count")
@@ -107,7 +161,11 @@ class ChartGenerator:
             max_task_size = max(task_sizes.keys())
             data = task_sizes[max_task_size]
             
-            fig, ax = plt.subplots(figsize=(12, 7))
+            gil_free = [r for r in parallel_results.values() if r.get("gil_bound") is False and "speedup" in r]
+            if gil_free:
+                fig, (ax, ax2) = plt.subplots(1, 2, figsize=(20, 7))
+            else:
+                fig, ax = plt.subplots(figsize=(12, 7))
             
             # Plot sequential baseline
             if data["sequential"]:
@@ -125,6 +183,14 @@ class ChartGenerator:
                 process_times = [data["multiprocessing"][pc] for pc in process_counts]
                 ax.plot(process_counts, process_times, marker='s', linewidth=2.5, markersize=10, label='Multiprocessing (Multi-core)', color='blue')
             
+            # Plot the array workload through pickled slices vs shared memory
+            for path, label, color in (("pickle", 'Pickled array (multiprocessing)', 'orange'),
+                                       ("shared_memory", 'Shared memory (multiprocessing)', 'purple')):
+                if data[path]:
+                    process_counts = sorted(data[path].keys())
+                    ax.plot(process_counts, [data[path][pc] for pc in process_counts], marker='^', linewidth=2,
+                            markersize=9, linestyle='-.', label=label, color=color)
+            
             ax.set_xlabel('Number of CPU Cores / Threads', fontsize=12, fontweight='bold')
             ax.set_ylabel('Execution Time (seconds)', fontsize=12, fontweight='bold')
             ax.set_title(f'Execution Time: Sequential vs Parallel Execution\n(Task Size: {max_task_size} primes)', fontsize=14, fontweight='bold')
@@ -133,13 +199,44 @@ class ChartGenerator:
             
             # Set x-axis ticks
             all_cores = sorted(set((list(data["threading"].keys()) if data["threading"] else []) + 
-                                   (list(data["multiprocessing"].keys()) if data["multiprocessing"] else [])))
+                                   (list(data["multiprocessing"].keys()) if data["multiprocessing"] else []) +
+                                   list(data["pickle"].keys()) + list(data["shared_memory"].keys())))
             if all_cores:
                 ax.set_xticks(all_cores)
             
+            # Speedup of GIL-bound vs GIL-free work on threads and processes
+            if gil_free:
+                sequential_time = data["sequential"]
+                styles = {"threading": ('o', '-'), "multiprocessing": ('s', '--')}
+                if sequential_time:
+                    for method, counts in (("threading", data["threading"]), ("multiprocessing", data["multiprocessing"])):
+                        if counts:
+                            workers = sorted(counts)
+                            marker, linestyle = styles[method]
+                            ax2.plot(workers, [sequential_time / counts[w] for w in workers], marker=marker,
+                                     linestyle=linestyle, color='black', linewidth=2, label=f'Pure Python primes ({method})')
+                for kernel in sorted({r["workload"] for r in gil_free}):
+                    for method, (marker, linestyle) in styles.items():
+                        points = sorted((r["workers"], r["speedup"]) for r in gil_free
+                                        if r["workload"] == kernel and r["method"] == method)
+                        if points:
+                            ax2.plot([p[0] for p in points], [p[1] for p in points], marker=marker,
+                                     linestyle=linestyle, linewidth=2, label=f'{kernel} ({method})')
+                build = "free-threaded CPython" if gil_free[0].get("free_threaded_build") else "CPython with GIL"
+                if gil_free[0].get("free_threaded_build") and gil_free[0].get("gil_enabled"):
+                    build += " (GIL re-enabled)"
+                ax2.axhline(y=1.0, color='gray', linestyle=':')
+                ax2.set_xlabel('Number of Workers', fontsize=12, fontweight='bold')
+                ax2.set_ylabel('Speedup vs Sequential', fontsize=12, fontweight='bold')
+                ax2.set_title(f'GIL-bound vs GIL-free Work\n({build})', fontsize=14, fontweight='bold')
+                ax2.grid(True, alpha=0.3)
+                ax2.legend(fontsize=9, loc='best')
+                if all_cores:
+                    ax2.set_xticks(all_cores)
+            
             plt.tight_layout()
-            chart_path = os.path.join(self.results_dir, "parallel_execution_time.png")
-            plt.savefig(chart_path, dpi=CHART_DPI)
+            chart_path = chart_path or self.chart_path("parallel_execution_time")
+            plt.savefig(chart_path, dpi=self.dpi)
             plt.close()
             
             print(f"[OK] Parallel execution time chart saved: {chart_path}")
@@ -148,15 +245,193 @@ class ChartGenerator:
             print(f"[ERROR] Parallel chart failed: {e}")
             return None
     
-    def generate_all(self, results):
-        """Generate all charts from benchmark results"""
+    def generate_storage_chart(self, storage_results, chart_path=None):
+        """Generate storage throughput vs block size and fsync latency chart"""
+        try:
+            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(18, 6))
+            
+            # Throughput per operation across block sizes
+            styles = {"sequential_read": ('o', '-'), "sequential_write": ('s', '-'),
+                      "random_read": ('o', '--'), "random_write": ('s', '--'),
+                      "direct_read": ('^', ':'), "direct_write": ('v', ':'),
+                      "mmap_read": ('D', '-.'), "buffered_read": ('x', '-.')}
+            block_sizes = set()
+            for operation, (marker, linestyle) in styles.items():
+                points = sorted((v["block_kb"], v["mb_per_second"]) for v in storage_results.values()
+                                if v.get("operation") == operation)
+                if points:
+                    block_sizes.update(p[0] for p in points)
+                    ax1.plot([p[0] for p in points], [p[1] for p in points], marker=marker, linestyle=linestyle,
+                             linewidth=2, label=operation.replace("_", " "))
+            if block_sizes:
+                ax1.set_xscale('log', base=2)
+                ax1.set_yscale('log')
+                ax1.set_xticks(sorted(block_sizes))
+                ax1.set_xticklabels([f"{kb}KB" for kb in sorted(block_sizes)])
+                ax1.legend(fontsize=9)
+            ax1.set_xlabel('Block Size')
+            ax1.set_ylabel('Throughput (MB/sec)')
+            ax1.set_title('Storage Throughput by Block Size')
+            ax1.grid(True, alpha=0.3)
+            
+            # fsync latency percentiles
+            fsync = storage_results.get("fsync_latency")
+            if fsync:
+                labels = ["p50", "p95", "p99", "max"]
+                values = [fsync[f"{label}_seconds"] * 1e3 for label in labels]
+                ax2.bar(labels, values, color='slategray')
+                ax2.set_ylim(0, max(values) * 1.2)
+            ax2.set_ylabel('Latency (ms)')
+            ax2.set_title('fsync Latency (4KB write + fsync)')
+            
+            plt.tight_layout()
+            chart_path = chart_path or self.chart_path("storage_performance")
+            plt.savefig(chart_path, dpi=self.dpi)
+            plt.close()
+            
+            print(f"[OK] Storage chart saved: {chart_path}")
+            return chart_path
+        except Exception as e:
+            print(f"[ERROR] Storage chart failed: {e}")
+            return None
+    
+    def generate_scaling_chart(self, parallel_results, chart_path=None):
+        """Plot strong/weak scaling speedup per worker count against ideal and the Amdahl fit"""
+        try:
+            from benchmarks.scaling import amdahl_speedup
+            
+            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+            for mode, color in (("strong_scaling", 'blue'), ("weak_scaling", 'green')):
+                points = sorted((r["workers"], r["speedup"], r["efficiency"]) for r in parallel_results.values()
+                                if r.get("method") == mode and "speedup" in r)
+                if not points:
+                    continue
+                workers = [p[0] for p in points]
+                label = mode.replace("_", " ").capitalize()
+                ax1.plot(workers, [p[1] for p in points], marker='o', linewidth=2.5, color=color, label=label)
+                ax2.plot(workers, [p[2] * 100 for p in points], marker='o', linewidth=2.5, color=color, label=label)
+            
+            counts = sorted({r["workers"] for r in parallel_results.values() if "workers" in r})
+            if counts:
+                ax1.plot(counts, counts, linestyle=':', color='gray', label='Ideal')
+                amdahl = parallel_results.get("scaling_fit_amdahl")
+                if amdahl:
+                    p = amdahl["parallel_fraction"]
+                    ax1.plot(counts, [amdahl_speedup(p, n) for n in counts], linestyle='--', color='red',
+                             label=f"Amdahl fit (p={p:.3f})")
+                ax1.set_xticks(counts)
+                ax2.set_xticks(counts)
+            
+            ax1.set_xlabel('Workers (pinned processes)')
+            ax1.set_ylabel('Speedup')
+            ax1.set_title('Core Scaling: Speedup')
+            ax1.grid(True, alpha=0.3)
+            ax1.legend(loc='best')
+            ax2.set_xlabel('Workers (pinned processes)')
+            ax2.set_ylabel('Parallel Efficiency (%)')
+            ax2.set_title('Core Scaling: Efficiency')
+            ax2.grid(True, alpha=0.3)
+            ax2.legend(loc='best')
+            
+            plt.tight_layout()
+            chart_path = chart_path or self.chart_path("parallel_scaling")
+            plt.savefig(chart_path, dpi=self.dpi)
+            plt.close()
+            
+            print(f"[OK] Scaling chart saved: {chart_path}")
+            return chart_path
+        except Exception as e:
+            print(f"[ERROR] Scaling chart failed: {e}")
+            return None
+    
+    def generate_history_chart(self, store, benchmark, config, metric="time_seconds"):
+        """Plot one metric over time for every host in the results store"""
+        try:
+            series = {}
+            for timestamp, host, value in store.time_series(benchmark, config, metric):
+                series.setdefault(host, []).append((timestamp, value))
+            if not series:
+                return None
+            
+            fig, ax = plt.subplots(figsize=(12, 6))
+            for host, points in series.items():
+                ax.plot([p[0] for p in points], [p[1] for p in points], marker='o', label=host)
+            ax.set_xlabel('Run Timestamp')
+            ax.set_ylabel(metric)
+            ax.set_title(f'{benchmark} / {config}: {metric} over time')
+            ax.grid(True, alpha=0.3)
+            ax.legend(loc='best')
+            fig.autofmt_xdate()
+            
+            plt.tight_layout()
+            chart_path = self.chart_path(f"history_{benchmark}_{config}_{metric}")
+            plt.savefig(chart_path, dpi=self.dpi)
+            plt.close()
+            
+            print(f"[OK] History chart saved: {chart_path}")
+            return chart_path
+        except Exception as e:
+            print(f"[ERROR] History chart failed: {e}")
+            return None
+    
+    def generate_from_store(self, store, run_id=None, host=None):
+        """Generate all charts for a stored run (latest run by default)"""
+        run_id = run_id or store.latest_run_id(host)
+        if run_id is None:
+            print("[ERROR] No stored runs to chart")
+            return {}
+        return self.generate_all(store.load_run(run_id))
+    
+    def chart_jobs(self, results):
+        """Describe the charts for a results dict as (name, method, args) jobs"""
+        jobs = []
+        if results.get("cpu"):
+            jobs.append(("cpu_performance", "generate_cpu_chart", (results["cpu"],)))
+        if results.get("memory"):
+            cache_sizes = results.get("system_info", {}).get("cache_sizes_kb")
+            jobs.append(("memory_performance", "generate_memory_chart", (results["memory"], cache_sizes)))
+        if results.get("parallel"):
+            jobs.append(("parallel_execution_time", "generate_parallel_chart", (results["parallel"],)))
+            if any(r.get("method") == "strong_scaling" for r in results["parallel"].values()):
+                jobs.append(("parallel_scaling", "generate_scaling_chart", (results["parallel"],)))
+        if results.get("storage"):
+            jobs.append(("storage_performance", "generate_storage_chart", (results["storage"],)))
+        return jobs
+    
+    def generate_all(self, results, workers=None):
+        """Generate all charts from benchmark results, reusing cached renders"""
+        from visualization.pipeline import ChartPipeline
+        
         try:
             print("[OK] Generating charts...")
-            cpu_chart = self.generate_cpu_chart(results["cpu"])
-            mem_chart = self.generate_memory_chart(results["memory"])
-            parallel_chart = self.generate_parallel_chart(results["parallel"])
+            pipeline = ChartPipeline(self.dpi, self.fmt, self.results_dir, workers)
+            paths = pipeline.render(self.chart_jobs(results))
             print(f"[OK] All charts saved to {self.results_dir}")
-            return {"cpu": cpu_chart, "memory": mem_chart, "parallel": parallel_chart}
+            return {
+                "cpu": paths.get("cpu_performance"),
+                "memory": paths.get("memory_performance"),
+                "parallel": paths.get("parallel_execution_time"),
+                "scaling": paths.get("parallel_scaling"),
+                "storage": paths.get("storage_performance"),
+            }
         except Exception as e:
             print(f"[ERROR] Chart generation failed: {e}")
             return {}
+    
+    def generate_dashboard(self, store, run_ids=None, workers=None):
+        """Render the charts of many stored runs in one incremental batch
+
+        Each run's charts go to dashboard/run_<id>/ under the results directory.
+        """
+        from visualization.pipeline import ChartPipeline
+        
+        run_ids = run_ids or store.recent_run_ids(limit=-1)
+        jobs = []
+        for run_id in run_ids:
+            for name, method, args in self.chart_jobs(store.load_run(run_id)):
+                jobs.append((os.path.join("dashboard", f"run_{run_id}", name), method, args))
+        pipeline = ChartPipeline(self.dpi, self.fmt, self.results_dir, workers)
+        paths = pipeline.render(jobs)
+        print(f"[OK] Dashboard: {len(paths)} charts for {len(run_ids)} runs "
+              f"({pipeline.rendered} rendered, {pipeline.cached} from cache)")
+        return paths
@@ -0,0 +1,107 @@
+"""
+Parallel, content-addressed chart rendering
+"""
+
+import os
+import json
+import shutil
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+from config import CHART_CACHE_DIR
+
+CHARTS_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "charts.py")
+
+
+def _render_job(job):
+    """Render one chart in a worker process and return its path (or None)"""
+    from visualization.charts import ChartGenerator
+
+    method, args, path, dpi, fmt, results_dir = job
+    generator = ChartGenerator(dpi=dpi, fmt=fmt, results_dir=results_dir)
+    return getattr(generator, method)(*args, chart_path=path)
+
+
+class ChartPipeline:
+    """Render charts in a process pool, skipping those whose input is unchanged
+
+    A chart's cache key hashes its input data together with the chart code,
+    DPI and format. Renders live in CHART_CACHE_DIR under that key, and the
+    human-facing file (e.g. cpu_performance.png) is only rewritten when its
+    key changes.
+    """
+
+    def __init__(self, dpi, fmt, results_dir, workers=None, cache_dir=None):
+        self.dpi = dpi
+        self.fmt = fmt
+        self.results_dir = results_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_dir = cache_dir or os.path.join(results_dir, CHART_CACHE_DIR)
+        self.index_path = os.path.join(self.cache_dir, "index.json")
+        self.rendered = 0
+        self.cached = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(CHARTS_SOURCE, 'rb') as f:
+            self.code_hash = hashlib.sha256(f.read()).hexdigest()
+
+    def cache_key(self, method, args):
+        """Content hash of everything that determines a chart's pixels"""
+        payload = json.dumps([method, args, self.dpi, self.fmt, self.code_hash], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:20]
+
+    def _load_index(self):
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                return json.load(f)
+        return {}
+
+    def _save_index(self, index):
+        with open(self.index_path, 'w') as f:
+            json.dump(index, f, indent=4, sort_keys=True)
+
+    def render(self, jobs):
+        """Render (name, method, args) jobs and return {name: output path}"""
+        index = self._load_index()
+        outputs = {}
+        pending = []
+        for name, method, args in jobs:
+            key = self.cache_key(method, args)
+            cached_path = os.path.join(self.cache_dir, f"{os.path.basename(name)}-{key}.{self.fmt}")
+            output_path = os.path.join(self.results_dir, f"{name}.{self.fmt}")
+            outputs[name] = (key, cached_path, output_path)
+            if os.path.exists(cached_path):
+                self.cached += 1
+            else:
+                pending.append((method, args, cached_path, self.dpi, self.fmt, self.results_dir))
+
+        if len(pending) > 1 and self.workers > 1:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(pending))) as executor:
+                rendered = list(executor.map(_render_job, pending))
+        else:
+            rendered = [_render_job(job) for job in pending]
+        self.rendered += sum(1 for path in rendered if path)
+
+        paths = {}
+        for name, (key, cached_path, output_path) in outputs.items():
+            if not os.path.exists(cached_path):
+                continue
+            relative = os.path.relpath(output_path, self.results_dir)
+            if index.get(relative) != key or not os.path.exists(output_path):
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                shutil.copyfile(cached_path, output_path)
+                index[relative] = key
+            paths[name] = output_path
+
+        self._save_index(index)
+        self.prune(index)
+        return paths
+
+    def prune(self, index):
+        """Delete cached renders that no output refers to any more"""
+        live = set(index.values())
+        for entry in os.listdir(self.cache_dir):
+            stem, ext = os.path.splitext(entry)
+            if entry == os.path.basename(self.index_path) or "-" not in stem:
+                continue
+            if stem.rsplit("-", 1)[1] not in live:
+                os.remove(os.path.join(self.cache_dir, entry))